@@ -0,0 +1,279 @@
+"""Server-sent activity feed.
+
+One tailer task per process reads new ``audit_log`` rows by id and fans them
+out to subscribers, so N open streams cost one indexed query per poll instead
+of N ``ORDER BY timestamp DESC`` polls. Commits that wrote audit rows in this
+process wake the tailer immediately; rows written elsewhere (other workers,
+CLI jobs) arrive within ``ACTIVITY_POLL_INTERVAL_SECONDS``.
+
+Visibility matches ``GET /files/activity``: admins see every entry, other users
+only entries they are the actor of. Event ids are audit ids, so a reconnect
+with ``Last-Event-ID`` replays up to ``ACTIVITY_RESUME_LIMIT`` missed entries.
+A subscriber whose buffer fills up is disconnected and can resume that way.
+
+On PostgreSQL and MySQL a transaction holding a lower id can commit after one
+holding a higher id. The tailer therefore re-reads the last
+``ACTIVITY_REORDER_WINDOW`` ids behind its cursor and skips the ones it already
+published. A resume re-reads the same window behind ``Last-Event-ID``, so it can
+repeat entries the client already has; clients dedupe by event id. SQLite has a
+single writer, commits in id order and uses no window.
+"""
+
+import asyncio
+import contextvars
+import logging
+from collections import deque
+from typing import AsyncIterator, Callable, Optional
+
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.audit import AUDIT_WRITTEN
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.metrics import activity_disconnects_total, activity_events_total
+from app.models import AuditLog
+from app.serializers import dumps
+
+logger = logging.getLogger(__name__)
+
+TAIL_BATCH_SIZE = 500
+
+
+def serialize_audit(entry: AuditLog) -> dict:
+    return {
+        "id": entry.id,
+        "actor_user_id": entry.actor_user_id,
+        "action": entry.action,
+        "target_type": entry.target_type,
+        "target_id": entry.target_id,
+        "timestamp": entry.timestamp,
+        "metadata_json": entry.metadata_json,
+    }
+
+
+def format_event(entry: AuditLog) -> str:
+    return f"id: {entry.id}\nevent: audit\ndata: {dumps(serialize_audit(entry)).decode()}\n\n"
+
+
+class Subscription:
+    def __init__(self, user_id: int, is_admin: bool, max_buffer: int) -> None:
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self.max_buffer = max_buffer
+        self.overflowed = False
+        self._buffer: deque[tuple[int, str]] = deque()
+        self._ready = asyncio.Event()
+
+    def can_see(self, actor_user_id: Optional[int]) -> bool:
+        return self.is_admin or actor_user_id == self.user_id
+
+    def offer(self, event_id: int, frame: str) -> bool:
+        if len(self._buffer) >= self.max_buffer:
+            self.overflowed = True
+            self._ready.set()
+            return False
+        self._buffer.append((event_id, frame))
+        self._ready.set()
+        return True
+
+    async def drain(self, timeout: float) -> list[tuple[int, str]]:
+        """Buffered ``(event_id, frame)`` pairs, or an empty list after ``timeout`` seconds."""
+        if not self._buffer and not self.overflowed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self._ready.clear()
+        items = list(self._buffer)
+        self._buffer.clear()
+        return items
+
+
+class ActivityHub:
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        poll_interval_seconds: float,
+        client_buffer: int,
+        reorder_window: int = 0,
+    ) -> None:
+        self.session_factory = session_factory
+        self.poll_interval_seconds = poll_interval_seconds
+        self.client_buffer = client_buffer
+        self.reorder_window = reorder_window
+        self._subscribers: set[Subscription] = set()
+        self._cursor: Optional[int] = None
+        # Ids within ``reorder_window`` of the cursor that were already published.
+        self._published: set[int] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _start_at_tip(self) -> None:
+        async with self.session_factory() as db:
+            if self.reorder_window <= 0:
+                self._cursor = await db.scalar(select(func.max(AuditLog.id))) or 0
+                self._published = set()
+                return
+            recent = (
+                await db.scalars(select(AuditLog.id).order_by(AuditLog.id.desc()).limit(self.reorder_window))
+            ).all()
+        # Gaps below the tip may still be filled by in-flight transactions; only existing ids count as published.
+        self._cursor = recent[0] if recent else 0
+        self._published = set(recent)
+
+    async def subscribe(self, user_id: int, is_admin: bool) -> Subscription:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._wake = asyncio.Event()
+            # A fresh context keeps the tailer's queries out of this request's metrics.
+            self._task = loop.create_task(self._run(), context=contextvars.Context())
+        if self._cursor is None:
+            # Entries up to here come from the subscriber's resume query; the tailer covers the rest.
+            await self._start_at_tip()
+        subscription = Subscription(user_id, is_admin, self.client_buffer)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def notify(self) -> None:
+        """Wake the tailer; safe to call from any thread."""
+        loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wake.set)
+
+    async def poll_once(self) -> int:
+        """Publish audit rows committed since the last poll; returns how many were read."""
+        if not self._subscribers:
+            # Nobody is listening; the next subscriber starts from the then-current tip.
+            self._cursor = None
+            return 0
+        if self._cursor is None:
+            await self._start_at_tip()
+        read = 0
+        after = max(self._cursor - self.reorder_window, 0)
+        while True:
+            query = select(AuditLog).where(AuditLog.id > after)
+            skip = [entry_id for entry_id in self._published if entry_id > after]
+            if skip:
+                query = query.where(AuditLog.id.not_in(skip))
+            async with self.session_factory() as db:
+                entries = (await db.scalars(query.order_by(AuditLog.id).limit(TAIL_BATCH_SIZE))).all()
+            for entry in entries:
+                self.publish(entry)
+            if entries:
+                after = entries[-1].id
+                self._cursor = max(self._cursor, after)
+                read += len(entries)
+                if self.reorder_window > 0:
+                    self._published.update(entry.id for entry in entries)
+            if len(entries) < TAIL_BATCH_SIZE:
+                break
+        floor = self._cursor - self.reorder_window
+        self._published = {entry_id for entry_id in self._published if entry_id > floor}
+        return read
+
+    def publish(self, entry: AuditLog) -> None:
+        frame = None
+        for subscription in list(self._subscribers):
+            if not subscription.can_see(entry.actor_user_id):
+                continue
+            frame = frame or format_event(entry)
+            if not subscription.offer(entry.id, frame):
+                self._subscribers.discard(subscription)
+                activity_disconnects_total.inc(reason="buffer_full")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.poll_once()
+            except Exception:  # noqa: BLE001
+                logger.exception("Activity feed poll failed")
+
+    def stop(self) -> None:
+        task, loop = self._task, self._loop
+        if task is not None and loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(task.cancel)
+        self._task = None
+        self._subscribers.clear()
+        self._cursor = None
+        self._published = set()
+
+
+activity_hub = ActivityHub(
+    session_factory=AsyncSessionLocal,
+    poll_interval_seconds=settings.activity_poll_interval_seconds,
+    client_buffer=settings.activity_client_buffer,
+    reorder_window=0 if settings.database_url.startswith("sqlite") else settings.activity_reorder_window,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_on_audit_commit(session: Session) -> None:
+    if session.info.pop(AUDIT_WRITTEN, False):
+        activity_hub.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_audit(session: Session) -> None:
+    session.info.pop(AUDIT_WRITTEN, None)
+
+
+def _resume_query(user_id: int, is_admin: bool, last_event_id: int, limit: int, reorder_window: int):
+    query = select(AuditLog).where(AuditLog.id > max(last_event_id - reorder_window, 0))
+    if not is_admin:
+        query = query.where(AuditLog.actor_user_id == user_id)
+    # The newest ``limit`` missed entries, replayed oldest first.
+    return query.order_by(AuditLog.id.desc()).limit(limit)
+
+
+async def event_stream(
+    hub: ActivityHub,
+    user_id: int,
+    is_admin: bool,
+    last_event_id: Optional[int],
+    heartbeat_seconds: Optional[float] = None,
+) -> AsyncIterator[str]:
+    heartbeat_seconds = settings.activity_heartbeat_seconds if heartbeat_seconds is None else heartbeat_seconds
+    subscription = await hub.subscribe(user_id, is_admin)
+    try:
+        replayed: set[int] = set()
+        yield f"retry: {int(hub.poll_interval_seconds * 1000) + 1000}\n\n"
+        if last_event_id is not None:
+            async with hub.session_factory() as db:
+                missed = (
+                    await db.scalars(
+                        _resume_query(
+                            user_id, is_admin, last_event_id, settings.activity_resume_limit, hub.reorder_window
+                        )
+                    )
+                ).all()
+            for entry in reversed(missed):
+                replayed.add(entry.id)
+                activity_events_total.inc()
+                yield format_event(entry)
+
+        while True:
+            batch = await subscription.drain(heartbeat_seconds)
+            for event_id, frame in batch:
+                # The tailer publishes each id once; only the resume query can overlap with it.
+                if event_id not in replayed:
+                    activity_events_total.inc()
+                    yield frame
+            if subscription.overflowed:
+                # Ending the stream lets EventSource reconnect with Last-Event-ID and catch up.
+                return
+            if not batch:
+                yield ": keep-alive\n\n"
+    finally:
+        hub.unsubscribe(subscription)
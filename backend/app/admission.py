@@ -0,0 +1,242 @@
+"""Admission control for upload and scan work.
+
+An upload holds a request body, a storage write and a CPU-bound scan. Without
+a cap, a burst of large ones slows every other request on the worker, auth and
+downloads included. Requests to ``ADMITTED_ROUTES`` take a slot before their
+body is read:
+- at most ``UPLOAD_MAX_CONCURRENT`` per worker;
+- at most ``UPLOAD_MAX_CONCURRENT_PER_USER`` per user.
+
+Requests that get no slot wait first-come first-served in a queue. The queue
+holds ``UPLOAD_QUEUE_SIZE`` requests, and one user can hold at most their
+per-user limit there. A user at their own limit does not block others queued
+behind them. When the queue is full, or after
+``UPLOAD_QUEUE_TIMEOUT_SECONDS``, the request gets ``503`` with
+``Retry-After``.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.routing import compile_path
+
+from app.config import settings
+from app.metrics import upload_active, upload_queue_depth, upload_queue_wait_seconds, upload_rejected_total
+from app.security import decode_access_token
+
+# Route templates that receive file bytes or run the scanner.
+ADMITTED_ROUTES = (
+    ("POST", "/files/upload"),
+    ("PUT", "/files/uploads/{upload_id}"),
+    ("POST", "/files/uploads/{upload_id}/complete"),
+)
+
+ANONYMOUS = "anonymous"
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+@dataclass(eq=False)
+class _Waiter:
+    user_key: str
+    loop: asyncio.AbstractEventLoop
+    future: asyncio.Future
+    granted: bool = field(default=False)
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_per_user: int,
+        queue_size: int,
+        queue_timeout_seconds: float,
+        retry_after_seconds: int,
+    ) -> None:
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.queue_size = queue_size
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self._lock = threading.Lock()
+        self._active: dict[str, int] = {}
+        self._active_total = 0
+        self._queued: dict[str, int] = {}
+        self._waiters: deque[_Waiter] = deque()
+        self.admitted = 0
+        self.rejected: dict[str, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_concurrent > 0
+
+    def _has_room(self, user_key: str) -> bool:
+        if self._active_total >= self.max_concurrent:
+            return False
+        return self.max_per_user <= 0 or self._active.get(user_key, 0) < self.max_per_user
+
+    def _grant(self, user_key: str) -> None:
+        self._active_total += 1
+        self._active[user_key] = self._active.get(user_key, 0) + 1
+        self.admitted += 1
+
+    def _dequeue(self, waiter: _Waiter) -> None:
+        self._waiters.remove(waiter)
+        remaining = self._queued[waiter.user_key] - 1
+        if remaining:
+            self._queued[waiter.user_key] = remaining
+        else:
+            del self._queued[waiter.user_key]
+
+    def _dispatch(self) -> None:
+        """Hand free slots to the oldest waiters that fit; caller holds ``_lock``."""
+        for waiter in list(self._waiters):
+            if self._active_total >= self.max_concurrent:
+                break
+            if not self._has_room(waiter.user_key):
+                continue
+            self._dequeue(waiter)
+            self._grant(waiter.user_key)
+            waiter.granted = True
+            if not waiter.loop.is_closed():
+                waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+
+    def _publish(self) -> None:
+        upload_active.set(self._active_total)
+        upload_queue_depth.set(len(self._waiters))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        upload_rejected_total.inc(reason=reason)
+        return AdmissionRejected(reason)
+
+    async def acquire(self, user_key: str) -> None:
+        """Take a slot for ``user_key``, waiting in the queue if needed; raises ``AdmissionRejected``."""
+        started = time.perf_counter()
+        with self._lock:
+            # Released slots go straight to eligible waiters, so anyone still queued cannot use this one.
+            if self._has_room(user_key):
+                self._grant(user_key)
+                self._publish()
+                upload_queue_wait_seconds.observe(0.0)
+                return
+            if len(self._waiters) >= self.queue_size:
+                raise self._reject("queue_full")
+            if self.max_per_user > 0 and self._queued.get(user_key, 0) >= self.max_per_user:
+                raise self._reject("user_queue_full")
+            loop = asyncio.get_running_loop()
+            waiter = _Waiter(user_key=user_key, loop=loop, future=loop.create_future())
+            self._waiters.append(waiter)
+            self._queued[user_key] = self._queued.get(user_key, 0) + 1
+            self._publish()
+
+        try:
+            await asyncio.wait_for(waiter.future, self.queue_timeout_seconds)
+        except BaseException as exc:
+            with self._lock:
+                if not waiter.granted:
+                    self._dequeue(waiter)
+                    self._publish()
+                    if isinstance(exc, asyncio.TimeoutError):
+                        raise self._reject("timeout") from None
+                    raise
+            # The slot was granted just as the wait ended.
+            if not isinstance(exc, asyncio.TimeoutError):
+                self.release(user_key)
+                raise
+        upload_queue_wait_seconds.observe(time.perf_counter() - started)
+
+    def release(self, user_key: str) -> None:
+        with self._lock:
+            self._active_total -= 1
+            remaining = self._active[user_key] - 1
+            if remaining:
+                self._active[user_key] = remaining
+            else:
+                del self._active[user_key]
+            self._dispatch()
+            self._publish()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "max_concurrent": self.max_concurrent,
+                "max_per_user": self.max_per_user,
+                "queue_size": self.queue_size,
+                "queue_timeout_seconds": self.queue_timeout_seconds,
+                "active": self._active_total,
+                "active_users": len(self._active),
+                "queued": len(self._waiters),
+                "admitted_total": self.admitted,
+                "rejected": dict(self.rejected),
+            }
+
+
+upload_admission = AdmissionController(
+    max_concurrent=settings.upload_max_concurrent,
+    max_per_user=settings.upload_max_concurrent_per_user,
+    queue_size=settings.upload_queue_size,
+    queue_timeout_seconds=settings.upload_queue_timeout_seconds,
+    retry_after_seconds=settings.upload_retry_after_seconds,
+)
+
+
+def _user_key(scope: dict) -> str:
+    # Identity only decides whose limit applies; the route itself still authenticates the user.
+    scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return ANONYMOUS
+    try:
+        return str(decode_access_token(token).get("sub") or ANONYMOUS)
+    except Exception:  # noqa: BLE001
+        return ANONYMOUS
+
+
+class AdmissionMiddleware:
+    """Applies ``controller`` to ``ADMITTED_ROUTES`` before the request body is read."""
+
+    def __init__(self, app, controller: Optional[AdmissionController] = None) -> None:
+        self.app = app
+        self.controller = controller or upload_admission
+        self._routes = [(method, compile_path(path)[0]) for method, path in ADMITTED_ROUTES]
+
+    def _admitted(self, scope: dict) -> bool:
+        method, path = scope["method"], scope["path"]
+        return any(method == route_method and regex.match(path) for route_method, regex in self._routes)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not self.controller.enabled or not self._admitted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        user_key = _user_key(scope)
+        try:
+            await self.controller.acquire(user_key)
+        except AdmissionRejected:
+            response = JSONResponse(
+                {"detail": "Too many uploads in progress; retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.controller.retry_after_seconds)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(user_key)
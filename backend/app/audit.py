@@ -1,12 +1,21 @@
-from typing import Any, Dict, Optional
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Union
 
+from sqlalchemy import insert
+
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.metrics import audit_rows_total
 from app.models import AuditLog
 
+# Set on a session that wrote audit rows; app.activity_feed wakes its tailer when that session commits.
+AUDIT_WRITTEN = "audit_written"
+
 
 def add_audit(
-    db: Session,
+    db: Union[Session, AsyncSession],
     *,
     actor_user_id: Optional[int],
     action: str,
@@ -22,4 +31,34 @@ def add_audit(
         metadata_json=metadata or {},
     )
     db.add(entry)
+    db.info[AUDIT_WRITTEN] = True
+    audit_rows_total.inc(action=action)
     return entry
+
+
+def add_audit_bulk(db: Session, entries: Sequence[Dict[str, Any]]) -> None:
+    """Insert many audit rows in one executemany.
+
+    Each entry has the ``add_audit`` keyword arguments. Rows share one timestamp
+    and are written immediately rather than on flush.
+    """
+    if not entries:
+        return
+    timestamp = datetime.utcnow()
+    db.execute(
+        insert(AuditLog),
+        [
+            {
+                "actor_user_id": entry.get("actor_user_id"),
+                "action": entry["action"],
+                "target_type": entry["target_type"],
+                "target_id": entry["target_id"],
+                "metadata_json": entry.get("metadata") or {},
+                "timestamp": timestamp,
+            }
+            for entry in entries
+        ],
+    )
+    db.info[AUDIT_WRITTEN] = True
+    for action, count in Counter(entry["action"] for entry in entries).items():
+        audit_rows_total.inc(count, action=action)
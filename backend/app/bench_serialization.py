@@ -0,0 +1,107 @@
+"""Compare the ORM + Pydantic listing path with the column-only fast path.
+
+Runs against a throwaway in-memory SQLite database:
+
+    python -m app.bench_serialization --rows 10000 --repeat 5
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Callable
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import FileRecord, User
+from app.schemas import FileOut
+from app.serializers import FastJSONResponse, file_dicts, select_file_columns, serialize_file
+
+_file_list = TypeAdapter(list[FileOut])
+
+
+def build_session(rows: int) -> Session:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.execute(insert(User), [{"id": 1, "email": "bench@example.com", "password_hash": "x", "role": "User"}])
+    started = datetime(2025, 1, 1)
+    db.execute(
+        insert(FileRecord),
+        [
+            {
+                "filename": f"report-{index}.pdf",
+                "owner_user_id": 1,
+                "created_at": started + timedelta(seconds=index),
+                "size": 1024 + index,
+                "content_type": "application/pdf",
+                "label": "Internal",
+                "scan_summary_json": {"counts": {"emails": index % 3}, "categories_detected": ["emails"]},
+                "policy_decision": "allow",
+                "decision_reason": "Internal sharing is allowed",
+                "storage_path": f"ab/{index}",
+                "is_deleted": False,
+            }
+            for index in range(rows)
+        ],
+    )
+    db.commit()
+    return db
+
+
+def legacy_listing(db: Session) -> bytes:
+    """What the list endpoints used to do: ORM rows, FileOut per row, then FastAPI's validate + encode."""
+    db.expunge_all()
+    files = db.query(FileRecord).filter(FileRecord.is_deleted.is_(False)).order_by(FileRecord.created_at.desc()).all()
+    items = [FileOut(**serialize_file(file_record)) for file_record in files]
+    content = _file_list.dump_python(_file_list.validate_python(items), mode="json")
+    return JSONResponse(content).body
+
+
+def fast_listing(db: Session) -> bytes:
+    query = select_file_columns().where(FileRecord.is_deleted.is_(False)).order_by(FileRecord.created_at.desc())
+    return FastJSONResponse(file_dicts(db.execute(query).all())).body
+
+
+def _best_of(repeat: int, func: Callable[[Session], bytes], db: Session) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(db)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(rows: int = 10_000, repeat: int = 5) -> dict:
+    db = build_session(rows)
+    try:
+        legacy = _best_of(repeat, legacy_listing, db)
+        fast = _best_of(repeat, fast_listing, db)
+    finally:
+        db.close()
+    return {
+        "rows": rows,
+        "legacy_ms": round(legacy * 1000, 1),
+        "fast_ms": round(fast * 1000, 1),
+        "speedup": round(legacy / fast, 1) if fast else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    result = run(args.rows, args.repeat)
+    print(
+        f"{result['rows']} rows: legacy {result['legacy_ms']} ms, fast {result['fast_ms']} ms "
+        f"({result['speedup']}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
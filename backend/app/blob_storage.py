@@ -0,0 +1,110 @@
+import lzma
+import zlib
+from pathlib import PurePosixPath
+from typing import Iterable, Iterator, Optional
+
+from app.config import settings
+from app.storage_backends import StorageBackend
+
+ENCODING_GZIP = "gzip"
+ENCODING_XZ = "xz"
+
+SUFFIX_BY_ENCODING = {ENCODING_GZIP: ".gz", ENCODING_XZ: ".xz"}
+ENCODING_BY_SUFFIX = {suffix: encoding for encoding, suffix in SUFFIX_BY_ENCODING.items()}
+
+# PDFs are already deflate-compressed internally; only plain text benefits.
+COMPRESSIBLE_EXTENSIONS = {".txt", ".csv"}
+
+
+def _new_compressor(encoding: str):
+    if encoding == ENCODING_GZIP:
+        # wbits=31 emits a gzip container so stored bytes can be sent as Content-Encoding: gzip.
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+    if encoding == ENCODING_XZ:
+        return lzma.LZMACompressor(format=lzma.FORMAT_XZ, preset=6)
+    raise ValueError(f"Unsupported storage encoding: {encoding}")
+
+
+def _new_decompressor(encoding: str):
+    if encoding == ENCODING_GZIP:
+        return zlib.decompressobj(31)
+    if encoding == ENCODING_XZ:
+        return lzma.LZMADecompressor(format=lzma.FORMAT_XZ)
+    raise ValueError(f"Unsupported storage encoding: {encoding}")
+
+
+def storage_compression_mode(value: str) -> Optional[str]:
+    """Parse ``STORAGE_COMPRESSION``; ``None`` means blobs are stored raw."""
+    mode = value.strip().lower()
+    if mode in ("", "off", "none"):
+        return None
+    if mode not in SUFFIX_BY_ENCODING:
+        raise ValueError(f"STORAGE_COMPRESSION must be one of: off, {', '.join(SUFFIX_BY_ENCODING)}; got {value!r}")
+    return mode
+
+
+# Fail at import so a misconfigured worker never boots, rather than on its first compressible upload.
+storage_compression_mode(settings.storage_compression)
+
+
+def choose_storage_encoding(filename: str) -> Optional[str]:
+    mode = storage_compression_mode(settings.storage_compression)
+    if mode is None or PurePosixPath(filename).suffix.lower() not in COMPRESSIBLE_EXTENSIONS:
+        return None
+    return mode
+
+
+def storage_suffix(encoding: Optional[str]) -> str:
+    return SUFFIX_BY_ENCODING.get(encoding, "") if encoding else ""
+
+
+def storage_encoding(key: str) -> Optional[str]:
+    """Blobs written before compression existed have no codec suffix and are read raw."""
+    return ENCODING_BY_SUFFIX.get(PurePosixPath(key).suffix.lower())
+
+
+def encode_stream(chunks: Iterable[bytes], encoding: Optional[str]) -> Iterator[bytes]:
+    if encoding is None:
+        yield from chunks
+        return
+    compressor = _new_compressor(encoding)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    tail = compressor.flush()
+    if tail:
+        yield tail
+
+
+def iter_blob_range(storage: StorageBackend, key: str, start: int, end: int) -> Iterator[bytes]:
+    """Yield decoded bytes ``start..end`` (inclusive) of a stored blob.
+
+    Raw blobs are read with a ranged backend read; compressed blobs are
+    decompressed as a stream and the leading bytes discarded, so memory stays
+    bounded by the backend chunk size.
+    """
+    remaining = end - start + 1
+    if remaining <= 0:
+        return
+    encoding = storage_encoding(key)
+
+    if encoding is None:
+        yield from storage.open_range(key, start, end)
+        return
+
+    decompressor = _new_decompressor(encoding)
+    skip = start
+    for compressed in storage.open_range(key):
+        chunk = decompressor.decompress(compressed)
+        if skip:
+            dropped = min(skip, len(chunk))
+            chunk = chunk[dropped:]
+            skip -= dropped
+        if not chunk:
+            continue
+        chunk = chunk[:remaining]
+        remaining -= len(chunk)
+        yield chunk
+        if remaining <= 0:
+            return
@@ -0,0 +1,204 @@
+"""Response compression negotiated from Accept-Encoding.
+
+gzip is always available; zstd (``zstandard``) and brotli (``brotli``) are used
+when those packages are installed and the client prefers them. Streamed bodies
+are compressed message by message with a sync flush after each one, so SSE
+events and CSV rows still reach the client as they are produced.
+
+Only text-like media types are compressed: PDFs, images, archives and other
+already-compressed blobs pass through untouched, as do ranges, 304s and
+bodies that already carry a Content-Encoding (gzip blobs served as stored).
+"""
+
+import time
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.config import settings
+from app.http_ranges import encoding_qualities
+from app.metrics import (
+    compression_cpu_seconds_total,
+    compression_input_bytes_total,
+    compression_output_bytes_total,
+    compression_skipped_total,
+    route_label,
+)
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+ENCODING_ZSTD = "zstd"
+ENCODING_BROTLI = "br"
+ENCODING_GZIP = "gzip"
+
+# Server preference when the client rates several codings equally.
+AVAILABLE_ENCODINGS = tuple(
+    name
+    for name, module in ((ENCODING_ZSTD, zstandard), (ENCODING_BROTLI, brotli), (ENCODING_GZIP, zlib))
+    if module is not None
+)
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "image/svg+xml",
+}
+
+# Defaults per route template; COMPRESSION_ROUTE_MIN_BYTES overrides them.
+ROUTE_MIN_BYTES = {
+    "/reports/audit.csv": 256,
+    "/reports/files/{file_id}/audit.csv": 256,
+    # Small text blobs are not worth the CPU; PDFs and images are skipped by type anyway.
+    "/files/{file_id}/download": 8192,
+}
+
+_SKIP_STATUSES = {204, 206, 304}
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the coding with the highest client q-value, breaking ties by server preference."""
+    qualities = encoding_qualities(accept_encoding)
+    chosen, best = None, 0.0
+    for name in AVAILABLE_ENCODINGS:
+        quality = qualities.get(name, qualities.get("*", 0.0))
+        if quality > best:
+            chosen, best = name, quality
+    return chosen
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith(("+json", "+xml"))
+    )
+
+
+class _Encoder:
+    def __init__(self, encoding: str) -> None:
+        self.encoding = encoding
+        if encoding == ENCODING_ZSTD:
+            self._compressor = zstandard.ZstdCompressor(level=3).compressobj()
+        elif encoding == ENCODING_BROTLI:
+            self._compressor = brotli.Compressor(quality=4)
+        else:
+            self._compressor = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        compressor = self._compressor
+        if self.encoding == ENCODING_BROTLI:
+            return compressor.process(data) + (compressor.finish() if final else compressor.flush())
+        if self.encoding == ENCODING_ZSTD:
+            data = compressor.compress(data)
+            return data + (compressor.flush() if final else compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK))
+        return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing whole and streamed responses for clients that accept it."""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: Optional[int] = None,
+        route_minimum_sizes: Optional[dict[str, int]] = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = settings.compression_min_bytes if minimum_size is None else minimum_size
+        self.route_minimum_sizes = {
+            **ROUTE_MIN_BYTES,
+            **settings.compression_route_min_bytes,
+            **(route_minimum_sizes or {}),
+        }
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD" or not settings.compression_enabled:
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[dict] = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+        route = "unmatched"
+
+        async def send_wrapper(message) -> None:
+            nonlocal start_message, encoder, passthrough, route
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows whether compression is worthwhile.
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                route = route_label(scope)
+                reason = self._skip_reason(route, start_message, body, more_body)
+                if reason:
+                    passthrough = True
+                    compression_skipped_total.inc(reason=reason)
+                    await send(start_message)
+                    await send(message)
+                    return
+                encoder = _Encoder(encoding)
+                headers = MutableHeaders(raw=start_message["headers"])
+                del headers["content-length"]
+                headers["content-encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    # The encoded bytes differ from the identity representation.
+                    headers["etag"] = f"W/{etag}"
+                await send(start_message)
+
+            started = time.thread_time()
+            data = encoder.compress(body, final=not more_body)
+            compression_cpu_seconds_total.inc(time.thread_time() - started, encoding=encoding)
+            compression_input_bytes_total.inc(len(body), route=route, encoding=encoding)
+            compression_output_bytes_total.inc(len(data), route=route, encoding=encoding)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _skip_reason(self, route: str, start_message: dict, body: bytes, more_body: bool) -> Optional[str]:
+        status = start_message["status"]
+        if status < 200 or status in _SKIP_STATUSES:
+            return "status"
+        headers = Headers(raw=start_message["headers"])
+        if "content-encoding" in headers:
+            return "encoded"
+        if "no-transform" in headers.get("cache-control", "").lower():
+            return "no_transform"
+        if not is_compressible(headers.get("content-type")):
+            return "content_type"
+        minimum = self.route_minimum_sizes.get(route, self.minimum_size)
+        if minimum < 0:
+            return "route_disabled"
+        length = headers.get("content-length")
+        size = int(length) if length else (None if more_body else len(body))
+        if size is not None and size < minimum:
+            return "too_small"
+        return None
@@ -1,7 +1,7 @@
 import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 
 
 
@@ -12,11 +12,68 @@ def _split_csv_env(value: str) -> List[str]:
 @dataclass(frozen=True)
 class Settings:
     database_url: str = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+    async_database_url: str = os.getenv("ASYNC_DATABASE_URL", "")
+    database_read_url: str = os.getenv("DATABASE_READ_URL", "")
+    async_database_read_url: str = os.getenv("ASYNC_DATABASE_READ_URL", "")
+    read_your_writes_seconds: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+    sqlite_journal_mode: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    sqlite_synchronous: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    sqlite_cache_size_kib: int = int(os.getenv("SQLITE_CACHE_SIZE_KIB", "65536"))
+    sqlite_mmap_size_bytes: int = int(os.getenv("SQLITE_MMAP_SIZE_BYTES", str(256 * 1024 * 1024)))
+    sqlite_busy_timeout_ms: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    db_pool_timeout_seconds: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    db_pool_recycle_seconds: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    db_query_budget: int = int(os.getenv("DB_QUERY_BUDGET", "50"))
+    db_repeated_query_threshold: int = int(os.getenv("DB_REPEATED_QUERY_THRESHOLD", "5"))
     upload_dir: str = os.getenv("UPLOAD_DIR", "./uploads")
     cors_origins_raw: str = os.getenv("CORS_ORIGINS", "http://localhost:4200")
     jwt_secret_key: str = os.getenv("JWT_SECRET_KEY", "change-me-in-production")
     jwt_expire_minutes: int = int(os.getenv("JWT_EXPIRE_MINUTES", "120"))
     demo_data_dir: str = os.getenv("DEMO_DATA_DIR", "../demo-data")
+    startup_mode: str = os.getenv("STARTUP_MODE", "development").strip().lower()
+    share_cache_size: int = int(os.getenv("SHARE_CACHE_SIZE", "1024"))
+    share_cache_ttl_seconds: float = float(os.getenv("SHARE_CACHE_TTL_SECONDS", "30"))
+    share_cache_negative_size: int = int(os.getenv("SHARE_CACHE_NEGATIVE_SIZE", "4096"))
+    share_cache_negative_ttl_seconds: float = float(os.getenv("SHARE_CACHE_NEGATIVE_TTL_SECONDS", "10"))
+    storage_backend: str = os.getenv("STORAGE_BACKEND", "local")
+    s3_endpoint_url: str = os.getenv("S3_ENDPOINT_URL", "")
+    s3_bucket: str = os.getenv("S3_BUCKET", "")
+    s3_region: str = os.getenv("S3_REGION", "us-east-1")
+    s3_access_key_id: str = os.getenv("S3_ACCESS_KEY_ID", "")
+    s3_secret_access_key: str = os.getenv("S3_SECRET_ACCESS_KEY", "")
+    storage_compression: str = os.getenv("STORAGE_COMPRESSION", "off")
+    link_sweep_interval_seconds: float = float(os.getenv("LINK_SWEEP_INTERVAL_SECONDS", "60"))
+    link_sweep_batch_size: int = int(os.getenv("LINK_SWEEP_BATCH_SIZE", "500"))
+    search_text_max_chars: int = int(os.getenv("SEARCH_TEXT_MAX_CHARS", "2000"))
+    stats_reconcile_interval_seconds: float = float(os.getenv("STATS_RECONCILE_INTERVAL_SECONDS", "3600"))
+    policy_rules_path: str = os.getenv("POLICY_RULES_PATH", "")
+    profiling_enabled: bool = os.getenv("PROFILING_ENABLED", "true").lower() in ("1", "true", "yes")
+    profile_min_interval_seconds: float = float(os.getenv("PROFILE_MIN_INTERVAL_SECONDS", "10"))
+    profile_sample_interval_ms: float = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+    profile_max_artifacts: int = int(os.getenv("PROFILE_MAX_ARTIFACTS", "20"))
+    compression_enabled: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+    compression_min_bytes: int = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+    compression_route_min_bytes_raw: str = os.getenv("COMPRESSION_ROUTE_MIN_BYTES", "")
+    compression_gzip_level: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    activity_poll_interval_seconds: float = float(os.getenv("ACTIVITY_POLL_INTERVAL_SECONDS", "1"))
+    activity_client_buffer: int = int(os.getenv("ACTIVITY_CLIENT_BUFFER", "100"))
+    activity_resume_limit: int = int(os.getenv("ACTIVITY_RESUME_LIMIT", "200"))
+    activity_heartbeat_seconds: float = float(os.getenv("ACTIVITY_HEARTBEAT_SECONDS", "15"))
+    activity_reorder_window: int = int(os.getenv("ACTIVITY_REORDER_WINDOW", "100"))
+    upload_session_max_bytes: int = int(os.getenv("UPLOAD_SESSION_MAX_BYTES", str(1024 * 1024 * 1024)))
+    upload_chunk_max_bytes: int = int(os.getenv("UPLOAD_CHUNK_MAX_BYTES", str(16 * 1024 * 1024)))
+    upload_session_ttl_seconds: float = float(os.getenv("UPLOAD_SESSION_TTL_SECONDS", "86400"))
+    upload_session_sweep_interval_seconds: float = float(os.getenv("UPLOAD_SESSION_SWEEP_INTERVAL_SECONDS", "600"))
+    upload_session_sweep_batch_size: int = int(os.getenv("UPLOAD_SESSION_SWEEP_BATCH_SIZE", "100"))
+    upload_state_cache_size: int = int(os.getenv("UPLOAD_STATE_CACHE_SIZE", "256"))
+    upload_max_concurrent: int = int(os.getenv("UPLOAD_MAX_CONCURRENT", "8"))
+    upload_max_concurrent_per_user: int = int(os.getenv("UPLOAD_MAX_CONCURRENT_PER_USER", "2"))
+    upload_queue_size: int = int(os.getenv("UPLOAD_QUEUE_SIZE", "32"))
+    upload_queue_timeout_seconds: float = float(os.getenv("UPLOAD_QUEUE_TIMEOUT_SECONDS", "10"))
+    upload_retry_after_seconds: int = int(os.getenv("UPLOAD_RETRY_AFTER_SECONDS", "5"))
 
     @property
     def cors_origins(self) -> List[str]:
@@ -27,6 +84,15 @@ class Settings:
                     origins.append(local_alt)
         return origins
 
+    @property
+    def compression_route_min_bytes(self) -> Dict[str, int]:
+        """``/route/template=bytes`` pairs; a negative value turns compression off for that route."""
+        thresholds: Dict[str, int] = {}
+        for item in _split_csv_env(self.compression_route_min_bytes_raw):
+            route, _, value = item.partition("=")
+            thresholds[route.strip()] = int(value)
+        return thresholds
+
     @property
     def upload_path(self) -> Path:
         return Path(self.upload_dir).resolve()
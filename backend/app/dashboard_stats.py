@@ -0,0 +1,248 @@
+"""Pre-aggregated dashboard counters.
+
+Writers add deltas to ``dashboard_stats`` in the same transaction as the change
+they describe, so ``/admin/stats`` reads a handful of rows instead of scanning
+``files``. A periodic reconcile recomputes every counter from the source tables
+to repair any drift (for example rows written by scripts that bypass the API).
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Callable, Mapping, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import DashboardStat, ExternalLink, FileRecord, InternalShare, User
+
+logger = logging.getLogger(__name__)
+
+DIM_FILES = "files"
+DIM_LABEL = "label"
+DIM_DECISION = "decision"
+DIM_OWNER = "owner"
+DIM_LINK_STATUS = "link_status"
+DIM_SHARES = "shares"
+TOTAL_KEY = "total"
+ALL_DIMENSIONS = (DIM_FILES, DIM_LABEL, DIM_DECISION, DIM_OWNER, DIM_LINK_STATUS, DIM_SHARES)
+
+StatKey = tuple[str, str]
+
+
+def file_deltas(label: str, decision: str, owner_user_id: int, sign: int = 1) -> Counter:
+    return Counter(
+        {
+            (DIM_FILES, TOTAL_KEY): sign,
+            (DIM_LABEL, label): sign,
+            (DIM_DECISION, decision): sign,
+            (DIM_OWNER, str(owner_user_id)): sign,
+        }
+    )
+
+
+def relabel_deltas(old_label: str, old_decision: str, new_label: str, new_decision: str) -> Counter:
+    deltas: Counter = Counter()
+    if old_label != new_label:
+        deltas[(DIM_LABEL, old_label)] -= 1
+        deltas[(DIM_LABEL, new_label)] += 1
+    if old_decision != new_decision:
+        deltas[(DIM_DECISION, old_decision)] -= 1
+        deltas[(DIM_DECISION, new_decision)] += 1
+    return deltas
+
+
+def link_deltas(old_status: Optional[str], new_status: str, count: int = 1) -> Counter:
+    deltas: Counter = Counter()
+    if old_status == new_status or not count:
+        return deltas
+    if old_status is not None:
+        deltas[(DIM_LINK_STATUS, old_status)] -= count
+    deltas[(DIM_LINK_STATUS, new_status)] += count
+    return deltas
+
+
+def share_deltas(count: int) -> Counter:
+    return Counter({(DIM_SHARES, TOTAL_KEY): count})
+
+
+def _upsert_statement(dialect_name: str, deltas: Mapping[StatKey, int]):
+    rows = [{"dimension": dim, "key": key, "count": delta} for (dim, key), delta in deltas.items() if delta]
+    if not rows:
+        return None
+    if dialect_name == "mysql":
+        statement = mysql.insert(DashboardStat).values(rows)
+        return statement.on_duplicate_key_update(count=DashboardStat.count + statement.inserted["count"])
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = dialect_insert(DashboardStat).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=["dimension", "key"], set_={"count": DashboardStat.count + statement.excluded["count"]}
+    )
+
+
+def apply_deltas(db: Session, deltas: Mapping[StatKey, int]) -> None:
+    """Add ``deltas`` in one upsert; the caller commits along with its own change."""
+    statement = _upsert_statement(db.get_bind().dialect.name, deltas)
+    if statement is not None:
+        db.execute(statement)
+
+
+async def apply_deltas_async(db: AsyncSession, deltas: Mapping[StatKey, int]) -> None:
+    statement = _upsert_statement(db.get_bind().dialect.name, deltas)
+    if statement is not None:
+        await db.execute(statement)
+
+
+def _source_counts(db: Session, dimensions: tuple[str, ...]) -> Counter:
+    counts: Counter = Counter()
+    live = FileRecord.is_deleted.is_(False)
+    if DIM_FILES in dimensions:
+        counts[(DIM_FILES, TOTAL_KEY)] = db.scalar(select(func.count()).select_from(FileRecord).where(live)) or 0
+    grouped = {
+        DIM_LABEL: FileRecord.label,
+        DIM_DECISION: FileRecord.policy_decision,
+        DIM_OWNER: FileRecord.owner_user_id,
+    }
+    for dimension, column in grouped.items():
+        if dimension in dimensions:
+            for key, count in db.execute(select(column, func.count()).where(live).group_by(column)):
+                counts[(dimension, str(key))] = count
+    if DIM_LINK_STATUS in dimensions:
+        for key, count in db.execute(select(ExternalLink.status, func.count()).group_by(ExternalLink.status)):
+            counts[(DIM_LINK_STATUS, key)] = count
+    if DIM_SHARES in dimensions:
+        counts[(DIM_SHARES, TOTAL_KEY)] = db.scalar(select(func.count()).select_from(InternalShare)) or 0
+    return counts
+
+
+def reconcile(db: Session, dimensions: tuple[str, ...] = ALL_DIMENSIONS, commit: bool = True) -> dict:
+    """Replace counters for ``dimensions`` with values recomputed from the source tables.
+
+    The DELETE runs first so concurrent writers queue behind this transaction's
+    locks and apply their deltas on top of the recomputed values.
+    """
+    previous = {
+        (row.dimension, row.key): row.count
+        for row in db.execute(select(DashboardStat).where(DashboardStat.dimension.in_(dimensions))).scalars()
+    }
+    db.execute(delete(DashboardStat).where(DashboardStat.dimension.in_(dimensions)))
+    current = _source_counts(db, dimensions)
+    rows = [{"dimension": dim, "key": key, "count": count} for (dim, key), count in current.items() if count]
+    if rows:
+        db.execute(DashboardStat.__table__.insert(), rows)
+    if commit:
+        db.commit()
+
+    drift = sum(1 for key in set(previous) | set(current) if previous.get(key, 0) != current.get(key, 0))
+    return {"rows": len(rows), "drifted": drift}
+
+
+def read_stats(db: Session, top_owners: int = 20) -> dict:
+    """Answer from the counter table alone: a few rows per dimension plus the top owners."""
+    grouped: dict[str, dict[str, int]] = {}
+    for row in db.execute(
+        select(DashboardStat.dimension, DashboardStat.key, DashboardStat.count).where(
+            DashboardStat.dimension != DIM_OWNER, DashboardStat.count != 0
+        )
+    ):
+        grouped.setdefault(row.dimension, {})[row.key] = row.count
+
+    owners = db.execute(
+        select(DashboardStat.key, DashboardStat.count)
+        .where(DashboardStat.dimension == DIM_OWNER, DashboardStat.count > 0)
+        .order_by(DashboardStat.count.desc())
+        .limit(top_owners)
+    ).all()
+    emails = dict(db.execute(select(User.id, User.email).where(User.id.in_([int(row.key) for row in owners]))).all())
+
+    return {
+        "files": grouped.get(DIM_FILES, {}).get(TOTAL_KEY, 0),
+        "labels": grouped.get(DIM_LABEL, {}),
+        "decisions": grouped.get(DIM_DECISION, {}),
+        "external_links": grouped.get(DIM_LINK_STATUS, {}),
+        "internal_shares": grouped.get(DIM_SHARES, {}).get(TOTAL_KEY, 0),
+        "top_owners": [
+            {"user_id": int(row.key), "email": emails.get(int(row.key)), "files": row.count} for row in owners
+        ],
+    }
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class StatsReconciler:
+    def __init__(self, session_factory: Callable[[], Session], interval_seconds: float) -> None:
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.runs = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_drifted = 0
+        self.last_error: Optional[str] = None
+
+    def run_once(self) -> dict:
+        with self._lock:
+            started = time.perf_counter()
+            db = self.session_factory()
+            try:
+                result = reconcile(db)
+                self.last_error = None
+            except Exception as exc:  # noqa: BLE001
+                db.rollback()
+                result = {"rows": 0, "drifted": 0}
+                self.last_error = type(exc).__name__
+                logger.exception("Dashboard stats reconcile failed")
+            finally:
+                db.close()
+
+            if result["drifted"]:
+                logger.warning("Dashboard stats reconcile repaired %d counters", result["drifted"])
+            self.runs += 1
+            self.last_run_at = _utcnow()
+            self.last_duration_ms = round((time.perf_counter() - started) * 1000, 3)
+            self.last_drifted = result["drifted"]
+            return result
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.run_once()
+
+    def start(self) -> None:
+        if self.interval_seconds <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="stats-reconciler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "interval_seconds": self.interval_seconds,
+            "runs": self.runs,
+            "last_run_at": self.last_run_at,
+            "last_duration_ms": self.last_duration_ms,
+            "last_drifted": self.last_drifted,
+            "last_error": self.last_error,
+        }
+
+
+stats_reconciler = StatsReconciler(
+    session_factory=SessionLocal,
+    interval_seconds=settings.stats_reconcile_interval_seconds,
+)
@@ -1,16 +1,141 @@
-from sqlalchemy import create_engine
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from app.config import settings
 
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def async_database_url(url: str, override: str = "") -> str:
+    """Map a sync database URL onto its async driver unless an explicit async URL is configured."""
+    if override:
+        return override
+    scheme, separator, rest = url.partition("://")
+    if scheme == "postgresql+psycopg":
+        return url
+    dialect = scheme.split("+", 1)[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for {dialect!r}; set ASYNC_DATABASE_URL")
+    return f"{ASYNC_DRIVERS[dialect]}{separator}{rest}"
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url.rstrip("/").endswith(":memory:") or url.rstrip("/") in ("sqlite:", "sqlite+aiosqlite:")
+
+
+def sqlite_pragmas() -> list[tuple[str, object]]:
+    return [
+        ("journal_mode", settings.sqlite_journal_mode),
+        ("synchronous", settings.sqlite_synchronous),
+        # Negative cache_size is in KiB rather than pages.
+        ("cache_size", -abs(settings.sqlite_cache_size_kib)),
+        ("mmap_size", settings.sqlite_mmap_size_bytes),
+        ("busy_timeout", settings.sqlite_busy_timeout_ms),
+    ]
+
+
+def engine_options(url: str) -> dict:
+    """Engine keyword arguments for the SQLite profile or the server-database profile."""
+    if url.startswith("sqlite"):
+        options: dict = {
+            "connect_args": {"check_same_thread": False, "timeout": settings.sqlite_busy_timeout_ms / 1000},
+        }
+        if not _is_memory_sqlite(url):
+            # Pooled connections keep their pragmas and page cache instead of reopening the file.
+            options.update(pool_size=settings.db_pool_size, max_overflow=settings.db_max_overflow)
+        return options
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
 
 is_sqlite = settings.database_url.startswith("sqlite")
-connect_args = {"check_same_thread": False} if is_sqlite else {}
 
-engine = create_engine(settings.database_url, connect_args=connect_args)
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+_async_url = async_database_url(settings.database_url, settings.async_database_url)
+async_engine = create_async_engine(_async_url, **engine_options(_async_url))
+# Objects must stay readable after commit: lazy refreshes cannot run outside an await.
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession)
+
+# Optional read replica; without DATABASE_READ_URL reads share the primary engines.
+if settings.database_read_url:
+    read_engine = create_engine(settings.database_read_url, **engine_options(settings.database_read_url))
+    _async_read_url = async_database_url(settings.database_read_url, settings.async_database_read_url)
+    async_read_engine = create_async_engine(_async_read_url, **engine_options(_async_read_url))
+else:
+    read_engine = engine
+    _async_read_url = _async_url
+    async_read_engine = async_engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+AsyncReadSessionLocal = async_sessionmaker(
+    async_read_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession
+)
+
+for _sync_engine in {engine, read_engine}:
+    if _sync_engine.dialect.name == "sqlite":
+        event.listen(_sync_engine, "connect", _apply_sqlite_pragmas)
+for _async_engine in {async_engine, async_read_engine}:
+    if _async_engine.dialect.name == "sqlite":
+        event.listen(_async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
+
+class RecentWriters:
+    """Remembers users who issued a mutating request within the last ``window_seconds``.
+
+    Their reads go to the primary so a replica lagging behind cannot hide their own writes.
+    """
+
+    def __init__(self, window_seconds: float, max_entries: int = 10_000) -> None:
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._last_write: dict[int, float] = {}
+
+    def mark(self, user_id: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._last_write[user_id] = now
+            if len(self._last_write) > self.max_entries:
+                cutoff = now - self.window_seconds
+                self._last_write = {key: value for key, value in self._last_write.items() if value > cutoff}
+
+    def recently_wrote(self, user_id: int) -> bool:
+        with self._lock:
+            last = self._last_write.get(user_id)
+        return last is not None and time.monotonic() - last < self.window_seconds
+
+    def clear(self) -> None:
+        with self._lock:
+            self._last_write.clear()
+
+
+recent_writers = RecentWriters(settings.read_your_writes_seconds)
+
 
 def get_db():
     db = SessionLocal()
@@ -18,3 +143,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
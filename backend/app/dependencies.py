@@ -1,15 +1,21 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import AsyncReadSessionLocal, ReadSessionLocal, get_async_db, get_db
 from app.models import User
+from app.read_your_writes import SAFE_METHODS, WRITER_STATE_KEY, prefers_primary
 from app.security import decode_access_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
     credentials_error = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -22,9 +28,12 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except Exception as exc:  # noqa: BLE001
         raise credentials_error from exc
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise credentials_error
+    if request.method not in SAFE_METHODS:
+        # Marked by ReadYourWritesMiddleware once the response shows the write succeeded.
+        setattr(request.state, WRITER_STATE_KEY, user.id)
     return user
 
 
@@ -32,3 +41,24 @@ def require_admin(current_user: User = Depends(get_current_user)) -> User:
     if current_user.role != "Admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin role required")
     return current_user
+
+
+def get_read_db(request: Request, current_user: User = Depends(get_current_user)):
+    """Read-only session on the replica, or the primary right after this user wrote."""
+    if prefers_primary(request.headers, current_user.id):
+        yield from get_db()
+        return
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request, current_user: User = Depends(get_current_user)):
+    if prefers_primary(request.headers, current_user.id):
+        async for db in get_async_db():
+            yield db
+        return
+    async with AsyncReadSessionLocal() as db:
+        yield db
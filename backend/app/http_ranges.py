@@ -0,0 +1,197 @@
+import secrets
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, Iterator, Mapping, Optional
+from urllib.parse import quote
+
+from fastapi.responses import StreamingResponse
+
+MAX_RANGES = 16
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def make_etag(*parts: object) -> str:
+    return '"{}"'.format("-".join(format(part, "x") if isinstance(part, int) else str(part) for part in parts))
+
+
+def http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
+
+
+def content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def _etag_in_list(header: str, etag: str, weak: bool) -> bool:
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if weak and candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def if_none_match(headers: Mapping[str, str], etag: str) -> bool:
+    """True when If-None-Match lists ``etag`` (weak comparison), so a 304 can be sent."""
+    header = headers.get("if-none-match")
+    return header is not None and _etag_in_list(header, etag, weak=True)
+
+
+def is_not_modified(headers: Mapping[str, str], etag: str, last_modified: float) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since (RFC 9110 13.2.2)."""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_in_list(if_none_match, etag, weak=True)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= int(since.timestamp())
+    return False
+
+
+def if_range_allows(headers: Mapping[str, str], etag: str, last_modified: float) -> bool:
+    if_range = headers.get("if-range")
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == etag
+    try:
+        return int(parsedate_to_datetime(if_range).timestamp()) == int(last_modified)
+    except (TypeError, ValueError):
+        return False
+
+
+def parse_range_header(header: Optional[str], size: int) -> Optional[list[tuple[int, int]]]:
+    """Parse a ``bytes=`` Range header into sorted, coalesced inclusive ranges.
+
+    Returns ``None`` when the header is absent or malformed (the full body should
+    be served) and raises ``RangeNotSatisfiable`` when no range overlaps the file.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec:
+        return None
+
+    ranges: list[tuple[int, int]] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, dash, last = part.partition("-")
+        if not dash:
+            return None
+        try:
+            if first:
+                start = int(first)
+                end = int(last) if last else size - 1
+            else:
+                suffix = int(last)
+                if suffix == 0:
+                    continue
+                start = max(size - suffix, 0)
+                end = size - 1
+        except ValueError:
+            return None
+        if start < 0 or end < start:
+            return None
+        if start >= size:
+            continue
+        ranges.append((start, min(end, size - 1)))
+
+    if not ranges:
+        raise RangeNotSatisfiable(f"bytes */{size}")
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    ranges.sort()
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def encoding_qualities(header: Optional[str]) -> dict[str, float]:
+    """Parse Accept-Encoding into ``{coding: q}``; names are lower-cased."""
+    qualities: dict[str, float] = {}
+    if not header:
+        return qualities
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name.strip().lower()] = quality
+    return qualities
+
+
+def accepts_encoding(header: Optional[str], encoding: str) -> bool:
+    qualities = encoding_qualities(header)
+    return qualities.get(encoding, qualities.get("*", 0.0)) > 0
+
+
+def range_response(
+    read_range: Callable[[int, int], Iterator[bytes]],
+    ranges: list[tuple[int, int]],
+    size: int,
+    media_type: str,
+    headers: dict[str, str],
+) -> StreamingResponse:
+    headers = dict(headers)
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(read_range(start, end), status_code=206, media_type=media_type, headers=headers)
+
+    boundary = secrets.token_hex(13)
+    part_headers = [
+        (
+            (
+                f"--{boundary}\r\nContent-Type: {media_type}\r\n"
+                f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+            ).encode("latin-1"),
+            start,
+            end,
+        )
+        for start, end in ranges
+    ]
+    closing = f"--{boundary}--\r\n".encode("latin-1")
+    headers["Content-Length"] = str(
+        sum(len(head) + (end - start + 1) + 2 for head, start, end in part_headers) + len(closing)
+    )
+
+    def _iter_parts() -> Iterator[bytes]:
+        for head, start, end in part_headers:
+            yield head
+            yield from read_range(start, end)
+            yield b"\r\n"
+        yield closing
+
+    return StreamingResponse(
+        _iter_parts(),
+        status_code=206,
+        media_type=f"multipart/byteranges; boundary={boundary}",
+        headers=headers,
+    )
@@ -0,0 +1,180 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+
+from app.config import settings
+from app.models import ExternalLink, FileRecord
+
+
+@dataclass(frozen=True)
+class CachedLink:
+    link_id: int
+    file_id: int
+    status: str
+    expires_at: datetime
+    filename: str
+    content_type: str
+    size: int
+    label: str
+    storage_path: str
+    file_deleted: bool
+
+    @classmethod
+    def from_records(cls, link: ExternalLink, file_record: FileRecord) -> "CachedLink":
+        return cls(
+            link_id=link.id,
+            file_id=file_record.id,
+            status=link.status,
+            expires_at=link.expires_at,
+            filename=file_record.filename,
+            content_type=file_record.content_type,
+            size=file_record.size,
+            label=file_record.label,
+            storage_path=file_record.storage_path,
+            file_deleted=file_record.is_deleted,
+        )
+
+
+class _BoundedTTLMap:
+    def __init__(self, max_entries: int, ttl_seconds: float, clock: Callable[[], float]) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple[float, object]]" = OrderedDict()
+
+    def get(self, key: str) -> tuple[bool, object]:
+        item = self._entries.get(key)
+        if item is None:
+            return False, None
+        expires, value = item
+        if expires <= self._clock():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def put(self, key: str, value: object) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (self._clock() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def remove_where(self, predicate: Callable[[object], bool]) -> None:
+        for key in [key for key, (_, value) in self._entries.items() if predicate(value)]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ExternalLinkCache:
+    """Bounded LRU cache of external-link token lookups.
+
+    Known and unknown tokens live in separate maps so a scan of random tokens
+    can only evict other negative entries, never a hot link.
+
+    Hits are served without touching the database. Revocations, deletions and
+    label overrides invalidate entries on the worker that made them; other
+    workers keep serving their copy for at most ``SHARE_CACHE_TTL_SECONDS``.
+    Every invalidation bumps ``generation`` so a lookup that raced it cannot put
+    the stale row back.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        negative_max_entries: int,
+        negative_ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._positive = _BoundedTTLMap(max_entries, ttl_seconds, clock)
+        self._negative = _BoundedTTLMap(negative_max_entries, negative_ttl_seconds, clock)
+        self.generation = 0
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> tuple[bool, Optional[CachedLink]]:
+        """Return ``(found, entry)``; ``(True, None)`` is a cached unknown token."""
+        with self._lock:
+            found, value = self._positive.get(token)
+            if found:
+                self.hits += 1
+                return True, value  # type: ignore[return-value]
+            found, _ = self._negative.get(token)
+            if found:
+                self.negative_hits += 1
+                return True, None
+            self.misses += 1
+            return False, None
+
+    def put(self, token: str, entry: CachedLink, generation: Optional[int] = None) -> None:
+        """Cache ``entry``, unless an invalidation happened after ``generation`` was read."""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._negative.pop(token)
+            self._positive.put(token, entry)
+
+    def put_missing(self, token: str) -> None:
+        with self._lock:
+            self._positive.pop(token)
+            self._negative.put(token, None)
+
+    def invalidate(self, token: str) -> None:
+        with self._lock:
+            self.generation += 1
+            self._positive.pop(token)
+            self._negative.pop(token)
+
+    def invalidate_file(self, file_id: int) -> None:
+        with self._lock:
+            self.generation += 1
+            self._positive.remove_where(lambda entry: entry.file_id == file_id)  # type: ignore[attr-defined]
+
+    def invalidate_files(self, file_ids: Iterable[int]) -> None:
+        """Drop entries for many files in one pass over the cache."""
+        targets = set(file_ids)
+        if not targets:
+            return
+        with self._lock:
+            self.generation += 1
+            self._positive.remove_where(lambda entry: entry.file_id in targets)  # type: ignore[attr-defined]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._positive.clear()
+            self._negative.clear()
+            self.hits = self.negative_hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._positive),
+                "negative_entries": len(self._negative),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+            }
+
+
+link_cache = ExternalLinkCache(
+    max_entries=settings.share_cache_size,
+    ttl_seconds=settings.share_cache_ttl_seconds,
+    negative_max_entries=settings.share_cache_negative_size,
+    negative_ttl_seconds=settings.share_cache_negative_ttl_seconds,
+)
@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.audit import add_audit
+from app.config import settings
+from app.dashboard_stats import apply_deltas, link_deltas
+from app.database import SessionLocal
+from app.link_cache import link_cache
+from app.models import ExternalLink
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def expire_links(db: Session, batch_size: int, now: Optional[datetime] = None) -> int:
+    """Mark active links past ``expires_at`` as expired, one bounded batch per transaction.
+
+    Candidates come from the (status, expires_at) index; each batch is a single
+    UPDATE so long sweeps never hold the write lock for more than one batch.
+    """
+    now = now or _utcnow()
+    total = 0
+    while True:
+        rows = db.execute(
+            select(ExternalLink.id, ExternalLink.token)
+            .where(ExternalLink.status == "active", ExternalLink.expires_at <= now)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+
+        result = db.execute(
+            update(ExternalLink)
+            .where(ExternalLink.id.in_([row.id for row in rows]), ExternalLink.status == "active")
+            .values(status="expired")
+            .execution_options(synchronize_session=False)
+        )
+        expired = result.rowcount or 0
+        apply_deltas(db, link_deltas("active", "expired", expired))
+        db.commit()
+        total += expired
+        for row in rows:
+            link_cache.invalidate(row.token)
+        if len(rows) < batch_size:
+            break
+    return total
+
+
+class LinkExpirySweeper:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        interval_seconds: float,
+        batch_size: int,
+    ) -> None:
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.runs = 0
+        self.total_expired = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_expired = 0
+        self.last_error: Optional[str] = None
+
+    def run_once(self) -> int:
+        with self._lock:
+            started = time.perf_counter()
+            run_at = _utcnow()
+            db = self.session_factory()
+            try:
+                expired = expire_links(db, self.batch_size, now=run_at)
+                if expired:
+                    add_audit(
+                        db,
+                        actor_user_id=None,
+                        action="external_links_expired",
+                        target_type="external_link",
+                        target_id="sweep",
+                        metadata={"expired": expired, "as_of": run_at.isoformat()},
+                    )
+                    db.commit()
+                self.last_error = None
+            except Exception as exc:  # noqa: BLE001
+                db.rollback()
+                expired = 0
+                self.last_error = type(exc).__name__
+                logger.exception("External link expiry sweep failed")
+            finally:
+                db.close()
+
+            self.runs += 1
+            self.last_run_at = run_at
+            self.last_duration_ms = round((time.perf_counter() - started) * 1000, 3)
+            self.last_expired = expired
+            self.total_expired += expired
+            return expired
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.run_once()
+
+    def start(self) -> None:
+        if self.interval_seconds <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="link-expiry-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "interval_seconds": self.interval_seconds,
+            "batch_size": self.batch_size,
+            "runs": self.runs,
+            "last_run_at": self.last_run_at,
+            "last_duration_ms": self.last_duration_ms,
+            "last_expired": self.last_expired,
+            "total_expired": self.total_expired,
+            "last_error": self.last_error,
+        }
+
+
+link_sweeper = LinkExpirySweeper(
+    session_factory=SessionLocal,
+    interval_seconds=settings.link_sweep_interval_seconds,
+    batch_size=settings.link_sweep_batch_size,
+)
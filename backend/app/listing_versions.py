@@ -0,0 +1,78 @@
+"""Per-user listing versions for ETag revalidation of ``GET /files``.
+
+Writers bump the version of every user whose ``mine`` or ``shared`` listing
+they change, in the same transaction as the change. A poll whose
+``If-None-Match`` still matches is answered from ``listing_versions`` alone.
+"""
+
+from typing import Iterable
+
+from sqlalchemy import select, union
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import FileRecord, InternalShare, ListingVersion
+
+GLOBAL_USER_ID = 0
+
+
+def _bump_statement(dialect_name: str, user_ids: Iterable[int]):
+    rows = [{"user_id": user_id, "version": 1} for user_id in sorted(set(user_ids))]
+    if not rows:
+        return None
+    if dialect_name == "mysql":
+        statement = mysql.insert(ListingVersion).values(rows)
+        return statement.on_duplicate_key_update(version=ListingVersion.version + 1)
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = dialect_insert(ListingVersion).values(rows)
+    return statement.on_conflict_do_update(index_elements=["user_id"], set_={"version": ListingVersion.version + 1})
+
+
+def bump_versions(db: Session, user_ids: Iterable[int]) -> None:
+    """Bump ``user_ids`` in one upsert; the caller commits along with its own change."""
+    statement = _bump_statement(db.get_bind().dialect.name, user_ids)
+    if statement is not None:
+        db.execute(statement)
+
+
+async def bump_versions_async(db: AsyncSession, user_ids: Iterable[int]) -> None:
+    statement = _bump_statement(db.get_bind().dialect.name, user_ids)
+    if statement is not None:
+        await db.execute(statement)
+
+
+def bump_all(db: Session) -> None:
+    """Invalidate every listing at once, e.g. after a policy recompute."""
+    bump_versions(db, [GLOBAL_USER_ID])
+
+
+def affected_users_query(file_ids: Iterable[int]):
+    """Owners of ``file_ids`` plus everyone they are shared with."""
+    file_ids = list(file_ids)
+    return union(
+        select(FileRecord.owner_user_id).where(FileRecord.id.in_(file_ids)),
+        select(InternalShare.user_id).where(InternalShare.file_id.in_(file_ids)),
+    )
+
+
+def bump_for_files(db: Session, file_ids: Iterable[int]) -> None:
+    file_ids = list(file_ids)
+    if file_ids:
+        bump_versions(db, db.scalars(affected_users_query(file_ids)).all())
+
+
+def _version_query(user_id: int):
+    return select(ListingVersion.user_id, ListingVersion.version).where(
+        ListingVersion.user_id.in_((GLOBAL_USER_ID, user_id))
+    )
+
+
+def _token(rows, user_id: int) -> str:
+    versions = dict(rows)
+    return f"{versions.get(GLOBAL_USER_ID, 0)}.{versions.get(user_id, 0)}"
+
+
+async def listing_version_async(db: AsyncSession, user_id: int) -> str:
+    """``"<global>.<user>"``; both start at 0 until first bumped."""
+    return _token((await db.execute(_version_query(user_id))).all(), user_id)
@@ -1,32 +1,84 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+import time
 
-from app.config import settings
-from app.database import Base, SessionLocal, engine
-from app.routers import admin, auth, files, reports
-from app.seed import seed_demo_data
+_IMPORT_STARTED = time.perf_counter()
+
+import logging  # noqa: E402
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+from fastapi.responses import Response  # noqa: E402
+
+from app import metrics  # noqa: E402
+from app.activity_feed import activity_hub  # noqa: E402
+from app.admission import AdmissionMiddleware  # noqa: E402
+from app.compression import CompressionMiddleware  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.dashboard_stats import stats_reconciler  # noqa: E402
+from app.database import async_engine, async_read_engine, engine, read_engine  # noqa: E402
+from app.link_expiry import link_sweeper  # noqa: E402
+from app.profiling import ProfilingMiddleware  # noqa: E402
+from app.read_your_writes import READ_PRIMARY_HEADER, ReadYourWritesMiddleware  # noqa: E402
+from app.resumable_uploads import upload_sweeper  # noqa: E402
+from app.routers import admin, auth, files, reports, share  # noqa: E402
+from app.storage_backends import get_storage  # noqa: E402
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Secure File Sharing Portal", version="1.0.0")
 
+# Innermost: a saturated worker answers 503 before the upload body is read, and CORS
+# (added after it, so wrapping it) still marks that 503 readable by the frontend.
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After", READ_PRIMARY_HEADER],
 )
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+
+for _engine in (engine, read_engine, async_engine.sync_engine, async_read_engine.sync_engine):
+    metrics.instrument_engine(_engine)
+
+# Includes every subsystem: the routers import them all, so only migrations and seeding are deferred.
+_IMPORTS_MS = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
+startup_report: dict = {"imports_ms": _IMPORTS_MS}
 
 
 @app.on_event("startup")
 def on_startup() -> None:
-    Base.metadata.create_all(bind=engine)
-    settings.upload_path.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    startup_report["mode"] = settings.startup_mode
+
+    if settings.startup_mode == "production":
+        # Schema and demo data are handled once by `python -m app.migrate`, not by every worker.
+        if settings.storage_backend == "local":
+            settings.upload_path.mkdir(parents=True, exist_ok=True)
+    else:
+        from app.migrate import run_migrations
 
-    db = SessionLocal()
-    try:
-        seed_demo_data(db, settings.demo_data_path, settings.upload_path)
-    finally:
-        db.close()
+        startup_report.update(run_migrations(seed=True))
+
+    link_sweeper.start()
+    stats_reconciler.start()
+    upload_sweeper.start()
+
+    startup_report["startup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    startup_report["total_ms"] = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
+    logger.info("Startup complete: %s", startup_report)
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    link_sweeper.stop()
+    stats_reconciler.stop()
+    upload_sweeper.stop()
+    activity_hub.stop()
 
 
 @app.get("/health")
@@ -35,10 +87,18 @@ def health() -> dict:
         "status": "ok",
         "database": settings.database_url,
         "upload_dir": str(settings.upload_path),
+        "storage_backend": get_storage().name,
+        "startup": startup_report,
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint() -> Response:
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
 app.include_router(auth.router)
 app.include_router(files.router)
 app.include_router(admin.router)
 app.include_router(reports.router)
+app.include_router(share.router)
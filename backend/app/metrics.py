@@ -0,0 +1,326 @@
+"""In-process Prometheus-style metrics.
+
+Labels are limited to route templates, status codes, actions and categories;
+never put user input, file names, tokens or scanned values into a label.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, amount: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, amount)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = ([0] * (len(self.buckets) + 1), [0.0])
+                self._values[key] = entry
+            entry[0][index] += 1
+            entry[1][0] += amount
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        lines: list[str] = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                le = 'le="{}"'.format(_format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_seconds = registry.register(
+    Histogram("portal_http_request_seconds", "HTTP request latency by route.", ("method", "route", "status"))
+)
+db_queries_per_request = registry.register(
+    Histogram("portal_db_queries_per_request", "SQL statements issued per HTTP request.", ("route",), COUNT_BUCKETS)
+)
+db_seconds_per_request = registry.register(
+    Histogram("portal_db_seconds_per_request", "Time spent in SQL per HTTP request.", ("route",))
+)
+db_queries_total = registry.register(Counter("portal_db_queries_total", "SQL statements executed."))
+db_query_budget_exceeded_total = registry.register(
+    Counter(
+        "portal_db_query_budget_exceeded_total",
+        "Requests over DB_QUERY_BUDGET or repeating one statement DB_REPEATED_QUERY_THRESHOLD times.",
+        ("route", "reason"),
+    )
+)
+scan_seconds = registry.register(
+    Histogram("portal_scan_seconds", "scan_content duration by file category.", ("category",))
+)
+scan_bytes_total = registry.register(
+    Counter("portal_scan_bytes_total", "Bytes passed to scan_content by file category.", ("category",))
+)
+scan_matches_total = registry.register(
+    Counter("portal_scan_matches_total", "Sensitive-data matches found by detector.", ("detector",))
+)
+password_verify_seconds = registry.register(
+    Histogram("portal_password_verify_seconds", "PBKDF2 time spent in verify_password.")
+)
+audit_rows_total = registry.register(Counter("portal_audit_rows_total", "Audit rows written.", ("action",)))
+upload_bytes_total = registry.register(Counter("portal_upload_bytes_total", "Bytes received through uploads."))
+download_bytes_total = registry.register(
+    Counter("portal_download_bytes_total", "Bytes served by downloads.", ("kind",))
+)
+activity_events_total = registry.register(
+    Counter("portal_activity_events_total", "Audit entries delivered to activity stream subscribers.")
+)
+activity_disconnects_total = registry.register(
+    Counter("portal_activity_disconnects_total", "Activity stream subscribers dropped by the server.", ("reason",))
+)
+compression_input_bytes_total = registry.register(
+    Counter("portal_compression_input_bytes_total", "Response bytes before compression.", ("route", "encoding"))
+)
+compression_output_bytes_total = registry.register(
+    Counter("portal_compression_output_bytes_total", "Response bytes after compression.", ("route", "encoding"))
+)
+compression_cpu_seconds_total = registry.register(
+    Counter("portal_compression_cpu_seconds_total", "CPU time spent compressing responses.", ("encoding",))
+)
+compression_skipped_total = registry.register(
+    Counter("portal_compression_skipped_total", "Responses sent uncompressed to clients that accept it.", ("reason",))
+)
+upload_active = registry.register(Gauge("portal_upload_active", "Upload and scan requests currently admitted."))
+upload_queue_depth = registry.register(Gauge("portal_upload_queue_depth", "Upload requests waiting for a slot."))
+upload_rejected_total = registry.register(
+    Counter("portal_upload_rejected_total", "Upload requests turned away with 503.", ("reason",))
+)
+upload_queue_wait_seconds = registry.register(
+    Histogram("portal_upload_queue_wait_seconds", "Time admitted upload requests spent waiting for a slot.")
+)
+
+
+@dataclass
+class RequestDbStats:
+    queries: int = 0
+    seconds: float = 0.0
+    # Executions per statement text; bound parameters are not part of the key.
+    statements: dict[str, int] = field(default_factory=dict)
+
+    def most_repeated(self) -> tuple[str, int]:
+        if not self.statements:
+            return "", 0
+        statement = max(self.statements, key=self.statements.__getitem__)
+        return statement, self.statements[statement]
+
+
+_request_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    # Kept on the per-statement context: a statement that raises never reaches ``after_cursor_execute``,
+    # and its start time is dropped with the context instead of piling up on the pooled connection.
+    context._metrics_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = getattr(context, "_metrics_query_start", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    db_queries_total.inc()
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+        stats.statements[statement] = stats.statements.get(statement, 0) + 1
+
+
+def instrument_engine(engine: Engine) -> None:
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def check_query_budget(route: str, stats: RequestDbStats) -> list[str]:
+    """Flag requests whose SQL usage suggests an N+1 pattern; returns the reasons logged."""
+    reasons: list[str] = []
+    if settings.db_query_budget and stats.queries > settings.db_query_budget:
+        reasons.append("budget")
+        logger.warning(
+            "Request %s issued %d SQL statements (budget %d)", route, stats.queries, settings.db_query_budget
+        )
+    statement, repeats = stats.most_repeated()
+    if settings.db_repeated_query_threshold and repeats >= settings.db_repeated_query_threshold:
+        reasons.append("repeated")
+        logger.warning(
+            "Request %s repeated one SQL statement %d times (possible N+1): %s",
+            route,
+            repeats,
+            " ".join(statement.split())[:200],
+        )
+    for reason in reasons:
+        db_query_budget_exceeded_total.inc(route=route, reason=reason)
+    return reasons
+
+
+def route_label(scope: dict) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    # Unmatched paths could carry tokens or ids; never use the raw URL as a label.
+    return path or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and per-request DB usage by route template."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stats = RequestDbStats()
+        token = _request_db_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_db_stats.reset(token)
+            route = route_label(scope)
+            http_request_seconds.observe(
+                time.perf_counter() - started, method=scope["method"], route=route, status=str(status_code)
+            )
+            db_queries_per_request.observe(stats.queries, route=route)
+            db_seconds_per_request.observe(stats.seconds, route=route)
+            check_query_budget(route, stats)
+
+
+def count_bytes(chunks: Iterable[bytes], counter: Counter, **labels: str) -> Iterator[bytes]:
+    """Pass chunks through while adding their sizes to ``counter`` as they are sent."""
+    for chunk in chunks:
+        counter.inc(len(chunk), **labels)
+        yield chunk
@@ -0,0 +1,88 @@
+"""One-time schema and storage migration step.
+
+Run before starting workers in production: ``python -m app.migrate`` (add
+``--seed`` to also load the demo users and files).
+"""
+
+import argparse
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.database import Base, SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def create_schema(bind: Engine = engine) -> None:
+    Base.metadata.create_all(bind=bind)
+    # create_all only emits indexes for tables it creates; add newer ones to existing databases.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+    from app.search_index import ensure_search_table
+
+    ensure_search_table(bind)
+
+
+def run_migrations(seed: bool = False) -> dict:
+    """Create missing tables and indexes, move legacy blobs, and optionally seed demo data.
+
+    Returns per-phase timings in milliseconds.
+    """
+    from app.storage_backends import get_storage
+    from app.storage_migration import migrate_legacy_blobs
+
+    timings: dict = {}
+    started = time.perf_counter()
+    needs_scan_backfill = not inspect(engine).has_table("file_scan_counts")
+    create_schema()
+    timings["schema_ms"] = _elapsed_ms(started)
+
+    if settings.storage_backend == "local":
+        settings.upload_path.mkdir(parents=True, exist_ok=True)
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        timings["storage"] = migrate_legacy_blobs(db, get_storage())
+        timings["storage_ms"] = _elapsed_ms(started)
+
+        if needs_scan_backfill:
+            from app.scan_counts import backfill_scan_counts
+
+            started = time.perf_counter()
+            timings["scan_counts"] = backfill_scan_counts(db)
+            timings["scan_counts_ms"] = _elapsed_ms(started)
+
+        if seed:
+            from app.seed import seed_demo_data
+
+            started = time.perf_counter()
+            seed_demo_data(db, settings.demo_data_path, get_storage())
+            timings["seed_ms"] = _elapsed_ms(started)
+    finally:
+        db.close()
+    return timings
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Create or upgrade the portal schema and blob layout.")
+    parser.add_argument("--seed", action="store_true", help="also create demo users and files")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Migration finished: %s", run_migrations(seed=args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -35,14 +36,30 @@ class FileRecord(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     size = Column(Integer, nullable=False)
     content_type = Column(String(128), nullable=False)
-    label = Column(String(64), nullable=False)
+    label = Column(String(64), nullable=False, index=True)
     scan_summary_json = Column(JSON, nullable=False, default={})
     policy_decision = Column(String(16), nullable=False)
     decision_reason = Column(Text, nullable=False)
     storage_path = Column(String(500), nullable=False)
     is_deleted = Column(Boolean, default=False, nullable=False)
 
-    owner = relationship("User")
+    # Relationships never lazy-load; load related rows explicitly in the query so
+    # an accidental per-row access fails instead of becoming an N+1 pattern.
+    owner = relationship("User", lazy="raise_on_sql")
+
+
+class FileScanCount(Base):
+    """Per-category detector counts copied out of ``scan_summary_json`` so filters run in SQL.
+
+    Only categories with at least one match get a row.
+    """
+
+    __tablename__ = "file_scan_counts"
+    __table_args__ = (Index("ix_file_scan_counts_category_count", "category", "count", "file_id"),)
+
+    file_id = Column(Integer, ForeignKey("files.id"), primary_key=True)
+    category = Column(String(32), primary_key=True)
+    count = Column(Integer, nullable=False)
 
 
 class InternalShare(Base):
@@ -55,12 +72,13 @@ class InternalShare(Base):
     permission = Column(String(32), nullable=False, default="read")
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
-    file = relationship("FileRecord")
-    user = relationship("User")
+    file = relationship("FileRecord", lazy="raise_on_sql")
+    user = relationship("User", lazy="raise_on_sql")
 
 
 class ExternalLink(Base):
     __tablename__ = "external_links"
+    __table_args__ = (Index("ix_external_links_status_expires_at", "status", "expires_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     file_id = Column(Integer, ForeignKey("files.id"), nullable=False, index=True)
@@ -71,7 +89,7 @@ class ExternalLink(Base):
     justification = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
-    file = relationship("FileRecord")
+    file = relationship("FileRecord", lazy="raise_on_sql")
 
 
 class AuditLog(Base):
@@ -85,4 +103,46 @@ class AuditLog(Base):
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     metadata_json = Column(JSON, nullable=False, default={})
 
-    actor = relationship("User")
+    actor = relationship("User", lazy="raise_on_sql")
+
+
+class DashboardStat(Base):
+    """Pre-aggregated counters for ``/admin/stats``, maintained by ``app.dashboard_stats``."""
+
+    __tablename__ = "dashboard_stats"
+    __table_args__ = (Index("ix_dashboard_stats_dimension_count", "dimension", "count"),)
+
+    dimension = Column(String(32), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class ListingVersion(Base):
+    """Per-user change counter for file listings, maintained by ``app.listing_versions``.
+
+    ``user_id`` 0 is a global version bumped by changes that touch every listing.
+    """
+
+    __tablename__ = "listing_versions"
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class UploadSession(Base):
+    """An in-progress resumable upload; see ``app.resumable_uploads``.
+
+    Bytes are appended straight to ``storage_path``, so the blob's size is the
+    session's offset. ``updated_at`` drives garbage collection of abandoned sessions.
+    """
+
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(32), primary_key=True)
+    owner_user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    filename = Column(String(255), nullable=False)
+    content_type = Column(String(128), nullable=False)
+    size = Column(Integer, nullable=False)
+    storage_path = Column(String(512), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -1,5 +1,9 @@
+import json
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+from app.config import settings
 
 ACTION_INTERNAL_SHARE = "INTERNAL_SHARE"
 ACTION_EXTERNAL_LINK = "EXTERNAL_LINK"
@@ -8,55 +12,125 @@ DECISION_ALLOW = "allow"
 DECISION_WARN = "warn"
 DECISION_BLOCK = "block"
 
+ACTIONS = (ACTION_INTERNAL_SHARE, ACTION_EXTERNAL_LINK)
+DECISIONS = (DECISION_ALLOW, DECISION_WARN, DECISION_BLOCK)
+WILDCARD_LABEL = "*"
+
+DEFAULT_RULES_PATH = Path(__file__).with_name("policy_rules.json")
+
 
-@dataclass
+@dataclass(frozen=True)
 class PolicyResult:
     decision: str
     reason: str
-    required_fields: list[str]
+    required_fields: tuple[str, ...]
+
+
+def _normalize(label: str) -> str:
+    return label.strip().lower()
+
+
+def _result(entry: dict, where: str) -> PolicyResult:
+    decision = entry.get("decision")
+    if decision not in DECISIONS:
+        raise ValueError(f"{where}: decision must be one of {DECISIONS}, got {decision!r}")
+    if not entry.get("reason"):
+        raise ValueError(f"{where}: reason is required")
+    return PolicyResult(decision, entry["reason"], tuple(entry.get("required_fields", ())))
+
+
+class PolicyTable:
+    """Declarative rules compiled into a single (label, action) -> result lookup.
+
+    Results are immutable and shared between calls. Wildcard (``*``) rules apply
+    to every declared label without an explicit rule for that action, and to
+    labels that are not declared at all.
+    """
+
+    def __init__(self, definition: dict) -> None:
+        self.labels: tuple[str, ...] = tuple(definition.get("labels", ()))
+        if not self.labels:
+            raise ValueError("policy table must declare at least one label")
+        self.rules: tuple[dict, ...] = tuple(definition.get("rules", ()))
+        self.fallback = _result(definition.get("fallback", {}), "fallback")
+
+        explicit: dict[tuple[str, str], PolicyResult] = {}
+        self._wildcards: dict[str, PolicyResult] = {}
+        declared = {_normalize(label) for label in self.labels}
+        for index, rule in enumerate(self.rules):
+            where = f"rule {index}"
+            action = rule.get("action")
+            if action not in ACTIONS:
+                raise ValueError(f"{where}: action must be one of {ACTIONS}, got {action!r}")
+            result = _result(rule, where)
+            for label in rule.get("labels", ()):
+                if label == WILDCARD_LABEL:
+                    if action in self._wildcards:
+                        raise ValueError(f"{where}: duplicate wildcard rule for {action}")
+                    self._wildcards[action] = result
+                    continue
+                key = (_normalize(label), action)
+                if key[0] not in declared:
+                    raise ValueError(f"{where}: label {label!r} is not declared")
+                if key in explicit:
+                    raise ValueError(f"{where}: duplicate rule for ({label!r}, {action})")
+                explicit[key] = result
+
+        # Both the canonical spelling and the normalized form are keys, so the
+        # common case is one dict lookup with no string work.
+        self._compiled: dict[tuple[str, str], PolicyResult] = {}
+        for label in self.labels:
+            for action in ACTIONS:
+                result = explicit.get((_normalize(label), action)) or self._wildcards.get(action)
+                if result is not None:
+                    self._compiled[(label, action)] = result
+                    self._compiled[(_normalize(label), action)] = result
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "PolicyTable":
+        with open(path, encoding="utf-8") as handle:
+            return cls(json.load(handle))
+
+    def evaluate(self, label: str, action: str, context: Optional[Dict[str, Any]] = None) -> PolicyResult:
+        result = self._compiled.get((label, action))
+        if result is None:
+            result = self._compiled.get((_normalize(label), action)) or self._wildcards.get(action)
+        if result is not None:
+            return result
+        if context:
+            return PolicyResult(self.fallback.decision, self.fallback.reason, tuple(context.keys()))
+        return self.fallback
+
+    def evaluate_many(self, labels: Iterable[str], action: str) -> list[PolicyResult]:
+        """Evaluate one action for many labels; each distinct label is resolved once."""
+        resolved: dict[str, PolicyResult] = {}
+        results: list[PolicyResult] = []
+        for label in labels:
+            result = resolved.get(label)
+            if result is None:
+                result = resolved[label] = self.evaluate(label, action)
+            results.append(result)
+        return results
+
+    def summary(self) -> list[dict]:
+        return [
+            {
+                "label": "/".join("All other labels" if label == WILDCARD_LABEL else label for label in rule["labels"]),
+                "action": rule["action"],
+                "decision": rule["decision"],
+                "reason": rule["reason"],
+                "required_fields": list(rule.get("required_fields", ())),
+            }
+            for rule in self.rules
+        ]
+
+
+policy_table = PolicyTable.from_file(settings.policy_rules_path or DEFAULT_RULES_PATH)
 
 
 def evaluate_policy(label: str, action: str, context: Optional[Dict[str, Any]] = None) -> PolicyResult:
-    context = context or {}
-    normalized_label = label.strip().lower()
-
-    if action == ACTION_INTERNAL_SHARE:
-        if normalized_label == "highly confidential":
-            return PolicyResult(
-                decision=DECISION_ALLOW,
-                reason="Highly Confidential files can only be shared to explicit allowlisted users.",
-                required_fields=["target_user_email"],
-            )
-        return PolicyResult(
-            decision=DECISION_ALLOW,
-            reason="Internal sharing is allowed for this classification.",
-            required_fields=[],
-        )
-
-    if action == ACTION_EXTERNAL_LINK:
-        if normalized_label in {"public", "internal"}:
-            return PolicyResult(
-                decision=DECISION_ALLOW,
-                reason="External links allowed with an explicit expiry.",
-                required_fields=["expires_at"],
-            )
-
-        if normalized_label == "confidential":
-            return PolicyResult(
-                decision=DECISION_WARN,
-                reason="Confidential data needs a business justification and expiry before external sharing.",
-                required_fields=["justification", "expires_at"],
-            )
-
-        if normalized_label == "highly confidential":
-            return PolicyResult(
-                decision=DECISION_BLOCK,
-                reason="Highly Confidential data cannot be shared through external links.",
-                required_fields=[],
-            )
-
-    return PolicyResult(
-        decision=DECISION_WARN,
-        reason="Policy fallback triggered. Manual review is recommended.",
-        required_fields=list(context.keys()),
-    )
+    return policy_table.evaluate(label, action, context)
+
+
+def evaluate_many(labels: Iterable[str], action: str) -> list[PolicyResult]:
+    return policy_table.evaluate_many(labels, action)
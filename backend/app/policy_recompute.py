@@ -0,0 +1,81 @@
+"""Recompute stored policy decisions after the rule table changes.
+
+Run after deploying new rules: ``python -m app.policy_recompute`` (or
+``POST /admin/policy/recompute``).
+"""
+
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from app.audit import add_audit
+from app.dashboard_stats import DIM_DECISION, reconcile
+from app.database import SessionLocal
+from app.listing_versions import bump_all
+from app.models import FileRecord
+from app.policy_engine import ACTION_EXTERNAL_LINK, evaluate_many
+
+logger = logging.getLogger(__name__)
+
+
+def recompute_policy_decisions(db: Session, actor_user_id: Optional[int] = None) -> dict:
+    """Bring every file's stored decision in line with the current rules.
+
+    Issues one ``UPDATE files ... WHERE label = ?`` per distinct label, touching
+    only rows whose decision or reason differs, and records one summary audit
+    entry in the same transaction. No ORM rows are loaded.
+    """
+    started = time.perf_counter()
+    labels = list(db.scalars(select(FileRecord.label).distinct()))
+
+    per_label: dict[str, dict] = {}
+    for label, result in zip(labels, evaluate_many(labels, ACTION_EXTERNAL_LINK)):
+        updated = db.execute(
+            update(FileRecord)
+            .where(
+                FileRecord.label == label,
+                or_(FileRecord.policy_decision != result.decision, FileRecord.decision_reason != result.reason),
+            )
+            .values(policy_decision=result.decision, decision_reason=result.reason)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        per_label[label] = {"decision": result.decision, "updated": updated or 0}
+
+    if any(item["updated"] for item in per_label.values()):
+        # Old decisions within a label are mixed, so recount the decision counters from files.
+        reconcile(db, dimensions=(DIM_DECISION,), commit=False)
+        bump_all(db)
+
+    summary = {
+        "action": ACTION_EXTERNAL_LINK,
+        "labels": per_label,
+        "updated": sum(item["updated"] for item in per_label.values()),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+    add_audit(
+        db,
+        actor_user_id=actor_user_id,
+        action="policy_recomputed",
+        target_type="policy",
+        target_id=ACTION_EXTERNAL_LINK,
+        metadata=summary,
+    )
+    db.commit()
+    return summary
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        result = recompute_policy_decisions(db)
+    finally:
+        db.close()
+    logger.info("Policy recompute finished: %s", result)
+
+
+if __name__ == "__main__":
+    main()
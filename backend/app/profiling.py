@@ -0,0 +1,259 @@
+"""Opt-in sampling profiler for individual admin requests.
+
+An admin sends ``X-Profile: 1``; while that request runs, a background thread
+samples the stacks of every thread executing portal code and the aggregated
+result is kept as an artifact under ``/admin/profiles``. Stacks hold code
+locations only, never argument or local values.
+"""
+
+import secrets
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import User
+from app.security import decode_access_token
+
+PROFILE_HEADER = "x-profile"
+APP_ROOT = str(Path(__file__).resolve().parent)
+_PACKAGE_PARENT = str(Path(__file__).resolve().parent.parent)
+MAX_STACK_DEPTH = 128
+TOP_FUNCTIONS = 40
+
+
+def _frame_label(frame) -> str:
+    filename = frame.f_code.co_filename
+    if filename.startswith(_PACKAGE_PARENT):
+        location = filename[len(_PACKAGE_PARENT) + 1 :]
+    else:
+        location = "/".join(Path(filename).parts[-2:])
+    return f"{location}:{frame.f_code.co_name}"
+
+
+class SamplingProfiler:
+    """Collect folded stacks (outermost frame first) from threads running code under ``APP_ROOT``."""
+
+    def __init__(self, interval_seconds: float) -> None:
+        self.interval_seconds = max(interval_seconds, 0.001)
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        own_id = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            labels: list[str] = []
+            in_app = False
+            while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                in_app = in_app or frame.f_code.co_filename.startswith(APP_ROOT)
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            # Idle workers and the event loop between tasks have no portal frames on their stack.
+            if in_app:
+                self.stacks[";".join(reversed(labels))] += 1
+        self.samples += 1
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self._sample()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+@dataclass
+class ProfileArtifact:
+    profile_id: str
+    created_at: datetime
+    method: str
+    route: str
+    status: int
+    duration_ms: float
+    samples: int
+    interval_ms: float
+    stacks: Counter = field(repr=False)
+
+    def summary(self) -> dict:
+        return {
+            "id": self.profile_id,
+            "created_at": self.created_at,
+            "method": self.method,
+            "route": self.route,
+            "status": self.status,
+            "duration_ms": self.duration_ms,
+            "samples": self.samples,
+            "interval_ms": self.interval_ms,
+        }
+
+    def folded(self) -> str:
+        """Brendan Gregg folded-stack format, readable by flamegraph tools."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def report(self) -> str:
+        inclusive: Counter = Counter()
+        exclusive: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            exclusive[frames[-1]] += count
+            for label in set(frames):
+                inclusive[label] += count
+        stacked = sum(self.stacks.values()) or 1
+
+        lines = [
+            f"Profile {self.profile_id}",
+            f"Request: {self.method} {self.route} -> {self.status}",
+            f"Created: {self.created_at.isoformat()}",
+            f"Duration: {self.duration_ms} ms, {self.samples} samples every {self.interval_ms} ms",
+            "Note: samples cover all threads running portal code, including concurrent requests.",
+            "",
+            f"Top {TOP_FUNCTIONS} by inclusive samples:",
+        ]
+        for label, count in inclusive.most_common(TOP_FUNCTIONS):
+            lines.append(f"{count:8d} {count * 100 / stacked:6.1f}%  {label}")
+        lines.extend(["", f"Top {TOP_FUNCTIONS} by self samples:"])
+        for label, count in exclusive.most_common(TOP_FUNCTIONS):
+            lines.append(f"{count:8d} {count * 100 / stacked:6.1f}%  {label}")
+        return "\n".join(lines) + "\n"
+
+
+class ProfileStore:
+    """Bounded artifact history plus a global limit of one profile per interval."""
+
+    def __init__(self, max_artifacts: int, min_interval_seconds: float) -> None:
+        self.min_interval_seconds = min_interval_seconds
+        self._artifacts: deque[ProfileArtifact] = deque(maxlen=max(max_artifacts, 1))
+        self._lock = threading.Lock()
+        self._active = False
+        self._last_started: Optional[float] = None
+        self.rejected = 0
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            too_soon = self._last_started is not None and now - self._last_started < self.min_interval_seconds
+            if self._active or too_soon:
+                self.rejected += 1
+                return False
+            self._active = True
+            self._last_started = now
+            return True
+
+    def release(self, artifact: Optional[ProfileArtifact]) -> None:
+        with self._lock:
+            self._active = False
+            if artifact is not None:
+                self._artifacts.append(artifact)
+
+    def get(self, profile_id: str) -> Optional[ProfileArtifact]:
+        with self._lock:
+            return next((item for item in self._artifacts if item.profile_id == profile_id), None)
+
+    def list(self) -> list[dict]:
+        with self._lock:
+            return [item.summary() for item in reversed(self._artifacts)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._artifacts.clear()
+            self._active = False
+            self._last_started = None
+            self.rejected = 0
+
+
+profile_store = ProfileStore(settings.profile_max_artifacts, settings.profile_min_interval_seconds)
+
+
+async def _is_admin_request(headers: dict) -> bool:
+    scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        user_id = int(decode_access_token(token).get("sub", 0))
+    except Exception:  # noqa: BLE001
+        return False
+    async with AsyncSessionLocal() as db:
+        role = await db.scalar(select(User.role).where(User.id == user_id))
+    return role == "Admin"
+
+
+class ProfilingMiddleware:
+    """Profile requests that carry ``X-Profile`` and a valid admin bearer token."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not settings.profiling_enabled:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        if headers.get(PROFILE_HEADER.encode(), b"").strip().lower() not in (b"1", b"true", b"yes"):
+            await self.app(scope, receive, send)
+            return
+        # Non-admins get no hint that the header means anything.
+        if not await _is_admin_request(headers):
+            await self.app(scope, receive, send)
+            return
+
+        if not profile_store.try_acquire():
+            await self.app(scope, receive, _with_header(send, b"x-profile-skipped", b"rate-limited"))
+            return
+
+        profile_id = secrets.token_hex(8)
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        profiler = SamplingProfiler(settings.profile_sample_interval_ms / 1000)
+        created_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            artifact = ProfileArtifact(
+                profile_id=profile_id,
+                created_at=created_at,
+                method=scope["method"],
+                route=route,
+                status=status_code,
+                duration_ms=round((time.perf_counter() - started) * 1000, 3),
+                samples=profiler.samples,
+                interval_ms=settings.profile_sample_interval_ms,
+                stacks=profiler.stacks,
+            )
+            profile_store.release(artifact)
+
+
+def _with_header(send, name: bytes, value: bytes):
+    async def send_wrapper(message) -> None:
+        if message["type"] == "http.response.start":
+            message = {**message, "headers": [*message.get("headers", []), (name, value)]}
+        await send(message)
+
+    return send_wrapper
@@ -0,0 +1,58 @@
+"""Read-your-writes routing that works across workers.
+
+After a successful mutating request the response carries
+``X-Read-Primary-Until`` (epoch seconds, ``READ_YOUR_WRITES_SECONDS`` ahead).
+The frontend echoes the latest value it received, and ``get_read_db`` sends the
+request to the primary while the value is still current. Which worker served
+the write does not matter. The per-process ``recent_writers`` mark is kept for
+clients that do not echo the header. Both markers are set when the response
+starts, after the endpoint has committed.
+"""
+
+import time
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.config import settings
+from app.database import recent_writers
+
+READ_PRIMARY_HEADER = "X-Read-Primary-Until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+# ``get_current_user`` stores the authenticated id here for the middleware.
+WRITER_STATE_KEY = "writer_user_id"
+
+
+def prefers_primary(headers: Headers, user_id: int, now: Optional[float] = None) -> bool:
+    if recent_writers.recently_wrote(user_id):
+        return True
+    try:
+        until = float(headers.get(READ_PRIMARY_HEADER, ""))
+    except ValueError:
+        return False
+    now = time.time() if now is None else now
+    # Values further out than one window were not issued by us; ignore them.
+    return now < until <= now + settings.read_your_writes_seconds
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                user_id = state.get(WRITER_STATE_KEY)
+                if user_id is not None:
+                    recent_writers.mark(user_id)
+                    until = time.time() + settings.read_your_writes_seconds
+                    MutableHeaders(scope=message)[READ_PRIMARY_HEADER] = f"{until:.3f}"
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,258 @@
+"""Resumable chunked uploads.
+
+A session reserves a storage key up front and every chunk is appended to that
+blob, so the blob's size is the resume offset and finalizing never copies or
+re-reads the file. Each worker keeps the running SHA-256, the incremental scan
+and the search-index prefix for the sessions it has seen; a chunk that lands on
+a worker without that state (restart, no sticky routing) rebuilds it once from
+the bytes already stored.
+
+Resumable blobs are stored uncompressed: ``STORAGE_COMPRESSION`` codecs cannot
+be appended to across requests. Abandoned sessions are removed by
+``UploadSessionSweeper`` after ``UPLOAD_SESSION_TTL_SECONDS`` without a chunk.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import UploadSession
+from app.scanner import IncrementalScanner, searchable_text
+from app.storage_backends import AppendConflict, StorageBackend, get_storage
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def session_expires_at(session: UploadSession) -> datetime:
+    return session.updated_at + timedelta(seconds=settings.upload_session_ttl_seconds)
+
+
+@dataclass(frozen=True)
+class FinishedUpload:
+    sha256: str
+    scan_summary: dict
+    search_text: str
+
+
+class UploadState:
+    """Everything finalize needs, accumulated one chunk at a time."""
+
+    def __init__(self, filename: str, content_type: str) -> None:
+        self.filename = filename
+        self.content_type = content_type
+        self.lock = threading.Lock()
+        # One byte past what ``searchable_text`` reads tells it the prefix was truncated.
+        self._head_limit = settings.search_text_max_chars * 4 + 1
+        self.reset()
+
+    def reset(self) -> None:
+        self.offset = 0
+        self._hash = hashlib.sha256()
+        self._scanner = IncrementalScanner(self.filename, self.content_type)
+        self._head = bytearray()
+
+    def feed(self, data: bytes) -> None:
+        self._hash.update(data)
+        self._scanner.feed(data)
+        if len(self._head) < self._head_limit:
+            self._head += data[: self._head_limit - len(self._head)]
+        self.offset += len(data)
+
+    def finish(self) -> FinishedUpload:
+        return FinishedUpload(
+            sha256=self._hash.hexdigest(),
+            scan_summary=self._scanner.result(),
+            search_text=searchable_text(
+                self.filename, self.content_type, bytes(self._head), settings.search_text_max_chars
+            ),
+        )
+
+
+class UploadStateCache:
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._states: "OrderedDict[str, UploadState]" = OrderedDict()
+        self.rebuilds = 0
+
+    def _get(self, session: UploadSession) -> UploadState:
+        with self._lock:
+            state = self._states.get(session.id)
+            if state is None:
+                state = UploadState(session.filename, session.content_type)
+                self._states[session.id] = state
+                while len(self._states) > max(self.max_entries, 1):
+                    self._states.popitem(last=False)
+            self._states.move_to_end(session.id)
+            return state
+
+    def _catch_up(self, state: UploadState, session: UploadSession, storage: StorageBackend, offset: int) -> None:
+        """Make ``state`` cover exactly the first ``offset`` stored bytes; caller holds ``state.lock``."""
+        if state.offset == offset:
+            return
+        self.rebuilds += 1
+        state.reset()
+        if offset:
+            for chunk in storage.open_range(session.storage_path, 0, offset - 1):
+                state.feed(chunk)
+
+    def append(self, session: UploadSession, storage: StorageBackend, offset: int, data: bytes) -> int:
+        """Append ``data`` at ``offset`` and feed it to the session's state; returns the new offset."""
+        state = self._get(session)
+        with state.lock:
+            if offset != state.offset:
+                # A stale retry must not discard state that still matches the stored bytes.
+                blob = storage.stat(session.storage_path)
+                stored = blob.size if blob else 0
+                if offset != stored:
+                    raise AppendConflict(session.storage_path, stored)
+                self._catch_up(state, session, storage, offset)
+            new_offset = storage.append(session.storage_path, offset, data)
+            state.feed(data)
+            return new_offset
+
+    def finish(self, session: UploadSession, storage: StorageBackend, size: int) -> FinishedUpload:
+        state = self._get(session)
+        with state.lock:
+            self._catch_up(state, session, storage, size)
+            return state.finish()
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            self._states.pop(session_id, None)
+
+
+upload_states = UploadStateCache(settings.upload_state_cache_size)
+
+
+def expire_upload_sessions(
+    db: Session,
+    storage: StorageBackend,
+    ttl_seconds: float,
+    batch_size: int,
+    now: Optional[datetime] = None,
+) -> int:
+    """Delete sessions idle for ``ttl_seconds`` together with their partial blobs."""
+    cutoff = (now or _utcnow()) - timedelta(seconds=ttl_seconds)
+    total = 0
+    while True:
+        rows = db.execute(
+            select(UploadSession.id, UploadSession.storage_path)
+            .where(UploadSession.updated_at <= cutoff)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            storage.delete(row.storage_path)
+            upload_states.discard(row.id)
+        db.execute(
+            delete(UploadSession)
+            .where(UploadSession.id.in_([row.id for row in rows]))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        total += len(rows)
+        if len(rows) < batch_size:
+            break
+    return total
+
+
+class UploadSessionSweeper:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        interval_seconds: float,
+        ttl_seconds: float,
+        batch_size: int,
+    ) -> None:
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.ttl_seconds = ttl_seconds
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.runs = 0
+        self.total_expired = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_expired = 0
+        self.last_error: Optional[str] = None
+
+    def run_once(self) -> int:
+        with self._lock:
+            started = time.perf_counter()
+            run_at = _utcnow()
+            db = self.session_factory()
+            try:
+                expired = expire_upload_sessions(db, get_storage(), self.ttl_seconds, self.batch_size, now=run_at)
+                self.last_error = None
+            except Exception as exc:  # noqa: BLE001
+                db.rollback()
+                expired = 0
+                self.last_error = type(exc).__name__
+                logger.exception("Upload session sweep failed")
+            finally:
+                db.close()
+
+            self.runs += 1
+            self.last_run_at = run_at
+            self.last_duration_ms = round((time.perf_counter() - started) * 1000, 3)
+            self.last_expired = expired
+            self.total_expired += expired
+            return expired
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.run_once()
+
+    def start(self) -> None:
+        if self.interval_seconds <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="upload-session-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "interval_seconds": self.interval_seconds,
+            "ttl_seconds": self.ttl_seconds,
+            "batch_size": self.batch_size,
+            "runs": self.runs,
+            "last_run_at": self.last_run_at,
+            "last_duration_ms": self.last_duration_ms,
+            "last_expired": self.last_expired,
+            "total_expired": self.total_expired,
+            "last_error": self.last_error,
+            "state_rebuilds": upload_states.rebuilds,
+        }
+
+
+upload_sweeper = UploadSessionSweeper(
+    session_factory=SessionLocal,
+    interval_seconds=settings.upload_session_sweep_interval_seconds,
+    ttl_seconds=settings.upload_session_ttl_seconds,
+    batch_size=settings.upload_session_sweep_batch_size,
+)
@@ -1,3 +1,3 @@
-from app.routers import admin, auth, files, reports
+from app.routers import admin, auth, files, reports, share
 
-__all__ = ["admin", "auth", "files", "reports"]
+__all__ = ["admin", "auth", "files", "reports", "share"]
@@ -1,42 +1,203 @@
+from collections import Counter
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
-from app.audit import add_audit
+from app.admission import upload_admission
+from app.audit import add_audit, add_audit_bulk
+from app.dashboard_stats import apply_deltas, read_stats, relabel_deltas, stats_reconciler
 from app.database import get_db
-from app.dependencies import require_admin
+from app.dependencies import get_read_db, require_admin
+from app.link_cache import link_cache
+from app.link_expiry import link_sweeper
+from app.listing_versions import bump_for_files
 from app.models import AuditLog, FileRecord, User
-from app.policy_engine import ACTION_EXTERNAL_LINK, evaluate_policy
-from app.schemas import FileOut, LabelOverrideRequest
+from app.policy_engine import ACTION_EXTERNAL_LINK, evaluate_policy, policy_table
+from app.policy_recompute import recompute_policy_decisions
+from app.profiling import profile_store
+from app.resumable_uploads import upload_sweeper
+from app.scan_counts import CATEGORY_PATTERN, category_filter
+from app.schemas import (
+    BulkLabelOutcome,
+    BulkLabelOverrideOut,
+    BulkLabelOverrideRequest,
+    FileOut,
+    LabelOverrideRequest,
+)
+from app.search_index import reindex_labels
+from app.serializers import FastJSONResponse, file_dicts, select_file_columns, serialize_file
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
-VALID_LABELS = {"Public", "Internal", "Confidential", "Highly Confidential"}
-
-
-def _serialize_file(file_record: FileRecord) -> dict:
-    return {
-        "id": file_record.id,
-        "filename": file_record.filename,
-        "owner_user_id": file_record.owner_user_id,
-        "created_at": file_record.created_at,
-        "size": file_record.size,
-        "content_type": file_record.content_type,
-        "label": file_record.label,
-        "scan_summary_json": file_record.scan_summary_json,
-        "policy_decision": file_record.policy_decision,
-        "decision_reason": file_record.decision_reason,
-        "is_deleted": file_record.is_deleted,
-    }
+VALID_LABELS = set(policy_table.labels)
+MAX_BULK_OVERRIDE_IDS = 50_000
+BULK_OVERRIDE_CHUNK_SIZE = 500
 
 
 @router.get("/files", response_model=list[FileOut])
 def list_all_files(
+    category: Optional[str] = Query(default=None, pattern=CATEGORY_PATTERN),
+    min_count: int = Query(default=1, ge=1),
     db: Session = Depends(get_db),
     admin_user: User = Depends(require_admin),
-) -> list[FileOut]:
+) -> FastJSONResponse:
     _ = admin_user
-    files = db.query(FileRecord).filter(FileRecord.is_deleted.is_(False)).order_by(FileRecord.created_at.desc()).all()
-    return [FileOut(**_serialize_file(file_record)) for file_record in files]
+    query = select_file_columns().where(FileRecord.is_deleted.is_(False))
+    detected = category_filter(category, min_count)
+    if detected is not None:
+        query = query.where(detected)
+    rows = db.execute(query.order_by(FileRecord.created_at.desc())).all()
+    return FastJSONResponse(file_dicts(rows))
+
+
+def _apply_label_chunk(
+    db: Session,
+    file_ids: list[int],
+    label: str,
+    justification: str,
+    admin_user: User,
+) -> list[BulkLabelOutcome]:
+    """Relabel one chunk with a single UPDATE and one executemany of audit rows, then commit."""
+    policy_result = evaluate_policy(label=label, action=ACTION_EXTERNAL_LINK)
+    current = {
+        row.id: row
+        for row in db.execute(
+            select(FileRecord.id, FileRecord.label, FileRecord.policy_decision).where(
+                FileRecord.id.in_(file_ids), FileRecord.is_deleted.is_(False)
+            )
+        )
+    }
+
+    outcomes: list[BulkLabelOutcome] = []
+    changed: list[int] = []
+    audit_entries: list[dict] = []
+    deltas: Counter = Counter()
+    for file_id in file_ids:
+        row = current.get(file_id)
+        if row is None:
+            outcomes.append(BulkLabelOutcome(id=file_id, status="not_found"))
+            continue
+        previous_label = row.label
+        if previous_label == label:
+            outcomes.append(BulkLabelOutcome(id=file_id, status="unchanged", previous_label=previous_label))
+            continue
+        changed.append(file_id)
+        deltas.update(relabel_deltas(previous_label, row.policy_decision, label, policy_result.decision))
+        outcomes.append(BulkLabelOutcome(id=file_id, status="updated", previous_label=previous_label))
+        audit_entries.append(
+            {
+                "actor_user_id": admin_user.id,
+                "action": "label_override",
+                "target_type": "file",
+                "target_id": str(file_id),
+                "metadata": {"from": previous_label, "to": label, "justification": justification, "bulk": True},
+            }
+        )
+        audit_entries.append(
+            {
+                "actor_user_id": admin_user.id,
+                "action": "policy_decision",
+                "target_type": "file",
+                "target_id": str(file_id),
+                "metadata": {
+                    "action": ACTION_EXTERNAL_LINK,
+                    "decision": policy_result.decision,
+                    "reason": policy_result.reason,
+                    "updated_by": "label_override",
+                },
+            }
+        )
+
+    if changed:
+        db.execute(
+            update(FileRecord)
+            .where(FileRecord.id.in_(changed))
+            .values(label=label, policy_decision=policy_result.decision, decision_reason=policy_result.reason)
+            .execution_options(synchronize_session=False)
+        )
+        add_audit_bulk(db, audit_entries)
+        apply_deltas(db, deltas)
+        reindex_labels(db, changed, label)
+        bump_for_files(db, changed)
+    db.commit()
+    link_cache.invalidate_files(changed)
+    return outcomes
+
+
+def _filtered_file_ids(db: Session, payload: BulkLabelOverrideRequest):
+    """Yield chunks of matching file ids using keyset pagination on id."""
+    criteria = [FileRecord.is_deleted.is_(False), FileRecord.label != payload.label.strip()]
+    if payload.filter.label is not None:
+        criteria.append(FileRecord.label == payload.filter.label)
+    if payload.filter.owner_user_id is not None:
+        criteria.append(FileRecord.owner_user_id == payload.filter.owner_user_id)
+
+    last_id = 0
+    while True:
+        chunk = list(
+            db.scalars(
+                select(FileRecord.id)
+                .where(FileRecord.id > last_id, *criteria)
+                .order_by(FileRecord.id)
+                .limit(BULK_OVERRIDE_CHUNK_SIZE)
+            )
+        )
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]
+
+
+@router.post("/files/label-override/bulk", response_model=BulkLabelOverrideOut)
+def bulk_override_label(
+    payload: BulkLabelOverrideRequest,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(require_admin),
+) -> BulkLabelOverrideOut:
+    requested_label = payload.label.strip()
+    if requested_label not in VALID_LABELS:
+        raise HTTPException(status_code=400, detail=f"label must be one of: {sorted(VALID_LABELS)}")
+    justification = payload.justification.strip()
+    if not justification:
+        raise HTTPException(status_code=400, detail="justification is required")
+    if (payload.file_ids is None) == (payload.filter is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of file_ids or filter")
+    if payload.filter is not None and payload.filter.label is None and payload.filter.owner_user_id is None:
+        raise HTTPException(status_code=400, detail="filter needs at least one of label or owner_user_id")
+
+    if payload.file_ids is not None:
+        file_ids = list(dict.fromkeys(payload.file_ids))
+        if len(file_ids) > MAX_BULK_OVERRIDE_IDS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_OVERRIDE_IDS} file ids per request")
+        chunks = (
+            file_ids[start : start + BULK_OVERRIDE_CHUNK_SIZE]
+            for start in range(0, len(file_ids), BULK_OVERRIDE_CHUNK_SIZE)
+        )
+    else:
+        chunks = _filtered_file_ids(db, payload)
+
+    results: list[BulkLabelOutcome] = []
+    truncated = False
+    for chunk in chunks:
+        if len(results) >= MAX_BULK_OVERRIDE_IDS:
+            # Filter matches are capped like explicit lists; repeat the request to continue.
+            truncated = True
+            break
+        results.extend(_apply_label_chunk(db, chunk, requested_label, justification, admin_user))
+
+    counts = {"updated": 0, "unchanged": 0, "not_found": 0}
+    for outcome in results:
+        counts[outcome.status] += 1
+    return BulkLabelOverrideOut(
+        label=requested_label,
+        policy_decision=evaluate_policy(label=requested_label, action=ACTION_EXTERNAL_LINK).decision,
+        results=results,
+        truncated=truncated,
+        **counts,
+    )
 
 
 @router.post("/files/{file_id}/label-override", response_model=FileOut)
@@ -58,6 +219,7 @@ def override_label(
         raise HTTPException(status_code=400, detail="justification is required")
 
     previous_label = file_record.label
+    previous_decision = file_record.policy_decision
     file_record.label = requested_label
 
     policy_result = evaluate_policy(label=file_record.label, action=ACTION_EXTERNAL_LINK)
@@ -90,17 +252,21 @@ def override_label(
             "updated_by": "label_override",
         },
     )
+    apply_deltas(db, relabel_deltas(previous_label, previous_decision, requested_label, policy_result.decision))
+    reindex_labels(db, [file_record.id], requested_label)
+    bump_for_files(db, [file_record.id])
 
     db.commit()
+    link_cache.invalidate_file(file_record.id)
     db.refresh(file_record)
-    return FileOut(**_serialize_file(file_record))
+    return FileOut(**serialize_file(file_record))
 
 
 @router.get("/audit")
 def list_audit_logs(
     limit: int = Query(default=200, ge=1, le=1000),
     offset: int = Query(default=0, ge=0),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     admin_user: User = Depends(require_admin),
 ):
     _ = admin_user
@@ -108,45 +274,79 @@ def list_audit_logs(
     return rows
 
 
+@router.get("/link-sweeper")
+def link_sweeper_status(admin_user: User = Depends(require_admin)):
+    _ = admin_user
+    return link_sweeper.stats()
+
+
+@router.post("/link-sweeper/run")
+def run_link_sweeper(admin_user: User = Depends(require_admin)):
+    _ = admin_user
+    link_sweeper.run_once()
+    return link_sweeper.stats()
+
+
+@router.get("/upload-sweeper")
+def upload_sweeper_status(admin_user: User = Depends(require_admin)):
+    _ = admin_user
+    return upload_sweeper.stats()
+
+
+@router.post("/upload-sweeper/run")
+def run_upload_sweeper(admin_user: User = Depends(require_admin)):
+    _ = admin_user
+    upload_sweeper.run_once()
+    return upload_sweeper.stats()
+
+
+@router.get("/admission")
+def admission_status(admin_user: User = Depends(require_admin)):
+    _ = admin_user
+    return upload_admission.stats()
+
+
+@router.get("/stats")
+def dashboard_stats(db: Session = Depends(get_read_db), admin_user: User = Depends(require_admin)):
+    _ = admin_user
+    return {**read_stats(db), "reconciler": stats_reconciler.stats()}
+
+
+@router.post("/stats/reconcile")
+def reconcile_dashboard_stats(admin_user: User = Depends(require_admin)):
+    _ = admin_user
+    return {**stats_reconciler.run_once(), "reconciler": stats_reconciler.stats()}
+
+
+@router.get("/profiles")
+def list_profiles(admin_user: User = Depends(require_admin)):
+    _ = admin_user
+    return {"profiles": profile_store.list(), "rejected": profile_store.rejected}
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(
+    profile_id: str,
+    format: str = Query(default="text", pattern="^(text|folded)$"),
+    admin_user: User = Depends(require_admin),
+):
+    _ = admin_user
+    artifact = profile_store.get(profile_id)
+    if not artifact:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    body = artifact.folded() if format == "folded" else artifact.report()
+    extension = "folded" if format == "folded" else "txt"
+    return PlainTextResponse(
+        body, headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.{extension}"'}
+    )
+
+
 @router.get("/policy")
 def policy_summary(admin_user: User = Depends(require_admin)):
     _ = admin_user
-    return {
-        "rules": [
-            {
-                "label": "Public/Internal",
-                "action": "INTERNAL_SHARE",
-                "decision": "allow",
-                "reason": "Internal sharing allowed.",
-                "required_fields": [],
-            },
-            {
-                "label": "Public/Internal",
-                "action": "EXTERNAL_LINK",
-                "decision": "allow",
-                "reason": "Expiry is required.",
-                "required_fields": ["expires_at"],
-            },
-            {
-                "label": "Confidential",
-                "action": "EXTERNAL_LINK",
-                "decision": "warn",
-                "reason": "Requires justification and expiry.",
-                "required_fields": ["justification", "expires_at"],
-            },
-            {
-                "label": "Highly Confidential",
-                "action": "INTERNAL_SHARE",
-                "decision": "allow",
-                "reason": "Only explicit allowlist users.",
-                "required_fields": ["target_user_email"],
-            },
-            {
-                "label": "Highly Confidential",
-                "action": "EXTERNAL_LINK",
-                "decision": "block",
-                "reason": "Blocked by policy.",
-                "required_fields": [],
-            },
-        ]
-    }
+    return {"rules": policy_table.summary()}
+
+
+@router.post("/policy/recompute")
+def recompute_policy(db: Session = Depends(get_db), admin_user: User = Depends(require_admin)):
+    return recompute_policy_decisions(db, actor_user_id=admin_user.id)
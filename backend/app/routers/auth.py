@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
 from app.audit import add_audit
-from app.database import get_db
+from app.database import get_async_db
 from app.dependencies import get_current_user
 from app.models import User
 from app.schemas import LoginRequest, TokenResponse, UserOut
@@ -12,11 +14,12 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(payload: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse:
+async def login(payload: LoginRequest, db: AsyncSession = Depends(get_async_db)) -> TokenResponse:
     email = payload.email.strip().lower()
-    user = db.query(User).filter(User.email == email).first()
+    user = await db.scalar(select(User).where(User.email == email))
 
-    if not user or not verify_password(payload.password, user.password_hash):
+    # PBKDF2 is CPU-bound; keep it off the event loop.
+    if not user or not await run_in_threadpool(verify_password, payload.password, user.password_hash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
 
     token = create_access_token({"sub": str(user.id), "role": user.role, "email": user.email})
@@ -29,13 +32,13 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse
         target_id=str(user.id),
         metadata={"email": user.email},
     )
-    db.commit()
+    await db.commit()
 
     return TokenResponse(access_token=token)
 
 
 @router.get("/me", response_model=UserOut)
-def me(current_user: User = Depends(get_current_user)) -> UserOut:
+async def me(current_user: User = Depends(get_current_user)) -> UserOut:
     return UserOut(
         id=current_user.id,
         email=current_user.email,
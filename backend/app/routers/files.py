@@ -1,44 +1,72 @@
 from datetime import datetime, timezone
 import secrets
 import uuid
-from pathlib import Path
+from typing import Optional
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
-from fastapi.responses import FileResponse
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.activity_feed import activity_hub, event_stream
 from app.audit import add_audit
+from app.blob_storage import (
+    ENCODING_GZIP,
+    choose_storage_encoding,
+    encode_stream,
+    iter_blob_range,
+    storage_encoding,
+    storage_suffix,
+)
 from app.config import settings
-from app.database import get_db
-from app.dependencies import get_current_user
-from app.models import AuditLog, ExternalLink, FileRecord, InternalShare, User
+from app.dashboard_stats import apply_deltas_async, file_deltas, link_deltas, share_deltas
+from app.database import get_async_db
+from app.dependencies import get_async_read_db, get_current_user
+from app.http_ranges import (
+    RangeNotSatisfiable,
+    accepts_encoding,
+    content_disposition,
+    http_date,
+    if_none_match,
+    if_range_allows,
+    is_not_modified,
+    make_etag,
+    parse_range_header,
+    range_response,
+)
+from app.link_cache import link_cache
+from app.listing_versions import bump_versions_async, listing_version_async
+from app.metrics import count_bytes, download_bytes_total, upload_bytes_total
+from app.models import AuditLog, ExternalLink, FileRecord, InternalShare, UploadSession, User
 from app.policy_engine import ACTION_EXTERNAL_LINK, ACTION_INTERNAL_SHARE, DECISION_BLOCK, evaluate_policy
-from app.scanner import label_from_scan, scan_content
-from app.schemas import ExternalLinkRequest, FileDetailsOut, FileOut, InternalShareRequest
+from app.resumable_uploads import session_expires_at, upload_states
+from app.scan_counts import CATEGORY_PATTERN, category_filter, store_scan_counts_async
+from app.scanner import label_from_scan, scan_content, searchable_text
+from app.schemas import (
+    ExternalLinkRequest,
+    FileDetailsOut,
+    FileOut,
+    FileSearchOut,
+    InternalShareRequest,
+    UploadFinalizeOut,
+    UploadFinalizeRequest,
+    UploadSessionCreate,
+    UploadSessionOut,
+)
+from app.search_index import index_file_async, search_query
+from app.serializers import FastJSONResponse, file_dicts, select_file_columns, serialize_file
+from app.storage_backends import AppendConflict, get_storage, make_storage_key
 from app.upload_validation import validate_upload_filename
 
 router = APIRouter(prefix="/files", tags=["files"])
 
-
-def _serialize_file(file_record: FileRecord) -> dict:
-    return {
-        "id": file_record.id,
-        "filename": file_record.filename,
-        "owner_user_id": file_record.owner_user_id,
-        "created_at": file_record.created_at,
-        "size": file_record.size,
-        "content_type": file_record.content_type,
-        "label": file_record.label,
-        "scan_summary_json": file_record.scan_summary_json,
-        "policy_decision": file_record.policy_decision,
-        "decision_reason": file_record.decision_reason,
-        "is_deleted": file_record.is_deleted,
-    }
+MAX_DETAILS_BATCH = 200
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
 
-def _get_file_or_404(db: Session, file_id: int) -> FileRecord:
-    file_record = db.query(FileRecord).filter(FileRecord.id == file_id, FileRecord.is_deleted.is_(False)).first()
+async def _get_file_or_404(db: AsyncSession, file_id: int) -> FileRecord:
+    file_record = await db.scalar(select(FileRecord).where(FileRecord.id == file_id, FileRecord.is_deleted.is_(False)))
     if not file_record:
         raise HTTPException(status_code=404, detail="File not found")
     return file_record
@@ -49,55 +77,91 @@ def _ensure_owner_or_admin(file_record: FileRecord, current_user: User) -> None:
         raise HTTPException(status_code=403, detail="Only owner or admin can manage this action")
 
 
-def _can_access_file(db: Session, file_record: FileRecord, user: User) -> bool:
-    if user.role == "Admin" or file_record.owner_user_id == user.id:
-        return True
+def _serialize_share(share: InternalShare, user: User) -> dict:
+    return {
+        "id": share.id,
+        "user_id": user.id,
+        "email": user.email,
+        "permission": share.permission,
+        "created_at": share.created_at,
+    }
 
-    share = (
-        db.query(InternalShare)
-        .filter(InternalShare.file_id == file_record.id, InternalShare.user_id == user.id)
-        .first()
-    )
-    return share is not None
 
+def _serialize_link(link: ExternalLink) -> dict:
+    return {
+        "id": link.id,
+        "token": link.token,
+        "expires_at": link.expires_at,
+        "status": link.status,
+        "created_at": link.created_at,
+        "justification": link.justification,
+    }
 
-@router.post("/upload", response_model=FileOut)
-async def upload_file(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-) -> FileOut:
-    filename = file.filename or "uploaded-file"
 
-    if not validate_upload_filename(filename):
-        raise HTTPException(status_code=400, detail="Only TXT, CSV, and PDF files are allowed")
+def _build_file_details(
+    file_record: FileRecord,
+    shares: list[tuple[InternalShare, User]],
+    external_links: list[ExternalLink],
+) -> FileDetailsOut:
+    payload = serialize_file(file_record)
+    payload["internal_shares"] = [_serialize_share(share, user) for share, user in shares]
+    payload["external_links"] = [_serialize_link(link) for link in external_links]
+    return FileDetailsOut(**payload)
 
-    content = await file.read()
-    content_type = file.content_type or "application/octet-stream"
-    suffix = filename.rsplit(".", 1)[-1].lower()
 
-    settings.upload_path.mkdir(parents=True, exist_ok=True)
-    storage_name = "{}.{}".format(uuid.uuid4().hex, suffix)
-    storage_path = settings.upload_path / storage_name
-    storage_path.write_bytes(content)
+def _parse_id_list(raw: str) -> list[int]:
+    ids: list[int] = []
+    for item in raw.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            value = int(item)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers") from exc
+        if value not in ids:
+            ids.append(value)
+    return ids
+
+
+async def _can_access_file(db: AsyncSession, file_record: FileRecord, user: User) -> bool:
+    if user.role == "Admin" or file_record.owner_user_id == user.id:
+        return True
 
-    scan_summary = scan_content(filename=filename, content_type=content_type, data=content)
+    share = await db.scalar(
+        select(InternalShare.id).where(InternalShare.file_id == file_record.id, InternalShare.user_id == user.id)
+    )
+    return share is not None
+
+
+async def _record_upload(
+    db: AsyncSession,
+    current_user: User,
+    filename: str,
+    content_type: str,
+    size: int,
+    storage_key: str,
+    scan_summary: dict,
+    search_body: str,
+    audit_metadata: Optional[dict] = None,
+) -> FileRecord:
+    """Create the file row for a stored blob plus its audit, stats and index writes; the caller commits."""
     label = label_from_scan(scan_summary)
     policy_result = evaluate_policy(label=label, action=ACTION_EXTERNAL_LINK)
 
     file_record = FileRecord(
         filename=filename,
         owner_user_id=current_user.id,
-        size=len(content),
+        size=size,
         content_type=content_type,
         label=label,
         scan_summary_json=scan_summary,
         policy_decision=policy_result.decision,
         decision_reason=policy_result.reason,
-        storage_path=str(storage_path),
+        storage_path=storage_key,
     )
     db.add(file_record)
-    db.flush()
+    await db.flush()
 
     add_audit(
         db,
@@ -105,7 +169,7 @@ async def upload_file(
         action="upload",
         target_type="file",
         target_id=str(file_record.id),
-        metadata={"filename": filename, "label": label},
+        metadata={"filename": filename, "label": label, **(audit_metadata or {})},
     )
     add_audit(
         db,
@@ -120,120 +184,500 @@ async def upload_file(
             "required_fields": policy_result.required_fields,
         },
     )
+    await apply_deltas_async(db, file_deltas(label, policy_result.decision, current_user.id))
+    await store_scan_counts_async(db, file_record.id, scan_summary)
+    await bump_versions_async(db, [current_user.id])
+    await index_file_async(db, file_record.id, filename, label, scan_summary, search_body)
+    return file_record
+
+
+@router.post("/upload", response_model=FileOut)
+async def upload_file(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+) -> FileOut:
+    filename = file.filename or "uploaded-file"
+
+    if not validate_upload_filename(filename):
+        raise HTTPException(status_code=400, detail="Only TXT, CSV, and PDF files are allowed")
+
+    content_type = file.content_type or "application/octet-stream"
+    suffix = filename.rsplit(".", 1)[-1].lower()
+    encoding = choose_storage_encoding(filename)
+
+    storage_key = make_storage_key("{}.{}{}".format(uuid.uuid4().hex, suffix, storage_suffix(encoding)))
+    buffer = bytearray()
+
+    def _read_chunks():
+        while chunk := file.file.read(UPLOAD_CHUNK_SIZE):
+            buffer.extend(chunk)
+            yield chunk
+
+    await run_in_threadpool(get_storage().put_stream, storage_key, encode_stream(_read_chunks(), encoding))
+    content = bytes(buffer)
+    upload_bytes_total.inc(len(content))
+
+    scan_summary = await run_in_threadpool(scan_content, filename=filename, content_type=content_type, data=content)
+    search_body = searchable_text(filename, content_type, content, settings.search_text_max_chars)
+    file_record = await _record_upload(
+        db, current_user, filename, content_type, len(content), storage_key, scan_summary, search_body
+    )
+
+    await db.commit()
+    await db.refresh(file_record)
+    return FileOut(**serialize_file(file_record))
+
+
+async def _get_upload_session_or_404(db: AsyncSession, upload_id: str, current_user: User) -> UploadSession:
+    session = await db.get(UploadSession, upload_id)
+    if (
+        session is None
+        or session.owner_user_id != current_user.id
+        or session_expires_at(session) <= datetime.utcnow()
+    ):
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return session
+
+
+def _upload_session_out(session: UploadSession, offset: int) -> UploadSessionOut:
+    return UploadSessionOut(
+        id=session.id,
+        filename=session.filename,
+        size=session.size,
+        offset=offset,
+        expires_at=session_expires_at(session),
+    )
 
-    db.commit()
-    db.refresh(file_record)
-    return FileOut(**_serialize_file(file_record))
+
+async def _stored_offset(session: UploadSession) -> int:
+    blob = await run_in_threadpool(get_storage().stat, session.storage_path)
+    return blob.size if blob else 0
+
+
+@router.post("/uploads", response_model=UploadSessionOut, status_code=201)
+async def create_upload_session(
+    payload: UploadSessionCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+) -> UploadSessionOut:
+    if not validate_upload_filename(payload.filename):
+        raise HTTPException(status_code=400, detail="Only TXT, CSV, and PDF files are allowed")
+    if payload.size < 0:
+        raise HTTPException(status_code=400, detail="size must not be negative")
+    if payload.size > settings.upload_session_max_bytes:
+        raise HTTPException(status_code=413, detail="Upload exceeds the maximum resumable upload size")
+    storage = get_storage()
+    if not storage.supports_append:
+        raise HTTPException(status_code=501, detail="Resumable uploads are not supported by this storage backend")
+
+    # Stored uncompressed: a STORAGE_COMPRESSION stream cannot be resumed across requests.
+    suffix = payload.filename.rsplit(".", 1)[-1].lower()
+    storage_key = make_storage_key("{}.{}".format(uuid.uuid4().hex, suffix))
+    await run_in_threadpool(storage.append, storage_key, 0, b"")
+
+    now = datetime.utcnow()
+    session = UploadSession(
+        id=secrets.token_hex(16),
+        owner_user_id=current_user.id,
+        filename=payload.filename,
+        content_type=payload.content_type or "application/octet-stream",
+        size=payload.size,
+        storage_path=storage_key,
+        created_at=now,
+        updated_at=now,
+    )
+    db.add(session)
+    await db.commit()
+    response.headers["Location"] = f"/files/uploads/{session.id}"
+    response.headers["Upload-Offset"] = "0"
+    return _upload_session_out(session, 0)
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadSessionOut)
+async def get_upload_session(
+    upload_id: str,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+) -> UploadSessionOut:
+    session = await _get_upload_session_or_404(db, upload_id, current_user)
+    offset = await _stored_offset(session)
+    response.headers["Upload-Offset"] = str(offset)
+    return _upload_session_out(session, offset)
+
+
+@router.put("/uploads/{upload_id}", response_model=UploadSessionOut)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    response: Response,
+    offset: int = Query(..., ge=0),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+) -> UploadSessionOut:
+    session = await _get_upload_session_or_404(db, upload_id, current_user)
+    # The chunk is buffered whole so a dropped connection never leaves half a chunk behind.
+    body = bytearray()
+    async for piece in request.stream():
+        body += piece
+        if len(body) > settings.upload_chunk_max_bytes:
+            raise HTTPException(status_code=413, detail="Chunk exceeds the maximum chunk size")
+    if offset + len(body) > session.size:
+        raise HTTPException(status_code=400, detail="Chunk extends past the declared upload size")
+
+    try:
+        new_offset = await run_in_threadpool(upload_states.append, session, get_storage(), offset, bytes(body))
+    except AppendConflict as exc:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Upload is at offset {exc.size}",
+            headers={"Upload-Offset": str(exc.size)},
+        ) from exc
+
+    touched = await db.execute(
+        update(UploadSession).where(UploadSession.id == session.id).values(updated_at=datetime.utcnow())
+    )
+    await db.commit()
+    if touched.rowcount != 1:
+        # Aborted or swept while the chunk was being written.
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    response.headers["Upload-Offset"] = str(new_offset)
+    return _upload_session_out(session, new_offset)
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=UploadFinalizeOut)
+async def complete_upload(
+    upload_id: str,
+    payload: Optional[UploadFinalizeRequest] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+) -> UploadFinalizeOut:
+    session = await _get_upload_session_or_404(db, upload_id, current_user)
+    offset = await _stored_offset(session)
+    if offset != session.size:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Upload is incomplete: {offset} of {session.size} bytes received",
+            headers={"Upload-Offset": str(offset)},
+        )
+
+    # Hash, scan and search text were accumulated chunk by chunk; nothing re-reads the blob here.
+    finished = await run_in_threadpool(upload_states.finish, session, get_storage(), session.size)
+    if payload and payload.sha256 and payload.sha256.lower() != finished.sha256:
+        raise HTTPException(status_code=400, detail="sha256 does not match the uploaded bytes")
+
+    # Deleting the session first makes a concurrent second completion a no-op.
+    claimed = await db.execute(delete(UploadSession).where(UploadSession.id == session.id))
+    if claimed.rowcount != 1:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    upload_bytes_total.inc(session.size)
+    file_record = await _record_upload(
+        db,
+        current_user,
+        session.filename,
+        session.content_type,
+        session.size,
+        session.storage_path,
+        finished.scan_summary,
+        finished.search_text,
+        audit_metadata={"sha256": finished.sha256, "resumable": True},
+    )
+
+    await db.commit()
+    upload_states.discard(session.id)
+    await db.refresh(file_record)
+    return UploadFinalizeOut(**serialize_file(file_record), sha256=finished.sha256)
+
+
+@router.delete("/uploads/{upload_id}", status_code=204)
+async def abort_upload(
+    upload_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+) -> Response:
+    session = await _get_upload_session_or_404(db, upload_id, current_user)
+    await db.delete(session)
+    await db.commit()
+    await run_in_threadpool(get_storage().delete, session.storage_path)
+    upload_states.discard(session.id)
+    return Response(status_code=204)
 
 
 @router.get("", response_model=list[FileOut])
-def list_files(
+async def list_files(
+    request: Request,
     scope: str = Query("mine", description="mine|shared|all"),
-    db: Session = Depends(get_db),
+    category: Optional[str] = Query(default=None, pattern=CATEGORY_PATTERN),
+    min_count: int = Query(default=1, ge=1),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_user),
-) -> list[FileOut]:
+) -> Response:
+    headers = {}
+    if scope in ("mine", "shared"):
+        # Read before the listing so a concurrent bump can only make the ETag older than the body.
+        version = await listing_version_async(db, current_user.id)
+        headers = {
+            "ETag": make_etag("files", current_user.id, version, scope, category or "", min_count),
+            "Cache-Control": "private, no-cache",
+        }
+        if if_none_match(request.headers, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
     if scope == "all":
         if current_user.role != "Admin":
             raise HTTPException(status_code=403, detail="Admin role required for scope=all")
-        files = db.query(FileRecord).filter(FileRecord.is_deleted.is_(False)).order_by(FileRecord.created_at.desc()).all()
+        query = select_file_columns().where(FileRecord.is_deleted.is_(False))
     elif scope == "shared":
         file_ids_query = select(InternalShare.file_id).where(InternalShare.user_id == current_user.id)
-        files = (
-            db.query(FileRecord)
-            .filter(FileRecord.id.in_(file_ids_query), FileRecord.is_deleted.is_(False))
-            .order_by(FileRecord.created_at.desc())
-            .all()
-        )
+        query = select_file_columns().where(FileRecord.id.in_(file_ids_query), FileRecord.is_deleted.is_(False))
     else:
-        files = (
-            db.query(FileRecord)
-            .filter(FileRecord.owner_user_id == current_user.id, FileRecord.is_deleted.is_(False))
-            .order_by(FileRecord.created_at.desc())
-            .all()
+        query = select_file_columns().where(
+            FileRecord.owner_user_id == current_user.id, FileRecord.is_deleted.is_(False)
         )
+    detected = category_filter(category, min_count)
+    if detected is not None:
+        query = query.where(detected)
+    rows = (await db.execute(query.order_by(FileRecord.created_at.desc()))).all()
 
-    return [FileOut(**_serialize_file(file_record)) for file_record in files]
+    return FastJSONResponse(file_dicts(rows), headers=headers)
 
 
 @router.get("/activity")
-def recent_activity(
+async def recent_activity(
+    request: Request,
+    response: Response,
     limit: int = Query(default=20, ge=1, le=200),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    query = db.query(AuditLog).order_by(AuditLog.timestamp.desc())
-    if current_user.role != "Admin":
-        query = query.filter(AuditLog.actor_user_id == current_user.id)
-    rows = query.limit(limit).all()
+    visible = [] if current_user.role == "Admin" else [AuditLog.actor_user_id == current_user.id]
+    # Audit rows are append-only, so the newest visible id versions the feed.
+    newest = await db.scalar(select(func.max(AuditLog.id)).where(*visible))
+    headers = {"ETag": make_etag("activity", current_user.id, newest or 0, limit), "Cache-Control": "private, no-cache"}
+    if if_none_match(request.headers, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+    query = select(AuditLog).where(*visible).order_by(AuditLog.timestamp.desc())
+    rows = (await db.scalars(query.limit(limit))).all()
     return rows
 
 
+@router.get("/activity/stream")
+async def stream_activity(
+    request: Request,
+    last_event_id: Optional[int] = Query(default=None, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Server-sent audit entries with ``recent_activity`` visibility; resumes after ``Last-Event-ID``."""
+    header = request.headers.get("last-event-id")
+    if header:
+        try:
+            last_event_id = int(header)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail="Last-Event-ID must be an audit entry id") from exc
+
+    user_id, is_admin = current_user.id, current_user.role == "Admin"
+    # The stream can stay open for hours; give the request's pooled connection back now.
+    await db.close()
+    return StreamingResponse(
+        event_stream(activity_hub, user_id, is_admin, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/search", response_model=FileSearchOut)
+async def search_files(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user),
+) -> FileSearchOut:
+    query = search_query(db, q, current_user, limit, offset)
+    files = (await db.scalars(query)).all() if query is not None else []
+    return FileSearchOut(
+        query=q,
+        limit=limit,
+        offset=offset,
+        results=[FileOut(**serialize_file(file_record)) for file_record in files],
+    )
+
+
+@router.get("/details", response_model=dict[int, FileDetailsOut])
+async def get_file_details_batch(
+    ids: str = Query(..., description="Comma-separated file ids"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+) -> dict[int, FileDetailsOut]:
+    """Return details for several files using a fixed number of queries.
+
+    Unknown, deleted and inaccessible ids are omitted from the result rather
+    than failing the whole batch, so the response never reveals which ids exist.
+    """
+    file_ids = _parse_id_list(ids)
+    if len(file_ids) > MAX_DETAILS_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_DETAILS_BATCH} ids per request")
+    if not file_ids:
+        return {}
+
+    files = (
+        await db.scalars(select(FileRecord).where(FileRecord.id.in_(file_ids), FileRecord.is_deleted.is_(False)))
+    ).all()
+    if not files:
+        return {}
+
+    shares_by_file: dict[int, list[tuple[InternalShare, User]]] = {file_record.id: [] for file_record in files}
+    share_rows = await db.execute(
+        select(InternalShare, User)
+        .join(User, User.id == InternalShare.user_id)
+        .where(InternalShare.file_id.in_(list(shares_by_file)))
+    )
+    for share, user in share_rows:
+        shares_by_file[share.file_id].append((share, user))
+
+    accessible = [
+        file_record
+        for file_record in files
+        if current_user.role == "Admin"
+        or file_record.owner_user_id == current_user.id
+        or any(user.id == current_user.id for _, user in shares_by_file[file_record.id])
+    ]
+    if not accessible:
+        return {}
+
+    links_by_file: dict[int, list[ExternalLink]] = {file_record.id: [] for file_record in accessible}
+    link_rows = await db.scalars(
+        select(ExternalLink)
+        .where(ExternalLink.file_id.in_(list(links_by_file)))
+        .order_by(ExternalLink.created_at.desc())
+    )
+    for link in link_rows:
+        links_by_file[link.file_id].append(link)
+
+    position = {file_id: index for index, file_id in enumerate(file_ids)}
+    return {
+        file_record.id: _build_file_details(file_record, shares_by_file[file_record.id], links_by_file[file_record.id])
+        for file_record in sorted(accessible, key=lambda record: position[record.id])
+    }
+
+
 @router.get("/{file_id}", response_model=FileDetailsOut)
-def get_file(
+async def get_file(
     file_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> FileDetailsOut:
-    file_record = _get_file_or_404(db, file_id)
-    if not _can_access_file(db, file_record, current_user):
+    file_record = await _get_file_or_404(db, file_id)
+    if not await _can_access_file(db, file_record, current_user):
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
     shares = (
-        db.query(InternalShare, User)
-        .join(User, User.id == InternalShare.user_id)
-        .filter(InternalShare.file_id == file_record.id)
-        .all()
-    )
+        await db.execute(
+            select(InternalShare, User)
+            .join(User, User.id == InternalShare.user_id)
+            .where(InternalShare.file_id == file_record.id)
+        )
+    ).all()
 
     external_links = (
-        db.query(ExternalLink)
-        .filter(ExternalLink.file_id == file_record.id)
-        .order_by(ExternalLink.created_at.desc())
-        .all()
-    )
-
-    payload = _serialize_file(file_record)
-    payload["internal_shares"] = [
-        {
-            "id": share.id,
-            "user_id": user.id,
-            "email": user.email,
-            "permission": share.permission,
-            "created_at": share.created_at,
-        }
-        for share, user in shares
-    ]
-    payload["external_links"] = [
-        {
-            "id": link.id,
-            "token": link.token,
-            "expires_at": link.expires_at,
-            "status": link.status,
-            "created_at": link.created_at,
-            "justification": link.justification,
-        }
-        for link in external_links
-    ]
+        await db.scalars(
+            select(ExternalLink)
+            .where(ExternalLink.file_id == file_record.id)
+            .order_by(ExternalLink.created_at.desc())
+        )
+    ).all()
 
-    return FileDetailsOut(**payload)
+    return _build_file_details(file_record, shares, external_links)
 
 
 @router.get("/{file_id}/download")
-def download_file(
+async def download_file(
     file_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    file_record = _get_file_or_404(db, file_id)
-    if not _can_access_file(db, file_record, current_user):
+    file_record = await _get_file_or_404(db, file_id)
+    if not await _can_access_file(db, file_record, current_user):
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    real_path = file_record.storage_path
-    if not real_path:
-        raise HTTPException(status_code=404, detail="Stored file not found")
-    if not Path(real_path).exists():
+    storage = get_storage()
+    storage_key = file_record.storage_path
+    stat = await run_in_threadpool(storage.stat, storage_key) if storage_key else None
+    if stat is None:
         raise HTTPException(status_code=404, detail="Stored file not found")
 
+    encoding = storage_encoding(storage_key)
+    # Gzip blobs can go out as stored when the client accepts gzip and wants the whole body.
+    passthrough = (
+        encoding == ENCODING_GZIP
+        and "range" not in request.headers
+        and accepts_encoding(request.headers.get("accept-encoding"), ENCODING_GZIP)
+    )
+    etag_parts = [file_record.id, file_record.size, int(stat.modified * 1_000_000)]
+    etag = make_etag(*etag_parts, *(["gzip"] if passthrough else []))
+    validators = {
+        "ETag": etag,
+        "Last-Modified": http_date(stat.modified),
+        "Accept-Ranges": "bytes",
+    }
+    if encoding == ENCODING_GZIP:
+        validators["Vary"] = "Accept-Encoding"
+
+    if is_not_modified(request.headers, etag, stat.modified):
+        add_audit(
+            db,
+            actor_user_id=current_user.id,
+            action="download_not_modified",
+            target_type="file",
+            target_id=str(file_record.id),
+            metadata={"filename": file_record.filename},
+        )
+        await db.commit()
+        return Response(status_code=304, headers=validators)
+
+    ranges = None
+    if if_range_allows(request.headers, etag, stat.modified):
+        try:
+            ranges = parse_range_header(request.headers.get("range"), file_record.size)
+        except RangeNotSatisfiable as exc:
+            raise HTTPException(
+                status_code=416,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": str(exc), **validators},
+            ) from exc
+
+    headers = {**validators, "Content-Disposition": content_disposition(file_record.filename)}
+
+    if ranges:
+        add_audit(
+            db,
+            actor_user_id=current_user.id,
+            action="download_partial",
+            target_type="file",
+            target_id=str(file_record.id),
+            metadata={
+                "filename": file_record.filename,
+                "ranges": [[start, end] for start, end in ranges],
+                "bytes": sum(end - start + 1 for start, end in ranges),
+            },
+        )
+        await db.commit()
+        return range_response(
+            lambda start, end: count_bytes(
+                iter_blob_range(storage, storage_key, start, end), download_bytes_total, kind="partial"
+            ),
+            ranges,
+            file_record.size,
+            file_record.content_type,
+            headers,
+        )
+
     add_audit(
         db,
         actor_user_id=current_user.id,
@@ -242,22 +686,31 @@ def download_file(
         target_id=str(file_record.id),
         metadata={"filename": file_record.filename},
     )
-    db.commit()
+    await db.commit()
 
-    return FileResponse(path=real_path, media_type=file_record.content_type, filename=file_record.filename)
+    if passthrough:
+        headers["Content-Encoding"] = ENCODING_GZIP
+        headers["Content-Length"] = str(stat.size)
+        body = storage.open_range(storage_key)
+    else:
+        headers["Content-Length"] = str(file_record.size)
+        body = iter_blob_range(storage, storage_key, 0, file_record.size - 1)
+    return StreamingResponse(
+        count_bytes(body, download_bytes_total, kind="full"), media_type=file_record.content_type, headers=headers
+    )
 
 
 @router.post("/{file_id}/share/internal")
-def add_internal_share(
+async def add_internal_share(
     file_id: int,
     payload: InternalShareRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    file_record = _get_file_or_404(db, file_id)
+    file_record = await _get_file_or_404(db, file_id)
     _ensure_owner_or_admin(file_record, current_user)
 
-    target_user = db.query(User).filter(User.email == payload.email.strip().lower()).first()
+    target_user = await db.scalar(select(User).where(User.email == payload.email.strip().lower()))
     if not target_user:
         raise HTTPException(status_code=404, detail="Target user not found")
 
@@ -266,17 +719,15 @@ def add_internal_share(
     if "target_user_email" in required_fields and not payload.email:
         raise HTTPException(status_code=400, detail="target_user_email is required by policy")
 
-    share = (
-        db.query(InternalShare)
-        .filter(InternalShare.file_id == file_record.id, InternalShare.user_id == target_user.id)
-        .first()
+    share = await db.scalar(
+        select(InternalShare).where(InternalShare.file_id == file_record.id, InternalShare.user_id == target_user.id)
     )
     if share:
         return {"status": "exists", "share_id": share.id}
 
     share = InternalShare(file_id=file_record.id, user_id=target_user.id, permission="read")
     db.add(share)
-    db.flush()
+    await db.flush()
 
     add_audit(
         db,
@@ -298,8 +749,10 @@ def add_internal_share(
         target_id=str(file_record.id),
         metadata={"shared_with_user_id": target_user.id, "shared_with_email": target_user.email},
     )
+    await apply_deltas_async(db, share_deltas(1))
+    await bump_versions_async(db, [target_user.id])
 
-    db.commit()
+    await db.commit()
     return {
         "status": "created",
         "share_id": share.id,
@@ -309,24 +762,22 @@ def add_internal_share(
 
 
 @router.delete("/{file_id}/share/internal/{share_id}")
-def remove_internal_share(
+async def remove_internal_share(
     file_id: int,
     share_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    file_record = _get_file_or_404(db, file_id)
+    file_record = await _get_file_or_404(db, file_id)
     _ensure_owner_or_admin(file_record, current_user)
 
-    share = (
-        db.query(InternalShare)
-        .filter(InternalShare.id == share_id, InternalShare.file_id == file_record.id)
-        .first()
+    share = await db.scalar(
+        select(InternalShare).where(InternalShare.id == share_id, InternalShare.file_id == file_record.id)
     )
     if not share:
         raise HTTPException(status_code=404, detail="Share record not found")
 
-    db.delete(share)
+    await db.delete(share)
 
     add_audit(
         db,
@@ -336,18 +787,20 @@ def remove_internal_share(
         target_id=str(file_record.id),
         metadata={"share_id": share_id, "removed_user_id": share.user_id},
     )
-    db.commit()
+    await apply_deltas_async(db, share_deltas(-1))
+    await bump_versions_async(db, [share.user_id])
+    await db.commit()
     return {"status": "removed", "share_id": share_id}
 
 
 @router.post("/{file_id}/share/external-link")
-def create_external_link(
+async def create_external_link(
     file_id: int,
     payload: ExternalLinkRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    file_record = _get_file_or_404(db, file_id)
+    file_record = await _get_file_or_404(db, file_id)
     _ensure_owner_or_admin(file_record, current_user)
 
     policy_result = evaluate_policy(label=file_record.label, action=ACTION_EXTERNAL_LINK)
@@ -364,7 +817,7 @@ def create_external_link(
                 "reason": policy_result.reason,
             },
         )
-        db.commit()
+        await db.commit()
         raise HTTPException(status_code=403, detail=policy_result.reason)
 
     required_fields = set(policy_result.required_fields)
@@ -391,7 +844,7 @@ def create_external_link(
     )
 
     db.add(link)
-    db.flush()
+    await db.flush()
 
     add_audit(
         db,
@@ -419,8 +872,10 @@ def create_external_link(
             "decision": policy_result.decision,
         },
     )
+    await apply_deltas_async(db, link_deltas(None, link.status))
 
-    db.commit()
+    await db.commit()
+    link_cache.invalidate(link.token)
 
     return {
         "status": "created",
@@ -438,20 +893,24 @@ def create_external_link(
 
 
 @router.post("/{file_id}/share/external-link/{link_id}/revoke")
-def revoke_external_link(
+async def revoke_external_link(
     file_id: int,
     link_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    file_record = _get_file_or_404(db, file_id)
+    file_record = await _get_file_or_404(db, file_id)
     _ensure_owner_or_admin(file_record, current_user)
 
-    link = db.query(ExternalLink).filter(ExternalLink.id == link_id, ExternalLink.file_id == file_record.id).first()
+    link = await db.scalar(
+        select(ExternalLink).where(ExternalLink.id == link_id, ExternalLink.file_id == file_record.id)
+    )
     if not link:
         raise HTTPException(status_code=404, detail="External link not found")
 
+    previous_status = link.status
     link.status = "revoked"
+    await apply_deltas_async(db, link_deltas(previous_status, link.status))
 
     add_audit(
         db,
@@ -461,24 +920,26 @@ def revoke_external_link(
         target_id=str(file_record.id),
         metadata={"link_id": link.id},
     )
-    db.commit()
+    await db.commit()
+    link_cache.invalidate(link.token)
     return {"status": "revoked", "link_id": link.id}
 
 
 @router.get("/{file_id}/audit")
-def file_audit_timeline(
+async def file_audit_timeline(
     file_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    file_record = _get_file_or_404(db, file_id)
-    if not _can_access_file(db, file_record, current_user):
+    file_record = await _get_file_or_404(db, file_id)
+    if not await _can_access_file(db, file_record, current_user):
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
     rows = (
-        db.query(AuditLog)
-        .filter(AuditLog.target_type == "file", AuditLog.target_id == str(file_id))
-        .order_by(AuditLog.timestamp.desc())
-        .all()
-    )
+        await db.scalars(
+            select(AuditLog)
+            .where(AuditLog.target_type == "file", AuditLog.target_id == str(file_id))
+            .order_by(AuditLog.timestamp.desc())
+        )
+    ).all()
     return rows
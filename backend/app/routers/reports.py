@@ -8,7 +8,7 @@ from sqlalchemy.orm import Session
 
 from app.audit import add_audit
 from app.database import get_db
-from app.dependencies import get_current_user, require_admin
+from app.dependencies import get_current_user, get_read_db, require_admin
 from app.models import AuditLog, FileRecord, InternalShare, User
 
 router = APIRouter(prefix="/reports", tags=["reports"])
@@ -27,6 +27,7 @@ def export_audit_csv(
     from_date: date = Query(alias="from"),
     to_date: date = Query(alias="to"),
     db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
     admin_user: User = Depends(require_admin),
 ):
     if to_date < from_date:
@@ -36,7 +37,7 @@ def export_audit_csv(
     end_dt = datetime.combine(to_date + timedelta(days=1), time.min)
 
     rows = (
-        db.query(AuditLog)
+        read_db.query(AuditLog)
         .filter(AuditLog.timestamp >= start_dt, AuditLog.timestamp < end_dt)
         .order_by(AuditLog.timestamp.asc())
         .all()
@@ -75,6 +76,7 @@ def export_audit_csv(
 def export_file_audit_timeline_csv(
     file_id: int,
     db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     file_record = db.query(FileRecord).filter(FileRecord.id == file_id, FileRecord.is_deleted.is_(False)).first()
@@ -94,7 +96,7 @@ def export_file_audit_timeline_csv(
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
     rows = (
-        db.query(AuditLog)
+        read_db.query(AuditLog)
         .filter(AuditLog.target_type == "file", AuditLog.target_id == str(file_record.id))
         .order_by(AuditLog.timestamp.asc())
         .all()
@@ -0,0 +1,85 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.audit import add_audit
+from app.blob_storage import iter_blob_range
+from app.database import get_db
+from app.http_ranges import content_disposition
+from app.link_cache import CachedLink, link_cache
+from app.metrics import count_bytes, download_bytes_total
+from app.models import ExternalLink, FileRecord
+from app.policy_engine import ACTION_EXTERNAL_LINK, DECISION_BLOCK, evaluate_policy
+from app.storage_backends import get_storage
+
+router = APIRouter(prefix="/share", tags=["share"])
+
+MAX_TOKEN_LENGTH = 128
+
+
+def _resolve_link(db: Session, token: str) -> Optional[CachedLink]:
+    found, entry = link_cache.get(token)
+    if found:
+        return entry
+
+    generation = link_cache.generation
+    row = (
+        db.query(ExternalLink, FileRecord)
+        .join(FileRecord, FileRecord.id == ExternalLink.file_id)
+        .filter(ExternalLink.token == token)
+        .first()
+    )
+    if not row:
+        link_cache.put_missing(token)
+        return None
+
+    entry = CachedLink.from_records(*row)
+    link_cache.put(token, entry, generation)
+    return entry
+
+
+def _is_expired(expires_at: datetime) -> bool:
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at <= datetime.now(timezone.utc)
+
+
+@router.get("/{token}")
+def download_shared_file(token: str, db: Session = Depends(get_db)):
+    if len(token) > MAX_TOKEN_LENGTH:
+        raise HTTPException(status_code=404, detail="Link not found")
+
+    link = _resolve_link(db, token)
+    if link is None or link.file_deleted:
+        raise HTTPException(status_code=404, detail="Link not found")
+    if link.status != "active":
+        raise HTTPException(status_code=410, detail="Link is no longer active")
+    if _is_expired(link.expires_at):
+        raise HTTPException(status_code=410, detail="Link has expired")
+
+    policy_result = evaluate_policy(label=link.label, action=ACTION_EXTERNAL_LINK)
+    if policy_result.decision == DECISION_BLOCK:
+        raise HTTPException(status_code=403, detail=policy_result.reason)
+
+    storage = get_storage()
+    if storage.stat(link.storage_path) is None:
+        raise HTTPException(status_code=404, detail="Stored file not found")
+
+    add_audit(
+        db,
+        actor_user_id=None,
+        action="external_link_accessed",
+        target_type="file",
+        target_id=str(link.file_id),
+        metadata={"link_id": link.link_id},
+    )
+    db.commit()
+
+    return StreamingResponse(
+        count_bytes(iter_blob_range(storage, link.storage_path, 0, link.size - 1), download_bytes_total, kind="shared"),
+        media_type=link.content_type,
+        headers={"Content-Disposition": content_disposition(link.filename), "Content-Length": str(link.size)},
+    )
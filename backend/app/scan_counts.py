@@ -0,0 +1,96 @@
+"""Keep ``file_scan_counts`` in step with each file's scan summary.
+
+Backfill files scanned before the table existed with
+``python -m app.scan_counts`` (also run by ``app.migrate`` when it creates the
+table).
+"""
+
+import logging
+from typing import Optional
+
+from sqlalchemy import delete, exists, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import FileRecord, FileScanCount
+from app.scanner import SCAN_CATEGORIES
+
+logger = logging.getLogger(__name__)
+
+# For Query(pattern=...) on list endpoints.
+CATEGORY_PATTERN = "^(" + "|".join(SCAN_CATEGORIES) + ")$"
+
+
+def count_rows(file_id: int, scan_summary: dict) -> list[dict]:
+    counts = scan_summary.get("counts") or {}
+    return [
+        {"file_id": file_id, "category": category, "count": int(counts[category])}
+        for category in SCAN_CATEGORIES
+        if int(counts.get(category) or 0) > 0
+    ]
+
+
+def store_scan_counts(db: Session, file_id: int, scan_summary: dict) -> None:
+    rows = count_rows(file_id, scan_summary)
+    if rows:
+        db.execute(insert(FileScanCount), rows)
+
+
+async def store_scan_counts_async(db: AsyncSession, file_id: int, scan_summary: dict) -> None:
+    rows = count_rows(file_id, scan_summary)
+    if rows:
+        await db.execute(insert(FileScanCount), rows)
+
+
+def category_filter(category: Optional[str], min_count: int):
+    """SQL criterion for files with at least ``min_count`` matches in ``category``, or None."""
+    if category is None:
+        return None
+    if category not in SCAN_CATEGORIES:
+        raise ValueError(f"category must be one of: {list(SCAN_CATEGORIES)}")
+    return exists().where(
+        FileScanCount.file_id == FileRecord.id,
+        FileScanCount.category == category,
+        FileScanCount.count >= min_count,
+    )
+
+
+def backfill_scan_counts(db: Session, batch_size: int = 500) -> dict:
+    """Rebuild count rows from ``scan_summary_json`` for every file, one batch per transaction."""
+    files = 0
+    rows_written = 0
+    last_id = 0
+    while True:
+        batch = db.execute(
+            select(FileRecord.id, FileRecord.scan_summary_json)
+            .where(FileRecord.id > last_id)
+            .order_by(FileRecord.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            break
+        last_id = batch[-1].id
+        ids = [row.id for row in batch]
+        rows = [item for row in batch for item in count_rows(row.id, row.scan_summary_json or {})]
+        db.execute(delete(FileScanCount).where(FileScanCount.file_id.in_(ids)))
+        if rows:
+            db.execute(insert(FileScanCount), rows)
+        db.commit()
+        files += len(batch)
+        rows_written += len(rows)
+    return {"files": files, "rows": rows_written}
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        result = backfill_scan_counts(db)
+    finally:
+        db.close()
+    logger.info("Scan count backfill finished: %s", result)
+
+
+if __name__ == "__main__":
+    main()
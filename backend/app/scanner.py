@@ -1,6 +1,11 @@
+import codecs
 import re
+import time
+from pathlib import PurePosixPath
 from typing import Iterable
 
+from app.metrics import scan_bytes_total, scan_matches_total, scan_seconds
+
 EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
 PHONE_RE = re.compile(r"\b(?:\+?\d{1,2}[\s.-]?)?(?:\(?\d{3}\)?[\s.-]?)\d{3}[\s.-]?\d{4}\b")
 CARD_RE = re.compile(r"\b(?:\d[ -]*?){13,19}\b")
@@ -8,6 +13,16 @@ GENERIC_ID_RE = re.compile(r"\b(?:\d{3}-\d{2}-\d{4}|ID[:\s-]?[A-Za-z0-9]{6,14})\
 
 HIGH_VOLUME_THRESHOLD = 5
 
+SCAN_CATEGORIES = ("emails", "phones", "credit_cards", "generic_ids")
+
+METRIC_FILE_CATEGORIES = {".txt": "txt", ".csv": "csv", ".pdf": "pdf"}
+
+DETECTORS = (("emails", EMAIL_RE), ("phones", PHONE_RE), ("credit_cards", CARD_RE), ("generic_ids", GENERIC_ID_RE))
+
+PDF_PREVIEW_BYTES = 16_384
+# Longest match the incremental scanner expects; text this close to a chunk end waits for the next chunk.
+SCAN_OVERLAP_CHARS = 256
+
 
 def _redact(value: str) -> str:
     value = value.strip()
@@ -37,13 +52,16 @@ def _valid_luhn(number: str) -> bool:
     return checksum % 10 == 0
 
 
+def _is_pdf(filename: str, content_type: str) -> bool:
+    return filename.lower().endswith(".pdf") or content_type == "application/pdf"
+
+
 def _extract_text(filename: str, content_type: str, data: bytes) -> tuple[str, str, list[str]]:
     notes: list[str] = []
-    lowered_name = filename.lower()
 
-    if lowered_name.endswith(".pdf") or content_type == "application/pdf":
+    if _is_pdf(filename, content_type):
         # Minimal parsing only; avoid deep PDF extraction in the first iteration.
-        preview = data[:16_384].decode("latin-1", errors="ignore")
+        preview = data[:PDF_PREVIEW_BYTES].decode("latin-1", errors="ignore")
         text = " ".join(re.findall(r"[A-Za-z0-9@._:\-+]{4,}", preview))
         notes.append("PDF scan is limited to filename and trivial text preview.")
         return text, "limited", notes
@@ -70,36 +88,154 @@ def _summarize_examples(matches: Iterable[str]) -> list[str]:
     return redacted
 
 
-def scan_content(filename: str, content_type: str, data: bytes) -> dict:
-    text, scan_scope, notes = _extract_text(filename, content_type, data)
-    searchable_text = f"{filename} {text}"
-
-    emails = _capture(EMAIL_RE, searchable_text)
-    phones = _capture(PHONE_RE, searchable_text)
-    cards = [match for match in _capture(CARD_RE, searchable_text) if _valid_luhn(match)]
-    generic_ids = _capture(GENERIC_ID_RE, searchable_text)
-
-    categories = {
-        "emails": emails,
-        "phones": phones,
-        "credit_cards": cards,
-        "generic_ids": generic_ids,
-    }
+def _file_category(filename: str) -> str:
+    return METRIC_FILE_CATEGORIES.get(PurePosixPath(filename).suffix.lower(), "other")
 
-    counts = {name: len(values) for name, values in categories.items()}
-    detected = [name for name, count in counts.items() if count > 0]
-    total_matches = sum(counts.values())
 
+def _record_scan(filename: str, seconds: float, size: int, counts: dict[str, int]) -> None:
+    file_category = _file_category(filename)
+    scan_seconds.observe(seconds, category=file_category)
+    scan_bytes_total.inc(size, category=file_category)
+    for name, count in counts.items():
+        if count:
+            scan_matches_total.inc(count, detector=name)
+
+
+def _summary(scan_scope: str, notes: list[str], counts: dict[str, int], examples: dict[str, list[str]]) -> dict:
     return {
         "scan_scope": scan_scope,
         "counts": counts,
-        "examples": {name: _summarize_examples(values) for name, values in categories.items()},
-        "categories_detected": detected,
-        "total_matches": total_matches,
+        "examples": examples,
+        "categories_detected": [name for name, count in counts.items() if count > 0],
+        "total_matches": sum(counts.values()),
         "notes": notes,
     }
 
 
+def _detect(text: str) -> dict[str, list[str]]:
+    return {
+        name: [match for match in _capture(pattern, text) if name != "credit_cards" or _valid_luhn(match)]
+        for name, pattern in DETECTORS
+    }
+
+
+def scan_content(filename: str, content_type: str, data: bytes) -> dict:
+    started = time.perf_counter()
+    text, scan_scope, notes = _extract_text(filename, content_type, data)
+    categories = _detect(f"{filename} {text}")
+    counts = {name: len(values) for name, values in categories.items()}
+    _record_scan(filename, time.perf_counter() - started, len(data), counts)
+    return _summary(
+        scan_scope, notes, counts, {name: _summarize_examples(values) for name, values in categories.items()}
+    )
+
+
+class IncrementalScanner:
+    """``scan_content`` for data that arrives in pieces, such as resumable upload chunks.
+
+    Text is decoded as it arrives and each detector resumes where it stopped, so
+    ``result()`` only has the last ``SCAN_OVERLAP_CHARS`` left to scan. Values
+    split across chunks are still found because text that close to the end is
+    held back until the next chunk. PDFs keep just the preview ``scan_content``
+    reads.
+    """
+
+    def __init__(self, filename: str, content_type: str) -> None:
+        self.filename = filename
+        self.content_type = content_type
+        self.size = 0
+        self.seconds = 0.0
+        self._pdf = _is_pdf(filename, content_type)
+        self._preview = bytearray()
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        self._text = f"{filename} "
+        self._positions = dict.fromkeys(SCAN_CATEGORIES, 0)
+        self._counts = dict.fromkeys(SCAN_CATEGORIES, 0)
+        self._examples: dict[str, list[str]] = {name: [] for name in SCAN_CATEGORIES}
+
+    def feed(self, data: bytes) -> None:
+        started = time.perf_counter()
+        self.size += len(data)
+        if self._pdf:
+            self._preview += data[: max(PDF_PREVIEW_BYTES - len(self._preview), 0)]
+        else:
+            self._text += self._decoder.decode(data)
+            self._scan(final=False)
+        self.seconds += time.perf_counter() - started
+
+    def _scan(self, final: bool) -> None:
+        text = self._text
+        cut = len(text)
+        if not final:
+            limit = len(text) - SCAN_OVERLAP_CHARS
+            if limit <= 0:
+                return
+            # Prefer a whitespace boundary so a word is never matched from its middle.
+            cut = max(text.rfind(ch, 0, limit) for ch in " \t\r\n")
+            if cut <= 0:
+                cut = limit
+        for name, pattern in DETECTORS:
+            position = self._positions[name]
+            for match in pattern.finditer(text, position):
+                if match.start() >= cut:
+                    break
+                position = match.end()
+                self._add(name, match.group(0))
+            self._positions[name] = max(position, cut)
+        # Keep one character before the earliest resume point so ``\b`` still sees its neighbour.
+        keep = max(min(self._positions.values()) - 1, 0)
+        if keep:
+            self._text = text[keep:]
+            self._positions = {name: position - keep for name, position in self._positions.items()}
+
+    def _add(self, name: str, value: str) -> None:
+        if name == "credit_cards" and not _valid_luhn(value):
+            return
+        self._counts[name] += 1
+        examples = self._examples[name]
+        masked = _redact(value)
+        if len(examples) < 3 and masked not in examples:
+            examples.append(masked)
+
+    def result(self) -> dict:
+        started = time.perf_counter()
+        if self._pdf:
+            text, scan_scope, notes = _extract_text(self.filename, self.content_type, bytes(self._preview))
+            categories = _detect(f"{self.filename} {text}")
+            counts = {name: len(values) for name, values in categories.items()}
+            examples = {name: _summarize_examples(values) for name, values in categories.items()}
+        else:
+            self._text += self._decoder.decode(b"", final=True)
+            self._scan(final=True)
+            scan_scope, notes = "full", []
+            counts, examples = dict(self._counts), {name: list(values) for name, values in self._examples.items()}
+        self.seconds += time.perf_counter() - started
+        _record_scan(self.filename, self.seconds, self.size, counts)
+        return _summary(scan_scope, notes, counts, examples)
+
+
+def searchable_text(filename: str, content_type: str, data: bytes, max_chars: int) -> str:
+    """Bounded plain-text excerpt for the search index, with every detector match removed."""
+    if max_chars <= 0:
+        return ""
+    # UTF-8 needs at most four bytes per character, so this prefix always covers max_chars.
+    prefix = data[: max_chars * 4]
+    text, _, _ = _extract_text(filename, content_type, prefix)
+    if len(prefix) < len(data):
+        # A value cut at the prefix boundary might slip past the detectors; drop the partial word.
+        text = text.rsplit(None, 1)[0] if text.strip() else ""
+    for pattern in (EMAIL_RE, CARD_RE, PHONE_RE, GENERIC_ID_RE):
+        text = pattern.sub(" ", text)
+    kept: list[str] = []
+    length = -1
+    for word in text.split():
+        length += len(word) + 1
+        if length > max_chars:
+            break
+        kept.append(word)
+    return " ".join(kept)
+
+
 def label_from_scan(summary: dict) -> str:
     total_matches = int(summary.get("total_matches", 0))
     categories_detected = summary.get("categories_detected", [])
@@ -55,6 +55,34 @@ class LabelOverrideRequest(BaseModel):
     justification: str
 
 
+class BulkLabelFilter(BaseModel):
+    label: Optional[str] = None
+    owner_user_id: Optional[int] = None
+
+
+class BulkLabelOverrideRequest(BaseModel):
+    file_ids: Optional[List[int]] = None
+    filter: Optional[BulkLabelFilter] = None
+    label: str
+    justification: str
+
+
+class BulkLabelOutcome(BaseModel):
+    id: int
+    status: str
+    previous_label: Optional[str] = None
+
+
+class BulkLabelOverrideOut(BaseModel):
+    label: str
+    policy_decision: str
+    updated: int
+    unchanged: int
+    not_found: int
+    truncated: bool = False
+    results: List[BulkLabelOutcome]
+
+
 class AuditOut(BaseModel):
     id: int
     actor_user_id: Optional[int]
@@ -80,11 +108,40 @@ class ExternalLinkOut(BaseModel):
         orm_mode = True
 
 
+class FileSearchOut(BaseModel):
+    query: str
+    limit: int
+    offset: int
+    results: List[FileOut]
+
+
 class FileDetailsOut(FileOut):
     internal_shares: List[Dict[str, Any]]
     external_links: List[ExternalLinkOut]
 
 
+class UploadSessionCreate(BaseModel):
+    filename: str
+    size: int
+    content_type: Optional[str] = None
+
+
+class UploadSessionOut(BaseModel):
+    id: str
+    filename: str
+    size: int
+    offset: int
+    expires_at: datetime
+
+
+class UploadFinalizeRequest(BaseModel):
+    sha256: Optional[str] = None
+
+
+class UploadFinalizeOut(FileOut):
+    sha256: str
+
+
 class PolicySummaryRule(BaseModel):
     label: str
     action: str
@@ -0,0 +1,230 @@
+"""Full-text search over file metadata.
+
+On SQLite the ``file_search`` FTS5 table (rowid = ``files.id``) indexes the
+filename, label, detected categories and a bounded, PII-stripped text excerpt.
+It is created and dropped together with ``files``. Other databases fall back to
+substring matching on filename and label.
+
+Backfill or rebuild existing files with ``python -m app.search_index``.
+"""
+
+import logging
+import re
+from typing import Iterable, Optional, Union
+
+from sqlalchemy import (
+    DDL,
+    Column,
+    Integer,
+    MetaData,
+    Table,
+    Text,
+    delete,
+    event,
+    exists,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.blob_storage import iter_blob_range
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.models import FileRecord, InternalShare, User
+from app.scanner import searchable_text
+from app.storage_backends import StorageBackend, get_storage
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = "file_search"
+# bm25 column weights: filename, label, categories, body.
+RANK_WEIGHTS = (10.0, 5.0, 3.0, 1.0)
+MAX_QUERY_TERMS = 8
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+# Kept out of Base.metadata: create_all cannot emit virtual tables.
+file_search = Table(
+    SEARCH_TABLE,
+    MetaData(),
+    Column("rowid", Integer, primary_key=True),
+    Column("filename", Text),
+    Column("label", Text),
+    Column("categories", Text),
+    Column("body", Text),
+)
+
+_CREATE_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+    "USING fts5(filename, label, categories, body, tokenize='unicode61')"
+)
+event.listen(FileRecord.__table__, "after_create", DDL(_CREATE_DDL).execute_if(dialect="sqlite"))
+event.listen(
+    FileRecord.__table__, "before_drop", DDL(f"DROP TABLE IF EXISTS {SEARCH_TABLE}").execute_if(dialect="sqlite")
+)
+
+AnySession = Union[Session, AsyncSession]
+
+
+def _is_sqlite(db: AnySession) -> bool:
+    return db.get_bind().dialect.name == "sqlite"
+
+
+def ensure_search_table(bind: Engine = engine) -> None:
+    """Create the FTS table on databases whose ``files`` table predates it."""
+    if bind.dialect.name != "sqlite":
+        return
+    with bind.begin() as connection:
+        connection.exec_driver_sql(_CREATE_DDL)
+
+
+def fts_query(raw: str) -> Optional[str]:
+    """Turn free text into a safe FTS5 expression: every term must match as a prefix."""
+    terms = _TERM_RE.findall(raw.lower())[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def index_statements(
+    db: AnySession, file_id: int, filename: str, label: str, scan_summary: dict, body: str = ""
+) -> list:
+    if not _is_sqlite(db):
+        return []
+    return [
+        delete(file_search).where(file_search.c.rowid == file_id),
+        insert(file_search).values(
+            rowid=file_id,
+            filename=filename,
+            label=label,
+            categories=" ".join(scan_summary.get("categories_detected", [])),
+            body=body,
+        ),
+    ]
+
+
+def relabel_statements(db: AnySession, file_ids: Iterable[int], label: str) -> list:
+    file_ids = list(file_ids)
+    if not file_ids or not _is_sqlite(db):
+        return []
+    return [update(file_search).where(file_search.c.rowid.in_(file_ids)).values(label=label)]
+
+
+def index_file(db: Session, file_id: int, filename: str, label: str, scan_summary: dict, body: str = "") -> None:
+    for statement in index_statements(db, file_id, filename, label, scan_summary, body):
+        db.execute(statement)
+
+
+async def index_file_async(
+    db: AsyncSession, file_id: int, filename: str, label: str, scan_summary: dict, body: str = ""
+) -> None:
+    for statement in index_statements(db, file_id, filename, label, scan_summary, body):
+        await db.execute(statement)
+
+
+def reindex_labels(db: Session, file_ids: Iterable[int], label: str) -> None:
+    for statement in relabel_statements(db, file_ids, label):
+        db.execute(statement)
+
+
+def _acl_clause(user: User):
+    if user.role == "Admin":
+        return None
+    shared = exists().where(InternalShare.file_id == FileRecord.id, InternalShare.user_id == user.id)
+    return or_(FileRecord.owner_user_id == user.id, shared)
+
+
+def search_query(db: AnySession, raw_query: str, user: User, limit: int, offset: int) -> Optional[Select]:
+    """Ranked, ACL-filtered page of ``FileRecord`` rows, or None when the query has no terms."""
+    criteria = [FileRecord.is_deleted.is_(False)]
+    acl = _acl_clause(user)
+    if acl is not None:
+        criteria.append(acl)
+
+    if _is_sqlite(db):
+        expression = fts_query(raw_query)
+        if expression is None:
+            return None
+        rank = func.bm25(literal_column(SEARCH_TABLE), *RANK_WEIGHTS)
+        statement = (
+            select(FileRecord)
+            .join(file_search, file_search.c.rowid == FileRecord.id)
+            .where(literal_column(SEARCH_TABLE).op("MATCH")(expression), *criteria)
+            .order_by(rank, FileRecord.id.desc())
+        )
+    else:
+        terms = _TERM_RE.findall(raw_query.lower())[:MAX_QUERY_TERMS]
+        if not terms:
+            return None
+        for term in terms:
+            pattern = f"%{term}%"
+            criteria.append(
+                or_(func.lower(FileRecord.filename).like(pattern), func.lower(FileRecord.label).like(pattern))
+            )
+        statement = select(FileRecord).where(*criteria).order_by(FileRecord.created_at.desc(), FileRecord.id.desc())
+    return statement.limit(limit).offset(offset)
+
+
+def _read_prefix(storage: StorageBackend, record: FileRecord, max_bytes: int) -> bytes:
+    if record.size <= 0:
+        return b""
+    # One byte past the excerpt budget lets searchable_text see that the blob was cut.
+    end = min(record.size, max_bytes + 1) - 1
+    return b"".join(iter_blob_range(storage, record.storage_path, 0, end))
+
+
+def rebuild_search_index(db: Session, storage: StorageBackend, batch_size: int = 200) -> dict:
+    """Rescan stored blobs and (re)index every live file, committing per batch."""
+    if not _is_sqlite(db):
+        return {"indexed": 0, "missing": 0}
+    ensure_search_table(db.get_bind())
+    max_bytes = settings.search_text_max_chars * 4
+    indexed = missing = 0
+    last_id = 0
+    while True:
+        records = list(
+            db.scalars(
+                select(FileRecord)
+                .where(FileRecord.id > last_id, FileRecord.is_deleted.is_(False))
+                .order_by(FileRecord.id)
+                .limit(batch_size)
+            )
+        )
+        if not records:
+            break
+        for record in records:
+            last_id = record.id
+            body = ""
+            if max_bytes > 0:
+                try:
+                    prefix = _read_prefix(storage, record, max_bytes)
+                    body = searchable_text(
+                        record.filename, record.content_type, prefix, settings.search_text_max_chars
+                    )
+                except Exception:  # noqa: BLE001
+                    missing += 1
+                    logger.warning("Blob for file %s could not be read for indexing", record.id)
+            index_file(db, record.id, record.filename, record.label, record.scan_summary_json or {}, body)
+            indexed += 1
+        db.commit()
+    return {"indexed": indexed, "missing": missing}
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        result = rebuild_search_index(db, get_storage())
+    finally:
+        db.close()
+    logger.info("Search index rebuild finished: %s", result)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,12 @@ import hmac
 import json
 import os
 import secrets
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional, Union
 
 from app.config import settings
+from app.metrics import password_verify_seconds
 
 
 def hash_password(password: str, salt: Optional[str] = None) -> str:
@@ -21,7 +23,9 @@ def verify_password(password: str, password_hash: str) -> bool:
         salt, _ = password_hash.split("$", 1)
     except ValueError:
         return False
+    started = time.perf_counter()
     expected = hash_password(password, salt)
+    password_verify_seconds.observe(time.perf_counter() - started)
     return hmac.compare_digest(expected, password_hash)
 
 
@@ -1,15 +1,18 @@
-import shutil
 import uuid
 from pathlib import Path
 
 from sqlalchemy.orm import Session
-from app.audit import add_audit
 
 from app.audit import add_audit
+from app.config import settings
+from app.dashboard_stats import apply_deltas, file_deltas
 from app.models import FileRecord, User
 from app.policy_engine import ACTION_EXTERNAL_LINK, evaluate_policy
-from app.scanner import label_from_scan, scan_content
+from app.scan_counts import store_scan_counts
+from app.scanner import label_from_scan, scan_content, searchable_text
+from app.search_index import index_file
 from app.security import hash_password
+from app.storage_backends import StorageBackend, make_storage_key
 
 
 DEMO_USERS = [
@@ -57,7 +60,7 @@ def _already_seeded(db: Session) -> bool:
     return db.query(FileRecord).count() > 0
 
 
-def seed_demo_data(db: Session, demo_data_dir: Path, upload_dir: Path) -> None:
+def seed_demo_data(db: Session, demo_data_dir: Path, storage: StorageBackend) -> None:
     users = _ensure_users(db)
 
     if _already_seeded(db):
@@ -69,8 +72,6 @@ def seed_demo_data(db: Session, demo_data_dir: Path, upload_dir: Path) -> None:
         db.commit()
         return
 
-    upload_dir.mkdir(parents=True, exist_ok=True)
-
     for file_name in DEMO_FILES:
         source_path = demo_data_dir / file_name
         if not source_path.exists():
@@ -81,9 +82,8 @@ def seed_demo_data(db: Session, demo_data_dir: Path, upload_dir: Path) -> None:
         label = label_from_scan(scan_summary)
         policy = evaluate_policy(label=label, action=ACTION_EXTERNAL_LINK)
 
-        generated_name = f"{uuid.uuid4().hex}_{file_name}"
-        destination = upload_dir / generated_name
-        shutil.copy2(source_path, destination)
+        storage_key = make_storage_key(f"{uuid.uuid4().hex}_{file_name}")
+        storage.put_stream(storage_key, [content])
 
         file_record = FileRecord(
             filename=file_name,
@@ -94,7 +94,7 @@ def seed_demo_data(db: Session, demo_data_dir: Path, upload_dir: Path) -> None:
             scan_summary_json=scan_summary,
             policy_decision=policy.decision,
             decision_reason=policy.reason,
-            storage_path=str(destination),
+            storage_path=storage_key,
         )
         db.add(file_record)
         db.flush()
@@ -107,5 +107,15 @@ def seed_demo_data(db: Session, demo_data_dir: Path, upload_dir: Path) -> None:
             target_id=str(file_record.id),
             metadata={"seeded": True, "label": label},
         )
+        apply_deltas(db, file_deltas(label, policy.decision, owner.id))
+        store_scan_counts(db, file_record.id, scan_summary)
+        index_file(
+            db,
+            file_record.id,
+            file_name,
+            label,
+            scan_summary,
+            searchable_text(file_name, "text/plain", content, settings.search_text_max_chars),
+        )
 
     db.commit()
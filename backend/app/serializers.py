@@ -0,0 +1,85 @@
+"""Serialization shared by the file routes.
+
+Large listings select plain columns instead of ``FileRecord`` instances (no
+identity map, no attribute instrumentation), turn rows into dicts with
+``file_dicts`` and return ``FastJSONResponse`` directly. Routes keep their
+``response_model`` for the OpenAPI schema; FastAPI does not re-validate a
+``Response`` that is returned as-is.
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any, Iterable
+
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+
+from app.models import FileRecord
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - listed in requirements.txt
+    orjson = None
+
+FILE_COLUMNS = (
+    FileRecord.id,
+    FileRecord.filename,
+    FileRecord.owner_user_id,
+    FileRecord.created_at,
+    FileRecord.size,
+    FileRecord.content_type,
+    FileRecord.label,
+    FileRecord.scan_summary_json,
+    FileRecord.policy_decision,
+    FileRecord.decision_reason,
+    FileRecord.is_deleted,
+)
+FILE_FIELDS = tuple(column.key for column in FILE_COLUMNS)
+
+
+def select_file_columns() -> Select:
+    return select(*FILE_COLUMNS)
+
+
+def serialize_file(file_record: FileRecord) -> dict:
+    return {
+        "id": file_record.id,
+        "filename": file_record.filename,
+        "owner_user_id": file_record.owner_user_id,
+        "created_at": file_record.created_at,
+        "size": file_record.size,
+        "content_type": file_record.content_type,
+        "label": file_record.label,
+        "scan_summary_json": file_record.scan_summary_json,
+        "policy_decision": file_record.policy_decision,
+        "decision_reason": file_record.decision_reason,
+        "is_deleted": file_record.is_deleted,
+    }
+
+
+def file_dicts(rows: Iterable[tuple]) -> list[dict]:
+    """Rows from ``select_file_columns()`` as ``FileOut``-shaped dicts."""
+    fields = FILE_FIELDS
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=_json_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response for already-serializable dicts and lists; skips ``jsonable_encoder``."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,306 @@
+import hashlib
+import hmac
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Iterable, Iterator, Optional
+from urllib.error import HTTPError
+from urllib.parse import quote, urlsplit
+from urllib.request import Request, urlopen
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from app.config import settings
+
+CHUNK_SIZE = 64 * 1024
+SHARD_LEVELS = 2
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+
+class StorageError(RuntimeError):
+    pass
+
+
+class AppendConflict(StorageError):
+    """An append's offset did not match the blob's current size."""
+
+    def __init__(self, key: str, size: int) -> None:
+        super().__init__(f"Append to {key!r} expected offset {size}")
+        self.size = size
+
+
+@dataclass(frozen=True)
+class BlobStat:
+    key: str
+    size: int
+    modified: float
+
+
+def make_storage_key(name: str) -> str:
+    """Return a backend-relative key that fans ``name`` out under hash-prefix shards.
+
+    ``ab12...csv`` becomes ``7f/3c/ab12...csv``: 65,536 leaf directories keep
+    each directory small even with millions of blobs.
+    """
+    digest = hashlib.sha256(name.encode("utf-8")).hexdigest()
+    shards = [digest[index * 2 : index * 2 + 2] for index in range(SHARD_LEVELS)]
+    return "/".join([*shards, name])
+
+
+def _validate_key(key: str) -> PurePosixPath:
+    path = PurePosixPath(key)
+    if path.is_absolute() or not key or any(part in ("", ".", "..") for part in path.parts):
+        raise StorageError(f"Invalid storage key: {key!r}")
+    return path
+
+
+class StorageBackend(ABC):
+    name: str
+    supports_append = False
+
+    @abstractmethod
+    def put_stream(self, key: str, chunks: Iterable[bytes]) -> int:
+        """Store ``chunks`` under ``key`` and return the number of bytes written."""
+
+    @abstractmethod
+    def open_range(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yield stored bytes ``start..end`` (inclusive); ``end=None`` reads to the end."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove ``key``; deleting a missing key is not an error."""
+
+    @abstractmethod
+    def stat(self, key: str) -> Optional[BlobStat]:
+        """Return size and modification time, or ``None`` when the key is missing."""
+
+    def append(self, key: str, offset: int, data: bytes) -> int:
+        """Write ``data`` at ``offset`` and return the new size.
+
+        ``offset`` must equal the current size (a missing key has size 0),
+        otherwise ``AppendConflict`` reports the actual size.
+        """
+        raise StorageError(f"The {self.name} storage backend does not support appends")
+
+
+class LocalShardedStorage(StorageBackend):
+    name = "local"
+    supports_append = True
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root.joinpath(*_validate_key(key).parts)
+
+    def put_stream(self, key: str, chunks: Iterable[bytes]) -> int:
+        destination = self._path(key)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        written = 0
+        handle = tempfile.NamedTemporaryFile(dir=destination.parent, prefix=".upload-", delete=False)
+        try:
+            with handle:
+                for chunk in chunks:
+                    handle.write(chunk)
+                    written += len(chunk)
+            os.replace(handle.name, destination)
+        except BaseException:
+            Path(handle.name).unlink(missing_ok=True)
+            raise
+        return written
+
+    def open_range(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        path = self._path(key)
+        remaining = None if end is None else end - start + 1
+        with open(path, "rb") as handle:
+            handle.seek(start)
+            while remaining is None or remaining > 0:
+                chunk = handle.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def stat(self, key: str) -> Optional[BlobStat]:
+        try:
+            result = self._path(key).stat()
+        except FileNotFoundError:
+            return None
+        return BlobStat(key=key, size=result.st_size, modified=result.st_mtime)
+
+    def append(self, key: str, offset: int, data: bytes) -> int:
+        destination = self._path(key)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        with open(destination, "ab") as handle:
+            if fcntl is not None:
+                # Serialises concurrent appends from other workers; released when the handle closes.
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            size = os.fstat(handle.fileno()).st_size
+            if size != offset:
+                raise AppendConflict(key, size)
+            handle.write(data)
+        return offset + len(data)
+
+
+def _sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode("utf-8"), hashlib.sha256).digest()
+
+
+class S3Storage(StorageBackend):
+    """Minimal S3-compatible client (path-style URLs, SigV4) built on the standard library."""
+
+    name = "s3"
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        access_key_id: str,
+        secret_access_key: str,
+        region: str = "us-east-1",
+        timeout: float = 30.0,
+    ) -> None:
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.bucket = bucket
+        self.access_key_id = access_key_id
+        self.secret_access_key = secret_access_key
+        self.region = region
+        self.timeout = timeout
+
+    def _request(
+        self,
+        method: str,
+        key: str,
+        body: Optional[BinaryIO] = None,
+        payload_hash: str = _sha256_hex(b""),
+        headers: Optional[dict[str, str]] = None,
+        content_length: int = 0,
+    ):
+        _validate_key(key)
+        canonical_uri = "/{}/{}".format(quote(self.bucket, safe=""), quote(key, safe="/-_.~"))
+        host = urlsplit(self.endpoint_url).netloc
+        now = datetime.now(timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        scope = f"{now:%Y%m%d}/{self.region}/s3/aws4_request"
+
+        signed = {"host": host, "x-amz-content-sha256": payload_hash, "x-amz-date": amz_date}
+        signed_headers = ";".join(sorted(signed))
+        canonical_request = "\n".join(
+            [
+                method,
+                canonical_uri,
+                "",
+                "".join(f"{name}:{signed[name]}\n" for name in sorted(signed)),
+                signed_headers,
+                payload_hash,
+            ]
+        )
+        string_to_sign = "\n".join(
+            ["AWS4-HMAC-SHA256", amz_date, scope, _sha256_hex(canonical_request.encode("utf-8"))]
+        )
+        signing_key = _hmac(("AWS4" + self.secret_access_key).encode("utf-8"), f"{now:%Y%m%d}")
+        for part in (self.region, "s3", "aws4_request"):
+            signing_key = _hmac(signing_key, part)
+        signature = hmac.new(signing_key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+
+        request_headers = {
+            "x-amz-content-sha256": payload_hash,
+            "x-amz-date": amz_date,
+            "Authorization": (
+                f"AWS4-HMAC-SHA256 Credential={self.access_key_id}/{scope}, "
+                f"SignedHeaders={signed_headers}, Signature={signature}"
+            ),
+            **(headers or {}),
+        }
+        if body is not None:
+            request_headers["Content-Length"] = str(content_length)
+        request = Request(self.endpoint_url + canonical_uri, data=body, method=method, headers=request_headers)
+        return urlopen(request, timeout=self.timeout)  # noqa: S310 - endpoint comes from settings
+
+    def put_stream(self, key: str, chunks: Iterable[bytes]) -> int:
+        # S3 needs the length and payload hash up front, so spool (memory first, then disk).
+        digest = hashlib.sha256()
+        written = 0
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as spool:
+            for chunk in chunks:
+                spool.write(chunk)
+                digest.update(chunk)
+                written += len(chunk)
+            spool.seek(0)
+            try:
+                with self._request("PUT", key, body=spool, payload_hash=digest.hexdigest(), content_length=written):
+                    pass
+            except HTTPError as exc:
+                raise StorageError(f"S3 PUT failed with status {exc.code}") from exc
+        return written
+
+    def open_range(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        headers = {}
+        if start or end is not None:
+            headers["Range"] = f"bytes={start}-{'' if end is None else end}"
+        try:
+            response = self._request("GET", key, headers=headers)
+        except HTTPError as exc:
+            if exc.code == 404:
+                raise FileNotFoundError(key) from exc
+            raise StorageError(f"S3 GET failed with status {exc.code}") from exc
+        with response:
+            while True:
+                chunk = response.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    def delete(self, key: str) -> None:
+        try:
+            with self._request("DELETE", key):
+                pass
+        except HTTPError as exc:
+            if exc.code != 404:
+                raise StorageError(f"S3 DELETE failed with status {exc.code}") from exc
+
+    def stat(self, key: str) -> Optional[BlobStat]:
+        try:
+            with self._request("HEAD", key) as response:
+                size = int(response.headers.get("Content-Length", "0"))
+                last_modified = response.headers.get("Last-Modified")
+        except HTTPError as exc:
+            if exc.code == 404:
+                return None
+            raise StorageError(f"S3 HEAD failed with status {exc.code}") from exc
+        modified = parsedate_to_datetime(last_modified).timestamp() if last_modified else 0.0
+        return BlobStat(key=key, size=size, modified=modified)
+
+
+@lru_cache(maxsize=1)
+def get_storage() -> StorageBackend:
+    backend = settings.storage_backend.strip().lower()
+    if backend == "local":
+        return LocalShardedStorage(settings.upload_path)
+    if backend == "s3":
+        if not settings.s3_endpoint_url or not settings.s3_bucket:
+            raise StorageError("S3_ENDPOINT_URL and S3_BUCKET are required when STORAGE_BACKEND=s3")
+        return S3Storage(
+            endpoint_url=settings.s3_endpoint_url,
+            bucket=settings.s3_bucket,
+            access_key_id=settings.s3_access_key_id,
+            secret_access_key=settings.s3_secret_access_key,
+            region=settings.s3_region,
+        )
+    raise StorageError("STORAGE_BACKEND must be one of: local, s3")
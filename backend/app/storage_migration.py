@@ -0,0 +1,84 @@
+"""Move blobs recorded as absolute filesystem paths into the configured storage backend.
+
+Run once after upgrading: ``python -m app.storage_migration``.
+"""
+
+import logging
+from pathlib import Path, PureWindowsPath
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import FileRecord
+from app.storage_backends import CHUNK_SIZE, StorageBackend, get_storage, make_storage_key
+
+logger = logging.getLogger(__name__)
+
+
+def is_legacy_storage_path(value: str) -> bool:
+    return Path(value).is_absolute() or PureWindowsPath(value).is_absolute()
+
+
+def _read_chunks(path: Path):
+    with open(path, "rb") as handle:
+        while chunk := handle.read(CHUNK_SIZE):
+            yield chunk
+
+
+def migrate_legacy_blobs(db: Session, storage: StorageBackend, batch_size: int = 100) -> dict:
+    """Copy legacy blobs to sharded backend keys, update records, then delete the originals.
+
+    Each batch commits before its source files are removed, so an interrupted
+    run can simply be restarted.
+    """
+    moved = 0
+    missing = 0
+    last_id = 0
+    legacy_filter = or_(FileRecord.storage_path.like("/%"), FileRecord.storage_path.like("_:%"))
+
+    while True:
+        rows = db.execute(
+            select(FileRecord.id, FileRecord.storage_path)
+            .where(FileRecord.id > last_id, legacy_filter)
+            .order_by(FileRecord.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+
+        moved_sources: list[Path] = []
+        for row in rows:
+            last_id = row.id
+            if not is_legacy_storage_path(row.storage_path):
+                continue
+            source = Path(row.storage_path)
+            if not source.exists():
+                missing += 1
+                logger.warning("Legacy blob for file %s is missing", row.id)
+                continue
+            key = make_storage_key(source.name)
+            storage.put_stream(key, _read_chunks(source))
+            db.execute(update(FileRecord).where(FileRecord.id == row.id).values(storage_path=key))
+            moved_sources.append(source)
+
+        db.commit()
+        for source in moved_sources:
+            source.unlink(missing_ok=True)
+        moved += len(moved_sources)
+
+    return {"moved": moved, "missing": missing}
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        result = migrate_legacy_blobs(db, get_storage())
+    finally:
+        db.close()
+    logger.info("Storage migration finished: %s", result)
+
+
+if __name__ == "__main__":
+    main()
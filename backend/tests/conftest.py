@@ -0,0 +1,147 @@
+import os
+import tempfile
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+_TEST_ROOT = Path(tempfile.mkdtemp(prefix="portal-tests-"))
+os.environ["DATABASE_URL"] = f"sqlite:///{_TEST_ROOT / 'test.db'}"
+os.environ["UPLOAD_DIR"] = str(_TEST_ROOT / "uploads")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.database import Base, SessionLocal, async_engine, engine, recent_writers  # noqa: E402
+from app.link_cache import link_cache  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import FileRecord, User  # noqa: E402
+from app.security import create_access_token, hash_password  # noqa: E402
+from app.storage_backends import get_storage, make_storage_key  # noqa: E402
+
+TEST_PASSWORD = "Password123!"
+_PASSWORD_HASH = hash_password(TEST_PASSWORD)
+
+
+@pytest.fixture()
+def db_session():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    link_cache.clear()
+    recent_writers.clear()
+    settings.upload_path.mkdir(parents=True, exist_ok=True)
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture()
+def client(db_session):
+    return TestClient(app)
+
+
+@pytest.fixture()
+def make_user(db_session):
+    def _make_user(email: str, role: str = "User") -> User:
+        user = User(email=email, password_hash=_PASSWORD_HASH, role=role)
+        db_session.add(user)
+        db_session.commit()
+        return user
+
+    return _make_user
+
+
+@pytest.fixture()
+def make_file(db_session):
+    def _make_file(owner: User, filename: str = "notes.txt", content: bytes = b"hello world", label: str = "Internal"):
+        storage_key = make_storage_key(f"{owner.id}-{filename}")
+        get_storage().put_stream(storage_key, [content])
+        file_record = FileRecord(
+            filename=filename,
+            owner_user_id=owner.id,
+            size=len(content),
+            content_type="text/plain",
+            label=label,
+            scan_summary_json={},
+            policy_decision="allow",
+            decision_reason="test fixture",
+            storage_path=storage_key,
+        )
+        db_session.add(file_record)
+        db_session.commit()
+        return file_record
+
+    return _make_file
+
+
+@pytest.fixture()
+def upload_file(client):
+    """Upload through ``POST /files/upload`` so the scan, counts, index and versions are all written."""
+
+    def _upload_file(headers: dict, filename: str, content: bytes = b"quarterly notes") -> dict:
+        response = client.post("/files/upload", headers=headers, files={"file": (filename, content, "text/plain")})
+        assert response.status_code == 200
+        return response.json()
+
+    return _upload_file
+
+
+@pytest.fixture()
+def auth_headers():
+    def _auth_headers(user: User) -> dict:
+        token = create_access_token({"sub": str(user.id), "role": user.role, "email": user.email})
+        return {"Authorization": f"Bearer {token}"}
+
+    return _auth_headers
+
+
+class QueryCounter:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated_selects(self, start: int = 0) -> list[tuple[str, int]]:
+        selects = Counter(
+            statement for statement in self.statements[start:] if statement.lstrip().upper().startswith("SELECT")
+        )
+        return [(statement, times) for statement, times in selects.most_common() if times > 1]
+
+
+@pytest.fixture()
+def count_queries():
+    counter = QueryCounter()
+    engines = (engine, async_engine.sync_engine)
+    for target in engines:
+        event.listen(target, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", counter)
+
+
+@pytest.fixture()
+def query_budget(count_queries):
+    """``with query_budget(5): client.get(...)`` fails on more than 5 statements or any repeated SELECT."""
+
+    @contextmanager
+    def _query_budget(max_queries: int):
+        start = count_queries.count
+        yield count_queries
+        statements = count_queries.statements[start:]
+        assert len(statements) <= max_queries, f"{len(statements)} SQL statements (budget {max_queries}):\n" + (
+            "\n".join(statements)
+        )
+        repeated = count_queries.repeated_selects(start)
+        assert not repeated, f"Repeated SELECT (possible N+1): {repeated[0]}"
+
+    return _query_budget
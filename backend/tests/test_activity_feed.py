@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app import activity_feed, metrics
+from app.activity_feed import ActivityHub, event_stream
+from app.audit import add_audit
+from app.config import settings
+from app.database import async_database_url
+from app.models import AuditLog
+
+
+@pytest.fixture()
+def make_hub(db_session):
+    def _make_hub(client_buffer: int = 10, reorder_window: int = 0) -> ActivityHub:
+        # NullPool: aiosqlite connections are bound to the event loop that opened them.
+        feed_engine = create_async_engine(async_database_url(settings.database_url), poolclass=NullPool)
+        factory = async_sessionmaker(feed_engine, expire_on_commit=False, class_=AsyncSession)
+        return ActivityHub(
+            factory, poll_interval_seconds=60, client_buffer=client_buffer, reorder_window=reorder_window
+        )
+
+    return _make_hub
+
+
+def _audit(db_session, actor_id: int, action: str = "upload") -> int:
+    entry = add_audit(db_session, actor_user_id=actor_id, action=action, target_type="file", target_id="1")
+    db_session.commit()
+    return entry.id
+
+
+async def _next(stream, timeout: float = 1.0) -> str:
+    return await asyncio.wait_for(stream.__anext__(), timeout)
+
+
+def test_entries_fan_out_with_activity_visibility(db_session, make_user, make_hub):
+    owner = make_user("feed-owner@example.com")
+    other = make_user("feed-other@example.com")
+    admin = make_user("feed-admin@example.com", role="Admin")
+    hub = make_hub()
+
+    async def scenario():
+        streams = [event_stream(hub, user.id, user.role == "Admin", None, 0.05) for user in (owner, other, admin)]
+        for stream in streams:
+            assert (await _next(stream)).startswith("retry:")
+        entry_id = _audit(db_session, owner.id)
+        await hub.poll_once()
+        frames = [await _next(stream) for stream in streams]
+        for stream in streams:
+            await stream.aclose()
+        hub.stop()
+        return entry_id, frames
+
+    entry_id, (owner_frame, other_frame, admin_frame) = asyncio.run(scenario())
+
+    assert owner_frame.startswith(f"id: {entry_id}\nevent: audit\ndata: ")
+    assert '"action":"upload"' in owner_frame
+    assert admin_frame == owner_frame
+    assert other_frame == ": keep-alive\n\n"
+
+
+def test_reconnect_replays_missed_entries_in_order(db_session, make_user, make_hub):
+    owner = make_user("feed-resume@example.com")
+    stranger = make_user("feed-stranger@example.com")
+    first, second, third = (_audit(db_session, owner.id, action) for action in ("upload", "download", "share"))
+    hub = make_hub()
+
+    async def scenario():
+        stream = event_stream(hub, owner.id, False, first, 0.05)
+        frames = [await _next(stream) for _ in range(3)]
+        await stream.aclose()
+        stranger_stream = event_stream(hub, stranger.id, False, first, 0.05)
+        stranger_frames = [await _next(stranger_stream) for _ in range(2)]
+        await stranger_stream.aclose()
+        hub.stop()
+        return frames, stranger_frames
+
+    frames, stranger_frames = asyncio.run(scenario())
+
+    assert [frame.split("\n", 1)[0] for frame in frames[1:]] == [f"id: {second}", f"id: {third}"]
+    assert stranger_frames[1] == ": keep-alive\n\n"
+
+
+
+def test_entry_committed_behind_the_cursor_is_published_once(db_session, make_user, make_hub):
+    owner = make_user("feed-reorder@example.com")
+    tip = _audit(db_session, owner.id)
+    hub = make_hub(reorder_window=10)
+
+    def commit_with_id(entry_id: int) -> None:
+        entry = AuditLog(id=entry_id, actor_user_id=owner.id, action="upload", target_type="file", target_id="1")
+        db_session.add(entry)
+        db_session.commit()
+
+    async def scenario():
+        stream = event_stream(hub, owner.id, False, None, 0.05)
+        await _next(stream)
+        # ``tip + 1`` was handed out first but commits after ``tip + 2``, as PostgreSQL allows.
+        commit_with_id(tip + 2)
+        await hub.poll_once()
+        commit_with_id(tip + 1)
+        await hub.poll_once()
+        await hub.poll_once()
+        frames = [await _next(stream) for _ in range(3)]
+        await stream.aclose()
+        hub.stop()
+        return frames
+
+    frames = asyncio.run(scenario())
+
+    assert [frame.split("\n", 1)[0] for frame in frames] == [f"id: {tip + 2}", f"id: {tip + 1}", ": keep-alive"]
+
+
+def test_slow_consumer_is_disconnected_when_buffer_fills(db_session, make_user, make_hub):
+    owner = make_user("feed-slow@example.com")
+    hub = make_hub(client_buffer=2)
+    dropped = metrics.activity_disconnects_total.value(reason="buffer_full")
+
+    async def scenario():
+        stream = event_stream(hub, owner.id, False, None, 0.05)
+        await _next(stream)
+        for _ in range(3):
+            _audit(db_session, owner.id)
+        await hub.poll_once()
+        frames = [frame async for frame in stream]
+        hub.stop()
+        return frames
+
+    frames = asyncio.run(scenario())
+
+    assert len(frames) == 2
+    assert metrics.activity_disconnects_total.value(reason="buffer_full") == dropped + 1
+
+
+def test_audit_commits_wake_the_shared_hub(db_session, make_user, monkeypatch):
+    owner = make_user("feed-wake@example.com")
+    wakes = []
+    monkeypatch.setattr(activity_feed.activity_hub, "notify", lambda: wakes.append(True))
+
+    _audit(db_session, owner.id)
+    db_session.commit()
+
+    assert wakes == [True]
+
+
+def test_stream_rejects_malformed_last_event_id(client, make_user, auth_headers):
+    headers = auth_headers(make_user("feed-header@example.com"))
+
+    response = client.get("/files/activity/stream", headers={**headers, "Last-Event-ID": "abc"})
+
+    assert response.status_code == 400
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from app import metrics
+from app.admission import AdmissionController, AdmissionRejected, upload_admission
+
+
+def _controller(**overrides) -> AdmissionController:
+    options = {
+        "max_concurrent": 1,
+        "max_per_user": 1,
+        "queue_size": 1,
+        "queue_timeout_seconds": 0.05,
+        "retry_after_seconds": 3,
+    }
+    options.update(overrides)
+    return AdmissionController(**options)
+
+
+def test_queued_request_gets_the_released_slot_and_overflow_is_rejected():
+    controller = _controller()
+
+    async def scenario():
+        await controller.acquire("alice")
+        waiting = asyncio.create_task(controller.acquire("bob"))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as overflow:
+            await controller.acquire("carol")
+        queued = controller.stats()["queued"]
+        controller.release("alice")
+        await asyncio.wait_for(waiting, 1)
+        return overflow.value.reason, queued
+
+    reason, queued = asyncio.run(scenario())
+
+    assert (reason, queued) == ("queue_full", 1)
+    assert controller.stats()["active"] == 1
+    assert controller.rejected == {"queue_full": 1}
+
+
+def test_wait_times_out_and_leaves_the_queue():
+    controller = _controller()
+    timeouts = metrics.upload_rejected_total.value(reason="timeout")
+
+    async def scenario():
+        await controller.acquire("alice")
+        with pytest.raises(AdmissionRejected) as timed_out:
+            await controller.acquire("bob")
+        return timed_out.value.reason
+
+    assert asyncio.run(scenario()) == "timeout"
+    assert controller.stats()["queued"] == 0
+    assert metrics.upload_rejected_total.value(reason="timeout") == timeouts + 1
+
+
+def test_user_at_their_limit_does_not_block_other_users():
+    controller = _controller(max_concurrent=3, queue_size=4)
+
+    async def scenario():
+        await controller.acquire("alice")
+        alice_second = asyncio.create_task(controller.acquire("alice"))
+        await asyncio.sleep(0)
+        await asyncio.wait_for(controller.acquire("bob"), 0.01)
+        with pytest.raises(AdmissionRejected) as third:
+            await controller.acquire("alice")
+        controller.release("alice")
+        await asyncio.wait_for(alice_second, 1)
+        return third.value.reason
+
+    assert asyncio.run(scenario()) == "user_queue_full"
+    assert controller.stats()["active"] == 2
+
+
+def test_saturated_worker_answers_uploads_with_503_but_serves_other_routes(
+    client, make_user, auth_headers, monkeypatch
+):
+    headers = auth_headers(make_user("admission-owner@example.com"))
+    admin_headers = auth_headers(make_user("admission-admin@example.com", role="Admin"))
+    monkeypatch.setattr(upload_admission, "max_concurrent", 1)
+    monkeypatch.setattr(upload_admission, "queue_size", 0)
+    files = {"file": ("notes.txt", b"quarterly notes", "text/plain")}
+    asyncio.run(upload_admission.acquire("someone-else"))
+
+    try:
+        rejected = client.post("/files/upload", headers={**headers, "Origin": "http://localhost:4200"}, files=files)
+        listing = client.get("/files", headers=headers)
+        stats = client.get("/admin/admission", headers=admin_headers).json()
+    finally:
+        upload_admission.release("someone-else")
+    accepted = client.post("/files/upload", headers=headers, files=files)
+
+    assert rejected.status_code == 503
+    assert rejected.headers["retry-after"] == str(upload_admission.retry_after_seconds)
+    # The SPA can only read the 503 and Retry-After if CORS wraps the admission middleware.
+    assert rejected.headers["access-control-allow-origin"] == "http://localhost:4200"
+    assert "Retry-After" in rejected.headers["access-control-expose-headers"]
+    assert listing.status_code == 200
+    assert stats["active"] == 1 and stats["rejected"]["queue_full"] >= 1
+    assert accepted.status_code == 200
+    assert upload_admission.stats()["active"] == 0
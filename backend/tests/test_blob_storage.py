@@ -0,0 +1,67 @@
+import dataclasses
+
+import pytest
+
+from app import blob_storage
+from app.blob_storage import encode_stream, iter_blob_range, storage_compression_mode, storage_encoding
+from app.models import FileRecord
+from app.storage_backends import LocalShardedStorage
+
+PAYLOAD = b"id,email\n" + b"".join(b"%d,user%d@example.com\n" % (index, index) for index in range(5000))
+
+
+@pytest.mark.parametrize("encoding", [None, "gzip", "xz"])
+def test_blob_round_trip_and_ranges(tmp_path, encoding):
+    storage = LocalShardedStorage(tmp_path)
+    key = "aa/bb/blob.csv" + blob_storage.storage_suffix(encoding)
+    chunks = (PAYLOAD[offset : offset + 4096] for offset in range(0, len(PAYLOAD), 4096))
+    written = storage.put_stream(key, encode_stream(chunks, encoding))
+
+    assert storage_encoding(key) == encoding
+    if encoding:
+        assert written < len(PAYLOAD) // 3
+    assert b"".join(iter_blob_range(storage, key, 0, len(PAYLOAD) - 1)) == PAYLOAD
+    assert b"".join(iter_blob_range(storage, key, 70_000, 70_099)) == PAYLOAD[70_000:70_100]
+
+
+def test_storage_compression_setting_is_validated():
+    assert storage_compression_mode(" GZIP ") == "gzip"
+    assert storage_compression_mode("off") is None
+    with pytest.raises(ValueError, match="STORAGE_COMPRESSION"):
+        storage_compression_mode("brotli")
+
+
+def test_compressed_upload_downloads_decoded_or_passthrough(
+    client, db_session, make_user, make_file, auth_headers, monkeypatch
+):
+    monkeypatch.setattr(
+        blob_storage, "settings", dataclasses.replace(blob_storage.settings, storage_compression="gzip")
+    )
+    owner = make_user("owner@portal.local")
+    headers = auth_headers(owner)
+
+    upload = client.post("/files/upload", files={"file": ("export.csv", PAYLOAD, "text/csv")}, headers=headers)
+    assert upload.status_code == 200
+    file_id = upload.json()["id"]
+    stored = db_session.get(FileRecord, file_id)
+    assert stored.storage_path.endswith(".csv.gz")
+    assert stored.size == len(PAYLOAD)
+
+    identity = client.get(f"/files/{file_id}/download", headers={**headers, "Accept-Encoding": "identity"})
+    assert identity.status_code == 200
+    assert "content-encoding" not in identity.headers
+    assert identity.content == PAYLOAD
+
+    gzipped = client.get(f"/files/{file_id}/download", headers={**headers, "Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.content == PAYLOAD
+    assert gzipped.headers["etag"] != identity.headers["etag"]
+
+    partial = client.get(f"/files/{file_id}/download", headers={**headers, "Range": "bytes=100-199"})
+    assert partial.status_code == 206
+    assert partial.content == PAYLOAD[100:200]
+
+    legacy = make_file(owner, filename="legacy.txt", content=b"stored before compression")
+    legacy_download = client.get(f"/files/{legacy.id}/download", headers={**headers, "Accept-Encoding": "gzip"})
+    assert legacy_download.content == b"stored before compression"
+    assert "content-encoding" not in legacy_download.headers
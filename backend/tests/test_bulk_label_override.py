@@ -0,0 +1,70 @@
+from app.models import AuditLog, FileRecord
+from app.policy_engine import DECISION_BLOCK
+from app.routers import admin
+
+
+def test_bulk_override_by_ids_reports_per_id_outcomes(client, db_session, make_user, make_file, auth_headers):
+    headers = auth_headers(make_user("bulk-admin@example.com", role="Admin"))
+    owner = make_user("bulk-owner@example.com")
+    to_update = [make_file(owner, filename=f"bulk-{index}.txt").id for index in range(3)]
+    already = make_file(owner, filename="already.txt", label="Highly Confidential").id
+
+    response = client.post(
+        "/admin/files/label-override/bulk",
+        headers=headers,
+        json={"file_ids": [*to_update, already, 999_999], "label": "Highly Confidential", "justification": "audit"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["updated"], body["unchanged"], body["not_found"]) == (3, 1, 1)
+    assert body["policy_decision"] == DECISION_BLOCK
+    statuses = {item["id"]: item["status"] for item in body["results"]}
+    assert statuses[999_999] == "not_found"
+    assert statuses[already] == "unchanged"
+    assert body["results"][0]["previous_label"] == "Internal"
+
+    db_session.expire_all()
+    records = db_session.query(FileRecord).filter(FileRecord.id.in_(to_update)).all()
+    assert {(record.label, record.policy_decision) for record in records} == {("Highly Confidential", DECISION_BLOCK)}
+    overrides = db_session.query(AuditLog).filter(AuditLog.action == "label_override").all()
+    assert sorted(int(entry.target_id) for entry in overrides) == sorted(to_update)
+    assert overrides[0].metadata_json["justification"] == "audit"
+
+
+def test_bulk_override_by_filter_uses_chunks(client, db_session, make_user, make_file, auth_headers, monkeypatch):
+    monkeypatch.setattr(admin, "BULK_OVERRIDE_CHUNK_SIZE", 2)
+    headers = auth_headers(make_user("bulk-filter-admin@example.com", role="Admin"))
+    owner = make_user("bulk-filter-owner@example.com")
+    other = make_user("bulk-filter-other@example.com")
+    for index in range(5):
+        make_file(owner, filename=f"owned-{index}.txt")
+    untouched = make_file(other, filename="other.txt").id
+
+    response = client.post(
+        "/admin/files/label-override/bulk",
+        headers=headers,
+        json={"filter": {"owner_user_id": owner.id}, "label": "Confidential", "justification": "review"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["updated"] == 5
+    db_session.expire_all()
+    assert db_session.get(FileRecord, untouched).label == "Internal"
+
+
+def test_bulk_override_validates_selector(client, make_user, auth_headers):
+    headers = auth_headers(make_user("bulk-validate-admin@example.com", role="Admin"))
+    base = {"label": "Confidential", "justification": "x"}
+
+    both = client.post(
+        "/admin/files/label-override/bulk",
+        headers=headers,
+        json={**base, "file_ids": [1], "filter": {"label": "Public"}},
+    )
+    empty_filter = client.post("/admin/files/label-override/bulk", headers=headers, json={**base, "filter": {}})
+    bad_label = client.post(
+        "/admin/files/label-override/bulk", headers=headers, json={**base, "label": "Secret", "file_ids": [1]}
+    )
+
+    assert both.status_code == empty_filter.status_code == bad_label.status_code == 400
@@ -0,0 +1,100 @@
+import asyncio
+import zlib
+
+from starlette.responses import StreamingResponse
+
+from app import metrics
+from app.compression import CompressionMiddleware, negotiate
+
+
+def _call(app, headers: dict) -> list[dict]:
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/stream",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+    }
+    messages: list[dict] = []
+    requested = False
+
+    async def receive() -> dict:
+        nonlocal requested
+        if requested:
+            # Client stays connected; StreamingResponse cancels this wait when it is done.
+            await asyncio.Event().wait()
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message) -> None:
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return messages
+
+
+def test_negotiate_honours_quality_values():
+    assert negotiate("gzip, deflate") == "gzip"
+    assert negotiate("gzip;q=0, identity") is None
+    assert negotiate("*") is not None
+    assert negotiate(None) is None
+
+
+def test_streamed_chunks_can_be_decoded_as_they_arrive():
+    chunks = [b"id,filename\n", b"1,report.csv\n" * 50, b"2,notes.txt\n" * 50]
+
+    async def endpoint(scope, receive, send):
+        await StreamingResponse(iter(chunks), media_type="text/csv")(scope, receive, send)
+
+    messages = _call(CompressionMiddleware(endpoint, minimum_size=0), {"Accept-Encoding": "gzip"})
+
+    start_headers = dict(messages[0]["headers"])
+    assert start_headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in start_headers
+    decoder = zlib.decompressobj(31)
+    bodies = [message["body"] for message in messages[1:] if message["body"]]
+    # Each chunk is flushed, so every message decodes to exactly the chunk the app produced.
+    assert [decoder.decompress(body) for body in bodies[: len(chunks)]] == chunks
+
+
+def test_json_listing_is_compressed_above_threshold(client, make_user, make_file, auth_headers):
+    owner = make_user("compress-owner@example.com")
+    for index in range(20):
+        make_file(owner, filename=f"compressible-{index}.txt")
+    before = metrics.compression_output_bytes_total.value(route="/files", encoding="gzip")
+
+    response = client.get("/files", headers={**auth_headers(owner), "Accept-Encoding": "gzip"})
+    plain = client.get("/files", headers={**auth_headers(owner), "Accept-Encoding": "identity"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.json() == plain.json()
+    assert "content-encoding" not in plain.headers
+    assert metrics.compression_output_bytes_total.value(route="/files", encoding="gzip") > before
+    assert metrics.compression_input_bytes_total.value(route="/files", encoding="gzip") > (
+        metrics.compression_output_bytes_total.value(route="/files", encoding="gzip")
+    )
+
+
+def test_downloads_skip_pdfs_small_bodies_and_ranges(client, db_session, make_user, make_file, auth_headers):
+    owner = make_user("compress-download@example.com")
+    headers = {**auth_headers(owner), "Accept-Encoding": "gzip"}
+    pdf = make_file(owner, filename="scan.pdf", content=b"%PDF-1.7 " + b"x" * 20_000)
+    pdf.content_type = "application/pdf"
+    text = make_file(owner, filename="big.txt", content=b"lorem ipsum " * 2_000)
+    small = make_file(owner, filename="small.txt", content=b"tiny")
+    db_session.commit()
+    pdf_url, text_url, small_url = (f"/files/{record.id}/download" for record in (pdf, text, small))
+    skipped = metrics.compression_skipped_total.value(reason="content_type")
+
+    pdf_response = client.get(pdf_url, headers=headers)
+    text_response = client.get(text_url, headers=headers)
+    small_response = client.get(small_url, headers=headers)
+    ranged = client.get(text_url, headers={**headers, "Range": "bytes=0-99"})
+
+    assert "content-encoding" not in pdf_response.headers
+    assert metrics.compression_skipped_total.value(reason="content_type") == skipped + 1
+    assert text_response.headers["content-encoding"] == "gzip"
+    assert text_response.headers["etag"].startswith("W/")
+    assert text_response.content == b"lorem ipsum " * 2_000
+    assert "content-encoding" not in small_response.headers
+    assert ranged.status_code == 206 and "content-encoding" not in ranged.headers
@@ -0,0 +1,36 @@
+from sqlalchemy import text
+
+from app.database import async_database_url, engine, engine_options
+
+
+def test_async_database_url_maps_sync_drivers_to_async_ones():
+    assert async_database_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+    assert async_database_url("postgresql+psycopg2://u:p@db/portal") == "postgresql+asyncpg://u:p@db/portal"
+    assert async_database_url("postgresql+psycopg://u:p@db/portal") == "postgresql+psycopg://u:p@db/portal"
+
+
+def test_auth_and_files_run_on_the_async_session(client, make_user, make_file, auth_headers):
+    owner = make_user("owner@portal.local")
+    make_file(owner)
+
+    login = client.post("/auth/login", json={"email": owner.email, "password": "Password123!"})
+    assert login.status_code == 200
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    assert client.get("/auth/me", headers=headers).json()["email"] == owner.email
+    assert [item["filename"] for item in client.get("/files", headers=headers).json()] == ["notes.txt"]
+    assert client.get("/files/activity", headers=headers).json()[0]["action"] == "login"
+
+
+def test_sqlite_connections_apply_the_tuning_profile(db_session):
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert connection.execute(text("PRAGMA cache_size")).scalar() == -65536
+
+    assert "pool_pre_ping" not in engine_options("sqlite:///./app.db")
+    assert "pool_size" not in engine_options("sqlite://")
+    server = engine_options("postgresql://u:p@db/portal")
+    assert server["pool_pre_ping"] is True
+    assert server["pool_recycle"] == 1800
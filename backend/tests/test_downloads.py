@@ -0,0 +1,60 @@
+import pytest
+
+from app.http_ranges import RangeNotSatisfiable, parse_range_header
+from app.models import AuditLog
+
+
+def test_parse_range_header_handles_suffix_open_and_overlapping_ranges():
+    assert parse_range_header("bytes=0-9", 100) == [(0, 9)]
+    assert parse_range_header("bytes=90-", 100) == [(90, 99)]
+    assert parse_range_header("bytes=-5", 100) == [(95, 99)]
+    assert parse_range_header("bytes=0-9,5-20,50-59", 100) == [(0, 20), (50, 59)]
+
+
+def test_parse_range_header_ignores_malformed_and_rejects_unsatisfiable():
+    assert parse_range_header(None, 100) is None
+    assert parse_range_header("items=0-9", 100) is None
+    assert parse_range_header("bytes=abc", 100) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range_header("bytes=200-300", 100)
+
+
+def _download(client, file_record, headers, **extra):
+    return client.get(f"/files/{file_record.id}/download", headers={**headers, **extra})
+
+
+def test_download_supports_etag_revalidation_and_ranges(client, db_session, make_user, make_file, auth_headers):
+    owner = make_user("owner@portal.local")
+    file_record = make_file(owner, filename="data.csv", content=b"0123456789abcdefghij")
+    headers = auth_headers(owner)
+
+    full = _download(client, file_record, headers)
+    assert full.status_code == 200
+    assert full.content == b"0123456789abcdefghij"
+    etag = full.headers["etag"]
+
+    not_modified = _download(client, file_record, headers, **{"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    partial = _download(client, file_record, headers, Range="bytes=10-")
+    assert partial.status_code == 206
+    assert partial.content == b"abcdefghij"
+    assert partial.headers["content-range"] == "bytes 10-19/20"
+
+    multipart = _download(client, file_record, headers, Range="bytes=0-1,18-19")
+    assert multipart.status_code == 206
+    assert multipart.headers["content-type"].startswith("multipart/byteranges; boundary=")
+    assert int(multipart.headers["content-length"]) == len(multipart.content)
+    assert b"Content-Range: bytes 0-1/20\r\n\r\n01\r\n" in multipart.content
+    assert b"Content-Range: bytes 18-19/20\r\n\r\nij\r\n" in multipart.content
+
+    stale = _download(client, file_record, headers, Range="bytes=0-1", **{"If-Range": '"stale"'})
+    assert stale.status_code == 200
+
+    unsatisfiable = _download(client, file_record, headers, Range="bytes=50-60")
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == "bytes */20"
+
+    actions = [row.action for row in db_session.query(AuditLog).order_by(AuditLog.id).all()]
+    assert actions == ["download", "download_not_modified", "download_partial", "download_partial", "download"]
@@ -0,0 +1,55 @@
+def _query_count_for_batch(client, count_queries, headers, file_ids):
+    start = count_queries.count
+    params = {"ids": ",".join(str(file_id) for file_id in file_ids)}
+    response = client.get("/files/details", params=params, headers=headers)
+    assert response.status_code == 200
+    return count_queries.count - start, response.json()
+
+
+def test_batch_details_query_count_does_not_depend_on_batch_size(
+    client, db_session, make_user, make_file, auth_headers, count_queries
+):
+    owner = make_user("owner@portal.local")
+    reader = make_user("reader@portal.local")
+    files = [make_file(owner, filename=f"file-{index}.txt") for index in range(12)]
+    for file_record in files:
+        client.post(
+            f"/files/{file_record.id}/share/internal",
+            json={"email": reader.email},
+            headers=auth_headers(owner),
+        )
+
+    small_count, small_body = _query_count_for_batch(client, count_queries, auth_headers(reader), [files[0].id])
+    large_count, large_body = _query_count_for_batch(
+        client, count_queries, auth_headers(reader), [file_record.id for file_record in files]
+    )
+
+    assert len(small_body) == 1
+    assert len(large_body) == 12
+    assert small_count > 0
+    assert small_count == large_count
+
+
+def test_batch_details_omits_inaccessible_and_unknown_files(client, make_user, make_file, auth_headers):
+    owner = make_user("owner@portal.local")
+    stranger = make_user("stranger@portal.local")
+    own_file = make_file(stranger, filename="mine.txt")
+    other_file = make_file(owner, filename="theirs.txt")
+
+    response = client.get(
+        "/files/details",
+        params={"ids": f"{own_file.id},{other_file.id},9999"},
+        headers=auth_headers(stranger),
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert list(body) == [str(own_file.id)]
+    assert body[str(own_file.id)]["internal_shares"] == []
+    assert body[str(own_file.id)]["external_links"] == []
+
+
+def test_batch_details_rejects_malformed_ids(client, make_user, auth_headers):
+    user = make_user("owner@portal.local")
+    response = client.get("/files/details", params={"ids": "1,abc"}, headers=auth_headers(user))
+    assert response.status_code == 400
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+from app.database import SessionLocal
+from app.link_expiry import LinkExpirySweeper
+from app.models import AuditLog, ExternalLink
+
+
+def _add_link(db, file_record, token, expires_at, status="active"):
+    db.add(
+        ExternalLink(
+            file_id=file_record.id,
+            token=token,
+            expires_at=expires_at,
+            created_by=file_record.owner_user_id,
+            status=status,
+        )
+    )
+    db.commit()
+
+
+def test_sweeper_expires_links_in_batches_with_single_audit_entry(db_session, make_user, make_file):
+    owner = make_user("owner@portal.local")
+    file_record = make_file(owner)
+    past = datetime.utcnow() - timedelta(hours=1)
+    for index in range(5):
+        _add_link(db_session, file_record, f"expired-{index}", past)
+    _add_link(db_session, file_record, "future", datetime.utcnow() + timedelta(days=1))
+    _add_link(db_session, file_record, "revoked", past, status="revoked")
+
+    sweeper = LinkExpirySweeper(session_factory=SessionLocal, interval_seconds=0, batch_size=2)
+    assert sweeper.run_once() == 5
+    assert sweeper.run_once() == 0
+
+    db_session.expire_all()
+    statuses = {link.token: link.status for link in db_session.query(ExternalLink).all()}
+    assert [statuses[f"expired-{index}"] for index in range(5)] == ["expired"] * 5
+    assert statuses["future"] == "active"
+    assert statuses["revoked"] == "revoked"
+
+    sweeps = db_session.query(AuditLog).filter(AuditLog.action == "external_links_expired").all()
+    assert len(sweeps) == 1
+    assert sweeps[0].metadata_json["expired"] == 5
+
+    stats = sweeper.stats()
+    assert stats["runs"] == 2
+    assert stats["total_expired"] == 5
+    assert stats["last_expired"] == 0
+    assert stats["last_run_at"] is not None
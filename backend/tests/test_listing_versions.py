@@ -0,0 +1,92 @@
+from app.database import SessionLocal
+from app.listing_versions import bump_all
+
+
+def _etag(client, headers, path: str = "/files", **params) -> str:
+    response = client.get(path, headers=headers, params=params)
+    assert response.status_code == 200
+    return response.headers["etag"]
+
+
+def test_unchanged_listing_is_revalidated_without_reading_files(
+    client, make_user, auth_headers, count_queries, upload_file
+):
+    headers = auth_headers(make_user("versions-owner@example.com"))
+    upload_file(headers, "first.txt")
+    etag = _etag(client, headers, scope="mine")
+
+    start = count_queries.count
+    cached = client.get("/files", headers={**headers, "If-None-Match": etag}, params={"scope": "mine"})
+
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert not [statement for statement in count_queries.statements[start:] if "files" in statement]
+    assert _etag(client, headers, scope="mine", category="emails") != etag
+
+    upload_file(headers, "second.txt")
+    refreshed = client.get("/files", headers={**headers, "If-None-Match": etag}, params={"scope": "mine"})
+    assert refreshed.status_code == 200
+    assert len(refreshed.json()) == 2
+
+
+def test_shares_and_label_overrides_bump_affected_users(client, make_user, auth_headers, upload_file):
+    owner = make_user("versions-sharer@example.com")
+    reader = make_user("versions-reader@example.com")
+    bystander = make_user("versions-bystander@example.com")
+    owner_headers, reader_headers, bystander_headers = (auth_headers(user) for user in (owner, reader, bystander))
+    admin_headers = auth_headers(make_user("versions-admin@example.com", role="Admin"))
+    record = upload_file(owner_headers, "shared.txt")
+    owner_mine = _etag(client, owner_headers, scope="mine")
+    reader_shared = _etag(client, reader_headers, scope="shared")
+    bystander_shared = _etag(client, bystander_headers, scope="shared")
+
+    client.post(
+        f"/files/{record['id']}/share/internal", headers=owner_headers, json={"email": "versions-reader@example.com"}
+    )
+
+    assert _etag(client, reader_headers, scope="shared") != reader_shared
+    assert _etag(client, owner_headers, scope="mine") == owner_mine
+    reader_shared = _etag(client, reader_headers, scope="shared")
+
+    client.post(
+        f"/admin/files/{record['id']}/label-override",
+        headers=admin_headers,
+        json={"label": "Confidential", "justification": "review"},
+    )
+
+    assert _etag(client, owner_headers, scope="mine") != owner_mine
+    assert _etag(client, reader_headers, scope="shared") != reader_shared
+    assert _etag(client, bystander_headers, scope="shared") == bystander_shared
+
+
+def test_global_bump_invalidates_every_listing(client, make_user, auth_headers):
+    headers = auth_headers(make_user("versions-global@example.com"))
+    etag = _etag(client, headers, scope="mine")
+
+    db = SessionLocal()
+    try:
+        bump_all(db)
+        db.commit()
+    finally:
+        db.close()
+
+    assert _etag(client, headers, scope="mine") != etag
+
+
+def test_activity_feed_revalidates_until_new_audit_rows(client, make_user, auth_headers, upload_file):
+    headers = auth_headers(make_user("versions-activity@example.com"))
+    upload_file(headers, "activity.txt")
+    etag = _etag(client, headers, "/files/activity")
+
+    cached = client.get("/files/activity", headers={**headers, "If-None-Match": etag})
+    other_user = client.get(
+        "/files/activity",
+        headers={**auth_headers(make_user("versions-other@example.com")), "If-None-Match": etag},
+    )
+    upload_file(headers, "activity-2.txt")
+    refreshed = client.get("/files/activity", headers={**headers, "If-None-Match": etag})
+
+    assert cached.status_code == 304
+    assert other_user.status_code == 200
+    assert refreshed.status_code == 200
+    assert refreshed.json()[0]["action"] in ("upload", "policy_decision")
@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app import metrics
+
+
+def _sample(body: str, prefix: str) -> float:
+    for line in body.splitlines():
+        if line.startswith(prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("test_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(5, route="/a")
+
+    lines = histogram.samples()
+
+    assert 'test_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'test_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{route="/a"} 3' in lines
+
+
+def test_requests_are_recorded_by_route_template(client, make_user, make_file, auth_headers):
+    owner = make_user("metrics-owner@example.com")
+    record = make_file(owner, filename="metrics.txt", content=b"0123456789")
+    before = metrics.http_request_seconds.count(method="GET", route="/files/{file_id}/download", status="200")
+    downloaded = metrics.download_bytes_total.value(kind="full")
+
+    response = client.get(f"/files/{record.id}/download", headers=auth_headers(owner))
+    assert response.status_code == 200
+    client.get("/share/not-a-real-token")
+
+    assert metrics.http_request_seconds.count(method="GET", route="/files/{file_id}/download", status="200") == (
+        before + 1
+    )
+    assert metrics.download_bytes_total.value(kind="full") == downloaded + 10
+    assert metrics.db_queries_per_request.count(route="/files/{file_id}/download") >= 1
+
+    body = client.get("/metrics").text
+    assert "portal_db_queries_total" in body
+    assert _sample(body, 'portal_audit_rows_total{action="download"}') >= 1
+    assert "not-a-real-token" not in body
+
+
+def test_upload_records_scan_and_byte_metrics(client, make_user, auth_headers):
+    owner = make_user("metrics-upload@example.com")
+    uploaded = metrics.upload_bytes_total.value()
+    scans = metrics.scan_seconds.count(category="txt")
+    content = b"contact alice@example.com"
+
+    response = client.post(
+        "/files/upload", headers=auth_headers(owner), files={"file": ("contacts.txt", content, "text/plain")}
+    )
+
+    assert response.status_code == 200
+    assert metrics.upload_bytes_total.value() == uploaded + len(content)
+    assert metrics.scan_seconds.count(category="txt") == scans + 1
+    body = client.get("/metrics").text
+    assert "alice" not in body
+    assert _sample(body, 'portal_scan_matches_total{detector="emails"}') >= 1
+
+
+def test_failed_statement_leaves_no_timing_state_on_the_connection(db_session):
+    connection = db_session.connection()
+    before = metrics.db_queries_total.value()
+
+    with pytest.raises(OperationalError):
+        connection.exec_driver_sql("SELECT * FROM no_such_table")
+    db_session.rollback()
+    connection = db_session.connection()
+    connection.exec_driver_sql("SELECT 1")
+
+    assert metrics.db_queries_total.value() == before + 1
+    assert "metrics_query_start" not in connection.info
@@ -1,10 +1,15 @@
+import pytest
+
 from app.policy_engine import (
     ACTION_EXTERNAL_LINK,
     ACTION_INTERNAL_SHARE,
     DECISION_ALLOW,
     DECISION_BLOCK,
     DECISION_WARN,
+    PolicyTable,
+    evaluate_many,
     evaluate_policy,
+    policy_table,
 )
 
 
@@ -23,10 +28,46 @@ def test_confidential_external_link_is_warn_with_justification_and_expiry():
 def test_highly_confidential_external_link_is_blocked():
     result = evaluate_policy("Highly Confidential", ACTION_EXTERNAL_LINK)
     assert result.decision == DECISION_BLOCK
-    assert result.required_fields == []
+    assert result.required_fields == ()
 
 
 def test_highly_confidential_internal_share_is_allow_with_allowlist_requirement():
     result = evaluate_policy("Highly Confidential", ACTION_INTERNAL_SHARE)
     assert result.decision == DECISION_ALLOW
-    assert result.required_fields == ["target_user_email"]
+    assert result.required_fields == ("target_user_email",)
+
+
+def test_results_are_shared_and_label_lookup_is_normalized():
+    shared = evaluate_policy("Confidential", ACTION_EXTERNAL_LINK)
+    assert evaluate_policy("  confidential ", ACTION_EXTERNAL_LINK) is shared
+
+
+def test_unknown_label_uses_wildcard_or_fallback():
+    assert evaluate_policy("Secret", ACTION_INTERNAL_SHARE).decision == DECISION_ALLOW
+    fallback = evaluate_policy("Secret", ACTION_EXTERNAL_LINK, {"reviewer": "x"})
+    assert fallback.decision == DECISION_WARN
+    assert fallback.required_fields == ("reviewer",)
+
+
+def test_evaluate_many_matches_single_evaluation():
+    labels = ["Public", "Highly Confidential", "Confidential", "Public"]
+
+    results = evaluate_many(labels, ACTION_EXTERNAL_LINK)
+
+    assert [result.decision for result in results] == [DECISION_ALLOW, DECISION_BLOCK, DECISION_WARN, DECISION_ALLOW]
+    assert results[0] is results[3]
+
+
+def test_summary_is_generated_from_the_rule_table():
+    rows = {(row["label"], row["action"]): row for row in policy_table.summary()}
+
+    assert rows[("Highly Confidential", ACTION_EXTERNAL_LINK)]["decision"] == DECISION_BLOCK
+    assert rows[("Public/Internal", ACTION_EXTERNAL_LINK)]["required_fields"] == ["expires_at"]
+
+
+def test_table_rejects_duplicate_rules():
+    rule = {"labels": ["Public"], "action": ACTION_EXTERNAL_LINK, "decision": DECISION_ALLOW, "reason": "ok"}
+    definition = {"labels": ["Public"], "rules": [rule, rule], "fallback": {"decision": DECISION_WARN, "reason": "x"}}
+
+    with pytest.raises(ValueError, match="duplicate"):
+        PolicyTable(definition)
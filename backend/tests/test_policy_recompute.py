@@ -0,0 +1,41 @@
+from app.models import AuditLog, FileRecord
+from app.policy_engine import DECISION_ALLOW, DECISION_BLOCK, DECISION_WARN
+
+
+def test_recompute_updates_stale_decisions_with_one_update_per_label(
+    client, db_session, make_user, make_file, auth_headers, count_queries
+):
+    admin = make_user("recompute-admin@example.com", role="Admin")
+    headers = auth_headers(admin)
+    owner = make_user("recompute-owner@example.com")
+    stale = [make_file(owner, filename=f"stale-{index}.txt", label="Highly Confidential") for index in range(3)]
+    current = make_file(owner, filename="current.txt", label="Confidential")
+    for record in stale:
+        record.policy_decision = DECISION_ALLOW
+    current.policy_decision = DECISION_WARN
+    current.decision_reason = "Confidential data needs a business justification and expiry before external sharing."
+    db_session.commit()
+
+    start = count_queries.count
+    response = client.post("/admin/policy/recompute", headers=headers)
+    statements = count_queries.statements[start:]
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["labels"]["Highly Confidential"] == {"decision": DECISION_BLOCK, "updated": 3}
+    assert body["labels"]["Confidential"]["updated"] == 0
+    assert sum(statement.lstrip().upper().startswith("UPDATE FILES") for statement in statements) == 2
+
+    db_session.expire_all()
+    rows = db_session.query(FileRecord).filter(FileRecord.label == "Highly Confidential").all()
+    decisions = {row.policy_decision for row in rows}
+    assert decisions == {DECISION_BLOCK}
+    entries = db_session.query(AuditLog).filter(AuditLog.action == "policy_recomputed").all()
+    assert len(entries) == 1
+    assert entries[0].metadata_json["updated"] == 3
+
+
+def test_recompute_requires_admin(client, make_user, auth_headers):
+    user = make_user("recompute-user@example.com")
+
+    assert client.post("/admin/policy/recompute", headers=auth_headers(user)).status_code == 403
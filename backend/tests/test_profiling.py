@@ -0,0 +1,54 @@
+import pytest
+
+from app.profiling import profile_store
+
+
+@pytest.fixture(autouse=True)
+def _reset_profiles():
+    profile_store.clear()
+    yield
+    profile_store.clear()
+
+
+def test_admin_request_with_header_is_profiled(client, make_user, auth_headers):
+    admin = make_user("profiler-admin@example.com", role="Admin")
+    headers = {**auth_headers(admin), "X-Profile": "1"}
+
+    response = client.get("/files?scope=all", headers=headers)
+
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    listing = client.get("/admin/profiles", headers=auth_headers(admin)).json()
+    assert listing["profiles"][0]["id"] == profile_id
+    assert listing["profiles"][0]["route"] == "/files"
+
+    report = client.get(f"/admin/profiles/{profile_id}", headers=auth_headers(admin))
+    assert report.status_code == 200
+    assert "attachment" in report.headers["content-disposition"]
+    assert report.text.startswith(f"Profile {profile_id}")
+    folded = client.get(f"/admin/profiles/{profile_id}?format=folded", headers=auth_headers(admin))
+    assert folded.status_code == 200
+
+
+def test_profiling_is_rate_limited_globally(client, make_user, auth_headers):
+    admin = make_user("profiler-limit@example.com", role="Admin")
+    headers = {**auth_headers(admin), "X-Profile": "1"}
+
+    first = client.get("/files", headers=headers)
+    second = client.get("/files", headers=headers)
+
+    assert "X-Profile-Id" in first.headers
+    assert "X-Profile-Id" not in second.headers
+    assert second.headers["X-Profile-Skipped"] == "rate-limited"
+    assert profile_store.rejected == 1
+
+
+def test_non_admin_header_is_ignored(client, make_user, auth_headers):
+    user = make_user("profiler-user@example.com")
+
+    response = client.get("/files", headers={**auth_headers(user), "X-Profile": "1"})
+
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    assert "X-Profile-Skipped" not in response.headers
+    assert client.get("/admin/profiles", headers=auth_headers(user)).status_code == 403
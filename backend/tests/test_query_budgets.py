@@ -0,0 +1,104 @@
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+
+from app import metrics
+from app.audit import add_audit
+from app.models import AuditLog, FileRecord, InternalShare
+
+
+def _share(db_session, file_record, user):
+    db_session.add(InternalShare(file_id=file_record.id, user_id=user.id, permission="read"))
+    db_session.commit()
+
+
+def test_get_file_budget_does_not_grow_with_shares(
+    client, db_session, make_user, make_file, auth_headers, query_budget
+):
+    owner = make_user("budget-owner@example.com")
+    reader = make_user("budget-reader@example.com")
+    record = make_file(owner, filename="budget.txt")
+    _share(db_session, record, reader)
+    for index in range(5):
+        _share(db_session, record, make_user(f"budget-extra{index}@example.com"))
+
+    url, headers = f"/files/{record.id}", auth_headers(reader)
+
+    # user, file, share check, shares+users, links
+    with query_budget(5):
+        response = client.get(url, headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.json()["internal_shares"]) == 6
+
+
+def test_add_internal_share_budget(client, make_user, make_file, auth_headers, query_budget):
+    owner = make_user("share-budget-owner@example.com")
+    make_user("share-budget-target@example.com")
+    record = make_file(owner, filename="share-budget.txt")
+
+    url, headers = f"/files/{record.id}/share/internal", auth_headers(owner)
+
+    # user, file, target user, existing share, share insert, audit inserts, stats upsert
+    with query_budget(9):
+        response = client.post(url, headers=headers, json={"email": "share-budget-target@example.com"})
+
+    assert response.json()["status"] == "created"
+
+
+@pytest.mark.parametrize(
+    ("path", "role"),
+    [
+        ("/files?scope=all", "Admin"),
+        ("/files/activity", "Admin"),
+        ("/admin/files", "Admin"),
+        ("/admin/audit", "Admin"),
+    ],
+)
+def test_listing_query_count_is_independent_of_row_count(
+    client, db_session, make_user, make_file, auth_headers, count_queries, path, role
+):
+    headers = auth_headers(make_user("listing-viewer@example.com", role=role))
+    owner = make_user("listing-owner@example.com")
+    owner_id = owner.id
+
+    def _request_count() -> int:
+        start = count_queries.count
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200
+        assert not count_queries.repeated_selects(start)
+        return count_queries.count - start
+
+    make_file(owner, filename="first.txt")
+    single = _request_count()
+    for index in range(5):
+        record = make_file(owner, filename=f"more-{index}.txt")
+        add_audit(db_session, actor_user_id=owner_id, action="upload", target_type="file", target_id=str(record.id))
+    db_session.commit()
+
+    assert _request_count() == single
+
+
+def test_lazy_relationship_loads_raise(db_session, make_user, make_file):
+    owner = make_user("lazy-owner@example.com")
+    file_id = make_file(owner, filename="lazy.txt").id
+    add_audit(db_session, actor_user_id=owner.id, action="upload", target_type="file", target_id=str(file_id))
+    db_session.commit()
+    db_session.expunge_all()
+
+    file_record = db_session.get(FileRecord, file_id)
+    entry = db_session.query(AuditLog).first()
+    with pytest.raises(InvalidRequestError):
+        _ = file_record.owner
+    with pytest.raises(InvalidRequestError):
+        _ = entry.actor
+
+
+def test_runtime_guard_flags_repeated_statements(caplog):
+    stats = metrics.RequestDbStats(queries=6, statements={"SELECT users.id FROM users WHERE users.id = ?": 6})
+
+    with caplog.at_level("WARNING", logger="app.metrics"):
+        reasons = metrics.check_query_budget("/files/{file_id}", stats)
+
+    assert reasons == ["repeated"]
+    assert "possible N+1" in caplog.text
+    assert metrics.db_query_budget_exceeded_total.value(route="/files/{file_id}", reason="repeated") >= 1
@@ -0,0 +1,69 @@
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from starlette.datastructures import Headers
+
+from app import dependencies
+from app.config import settings
+from app.database import Base, RecentWriters, recent_writers
+from app.read_your_writes import READ_PRIMARY_HEADER, prefers_primary
+
+
+def test_recent_writers_expire_after_window(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.database.time.monotonic", lambda: now[0])
+    writers = RecentWriters(window_seconds=5)
+
+    writers.mark(1)
+    assert writers.recently_wrote(1)
+    assert not writers.recently_wrote(2)
+    now[0] = 106.0
+    assert not writers.recently_wrote(1)
+
+
+def test_listing_reads_replica_until_the_user_writes(client, make_user, make_file, auth_headers, tmp_path, monkeypatch):
+    replica_url = f"sqlite:///{tmp_path / 'replica.db'}"
+    Base.metadata.create_all(bind=create_engine(replica_url))
+    replica = async_sessionmaker(
+        create_async_engine(replica_url.replace("sqlite://", "sqlite+aiosqlite://")),
+        expire_on_commit=False,
+        class_=AsyncSession,
+    )
+    monkeypatch.setattr(dependencies, "AsyncReadSessionLocal", replica)
+
+    owner = make_user("owner@portal.local")
+    file_record = make_file(owner)
+    headers = auth_headers(owner)
+
+    # The empty replica has not caught up with the fixture's write yet.
+    assert client.get("/files", headers=headers).json() == []
+
+    # A failed write commits nothing, so it must not pin reads to the primary.
+    share = client.post(
+        f"/files/{file_record.id}/share/internal", json={"email": "missing@portal.local"}, headers=headers
+    )
+    assert share.status_code == 404
+    assert READ_PRIMARY_HEADER not in share.headers
+    assert client.get("/files", headers=headers).json() == []
+
+    upload = client.post("/files/upload", headers=headers, files={"file": ("new.txt", b"fresh", "text/plain")})
+    assert upload.status_code == 200
+    assert len(client.get("/files", headers=headers).json()) == 2
+
+    # Another worker never saw the write; the echoed header still routes to the primary.
+    recent_writers.clear()
+    assert client.get("/files", headers=headers).json() == []
+    echoed = {**headers, READ_PRIMARY_HEADER: upload.headers[READ_PRIMARY_HEADER]}
+    assert len(client.get("/files", headers=echoed).json()) == 2
+
+
+def test_echoed_marker_is_honoured_only_within_the_window():
+    now = 1_000.0
+    window = settings.read_your_writes_seconds
+
+    def marker(until: float) -> Headers:
+        return Headers({READ_PRIMARY_HEADER: str(until)})
+
+    assert prefers_primary(marker(now + window / 2), user_id=42, now=now)
+    assert not prefers_primary(marker(now - 1), user_id=42, now=now)
+    assert not prefers_primary(marker(now + window * 10), user_id=42, now=now)
+    assert not prefers_primary(Headers({READ_PRIMARY_HEADER: "soon"}), user_id=42, now=now)
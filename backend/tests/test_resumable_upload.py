@@ -0,0 +1,101 @@
+import hashlib
+from datetime import datetime, timedelta
+
+from app.models import FileRecord, UploadSession
+from app.resumable_uploads import expire_upload_sessions, upload_states
+from app.scanner import IncrementalScanner, scan_content
+from app.storage_backends import get_storage
+
+LINE = "Contact jane.doe@example.com or +1 555 123 4567. Card 4111 1111 1111 1111. Café ünïcode.\n"
+CONTENT = (LINE * 40).encode()
+
+
+def _create(client, headers, size: int = len(CONTENT), filename: str = "large.txt"):
+    response = client.post("/files/uploads", headers=headers, json={"filename": filename, "size": size})
+    assert response.status_code == 201
+    return response.json()
+
+
+def _put(client, headers, upload_id: str, offset: int, chunk: bytes):
+    return client.put(f"/files/uploads/{upload_id}", headers=headers, params={"offset": offset}, content=chunk)
+
+
+def test_incremental_scan_matches_whole_file_scan_across_chunk_splits():
+    scanner = IncrementalScanner("notes.txt", "text/plain")
+    # Odd chunk sizes split emails, phone numbers and multi-byte characters.
+    for start in range(0, len(CONTENT), 37):
+        scanner.feed(CONTENT[start : start + 37])
+
+    assert scanner.result() == scan_content("notes.txt", "text/plain", CONTENT)
+
+
+def test_chunks_resume_after_interruption_and_finalize_without_reread(client, db_session, make_user, auth_headers):
+    headers = auth_headers(make_user("resumable-owner@example.com"))
+    session = _create(client, headers)
+    upload_id, half = session["id"], len(CONTENT) // 2
+
+    assert _put(client, headers, upload_id, 0, CONTENT[:half]).headers["upload-offset"] == str(half)
+    rebuilds = upload_states.rebuilds
+    stale = _put(client, headers, upload_id, 0, CONTENT[:half])
+    assert stale.status_code == 409
+    assert stale.headers["upload-offset"] == str(half)
+    assert client.get(f"/files/uploads/{upload_id}", headers=headers).json()["offset"] == half
+    early = client.post(f"/files/uploads/{upload_id}/complete", headers=headers)
+    assert early.status_code == 409
+    assert _put(client, headers, upload_id, half, CONTENT[half:]).json()["offset"] == len(CONTENT)
+    assert upload_states.rebuilds == rebuilds
+
+    completed = client.post(
+        f"/files/uploads/{upload_id}/complete",
+        headers=headers,
+        json={"sha256": hashlib.sha256(CONTENT).hexdigest()},
+    )
+
+    assert completed.status_code == 200
+    body = completed.json()
+    assert upload_states.rebuilds == rebuilds
+    assert body["label"] == "Highly Confidential"
+    assert body["scan_summary_json"] == scan_content("large.txt", "text/plain", CONTENT)
+    record = db_session.get(FileRecord, body["id"])
+    assert b"".join(get_storage().open_range(record.storage_path)) == CONTENT
+    assert db_session.get(UploadSession, upload_id) is None
+    assert client.get(f"/files/{body['id']}/download", headers=headers).content == CONTENT
+
+
+def test_state_is_rebuilt_from_stored_bytes_when_a_worker_lacks_it(client, make_user, auth_headers):
+    headers = auth_headers(make_user("resumable-rebuild@example.com"))
+    upload_id = _create(client, headers)["id"]
+    _put(client, headers, upload_id, 0, CONTENT[:100])
+    upload_states.discard(upload_id)
+
+    _put(client, headers, upload_id, 100, CONTENT[100:])
+    mismatch = client.post(f"/files/uploads/{upload_id}/complete", headers=headers, json={"sha256": "0" * 64})
+    completed = client.post(f"/files/uploads/{upload_id}/complete", headers=headers)
+
+    assert mismatch.status_code == 400
+    assert completed.json()["sha256"] == hashlib.sha256(CONTENT).hexdigest()
+
+
+def test_sessions_are_private_and_bounded(client, make_user, auth_headers):
+    headers = auth_headers(make_user("resumable-private@example.com"))
+    other_headers = auth_headers(make_user("resumable-intruder@example.com"))
+    upload_id = _create(client, headers, size=10)["id"]
+
+    assert client.get(f"/files/uploads/{upload_id}", headers=other_headers).status_code == 404
+    assert _put(client, headers, upload_id, 0, b"x" * 11).status_code == 400
+    assert client.post("/files/uploads", headers=headers, json={"filename": "run.exe", "size": 1}).status_code == 400
+
+
+def test_abandoned_sessions_are_garbage_collected(client, db_session, make_user, auth_headers):
+    headers = auth_headers(make_user("resumable-abandoned@example.com"))
+    upload_id = _create(client, headers)["id"]
+    _put(client, headers, upload_id, 0, CONTENT[:64])
+    storage_path = db_session.get(UploadSession, upload_id).storage_path
+    db_session.expire_all()
+
+    assert expire_upload_sessions(db_session, get_storage(), 3600, 10) == 0
+    expired = expire_upload_sessions(db_session, get_storage(), 3600, 10, now=datetime.utcnow() + timedelta(hours=2))
+
+    assert expired == 1
+    assert get_storage().stat(storage_path) is None
+    assert client.get(f"/files/uploads/{upload_id}", headers=headers).status_code == 404
@@ -0,0 +1,60 @@
+from app.models import FileScanCount
+from app.scan_counts import backfill_scan_counts
+
+
+def _filenames(response) -> list[str]:
+    assert response.status_code == 200
+    return sorted(item["filename"] for item in response.json())
+
+
+def test_list_files_filters_by_category_and_min_count(client, make_user, auth_headers, upload_file):
+    headers = auth_headers(make_user("counts-owner@example.com"))
+    upload_file(headers, "one-email.txt", b"contact alice@example.com")
+    upload_file(headers, "two-emails.txt", b"alice@example.com and bob@example.com")
+    upload_file(headers, "plain.txt", b"nothing sensitive here")
+
+    emails = client.get("/files", headers=headers, params={"category": "emails"})
+    at_least_two = client.get("/files", headers=headers, params={"category": "emails", "min_count": 2})
+    phones = client.get("/files", headers=headers, params={"category": "phones"})
+
+    assert _filenames(emails) == ["one-email.txt", "two-emails.txt"]
+    assert _filenames(at_least_two) == ["two-emails.txt"]
+    assert _filenames(phones) == []
+
+
+def test_category_filter_validates_input(client, make_user, auth_headers):
+    headers = auth_headers(make_user("counts-validate@example.com"))
+
+    unknown = client.get("/files", headers=headers, params={"category": "passwords"})
+    zero = client.get("/files", headers=headers, params={"category": "emails", "min_count": 0})
+
+    assert unknown.status_code == zero.status_code == 422
+
+
+def test_admin_listing_filters_across_owners(client, make_user, auth_headers, upload_file):
+    admin_headers = auth_headers(make_user("counts-admin@example.com", role="Admin"))
+    upload_file(auth_headers(make_user("counts-a@example.com")), "a.txt", b"mail carol@example.com")
+    upload_file(auth_headers(make_user("counts-b@example.com")), "b.txt", b"no matches")
+
+    response = client.get("/admin/files", headers=admin_headers, params={"category": "emails"})
+
+    assert _filenames(response) == ["a.txt"]
+
+
+def test_backfill_rebuilds_counts_from_scan_summaries(db_session, make_user, make_file):
+    owner = make_user("counts-backfill@example.com")
+    scanned = make_file(owner, filename="legacy.txt")
+    scanned.scan_summary_json = {"counts": {"emails": 3, "phones": 0, "credit_cards": 1, "generic_ids": 0}}
+    make_file(owner, filename="empty.txt")
+    db_session.commit()
+    file_id = scanned.id
+
+    result = backfill_scan_counts(db_session, batch_size=1)
+    again = backfill_scan_counts(db_session, batch_size=1)
+
+    rows = db_session.query(FileScanCount).order_by(FileScanCount.category).all()
+    assert result == again == {"files": 2, "rows": 2}
+    assert [(row.file_id, row.category, row.count) for row in rows] == [
+        (file_id, "credit_cards", 1),
+        (file_id, "emails", 3),
+    ]
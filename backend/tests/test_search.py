@@ -0,0 +1,69 @@
+from app.scanner import searchable_text
+from app.search_index import fts_query, rebuild_search_index
+from app.storage_backends import get_storage
+
+
+def _search(client, headers, query: str, **params) -> list[str]:
+    response = client.get("/files/search", headers=headers, params={"q": query, **params})
+    assert response.status_code == 200
+    return [item["filename"] for item in response.json()["results"]]
+
+
+def test_search_ranks_filename_matches_and_applies_acl(client, make_user, auth_headers, upload_file):
+    owner = make_user("search-owner@example.com")
+    reader = make_user("search-reader@example.com")
+    stranger = make_user("search-stranger@example.com")
+    admin = make_user("search-admin@example.com", role="Admin")
+    owner_headers = auth_headers(owner)
+
+    budget = upload_file(owner_headers, "budget-2025.txt", b"quarterly numbers")
+    upload_file(owner_headers, "notes.txt", b"draft of the budget discussion")
+    client.post(
+        f"/files/{budget['id']}/share/internal", headers=owner_headers, json={"email": "search-reader@example.com"}
+    )
+
+    assert _search(client, owner_headers, "budget") == ["budget-2025.txt", "notes.txt"]
+    assert _search(client, auth_headers(reader), "budg") == ["budget-2025.txt"]
+    assert _search(client, auth_headers(stranger), "budget") == []
+    assert len(_search(client, auth_headers(admin), "budget")) == 2
+    assert _search(client, owner_headers, "budget", limit=1, offset=1) == ["notes.txt"]
+
+
+def test_search_covers_labels_and_categories_but_not_pii(client, make_user, auth_headers, upload_file):
+    headers = auth_headers(make_user("search-pii@example.com"))
+    record = upload_file(headers, "contacts.txt", b"reach alice@example.com about the merger")
+
+    assert _search(client, headers, "emails") == ["contacts.txt"]
+    assert _search(client, headers, record["label"]) == ["contacts.txt"]
+    assert _search(client, headers, "merger") == ["contacts.txt"]
+    assert _search(client, headers, "alice") == []
+
+
+def test_label_override_updates_index(client, make_user, auth_headers, upload_file):
+    owner = make_user("search-relabel@example.com")
+    admin_headers = auth_headers(make_user("search-relabel-admin@example.com", role="Admin"))
+    record = upload_file(auth_headers(owner), "plain.txt", b"plain text")
+
+    client.post(
+        f"/admin/files/{record['id']}/label-override",
+        headers=admin_headers,
+        json={"label": "Highly Confidential", "justification": "review"},
+    )
+
+    assert _search(client, admin_headers, "highly") == ["plain.txt"]
+
+
+def test_rebuild_indexes_existing_files(client, db_session, make_user, make_file, auth_headers):
+    owner = make_user("search-rebuild@example.com")
+    make_file(owner, filename="legacy.txt", content=b"archived invoice")
+
+    assert _search(client, auth_headers(owner), "invoice") == []
+    assert rebuild_search_index(db_session, get_storage()) == {"indexed": 1, "missing": 0}
+    assert _search(client, auth_headers(owner), "invoice") == ["legacy.txt"]
+
+
+def test_query_and_excerpt_sanitizing():
+    assert fts_query('budget" OR owner:*') == '"budget"* "or"* "owner"*'
+    assert fts_query("  ***  ") is None
+    excerpt = searchable_text("a.txt", "text/plain", b"call 555-123-4567 re 4111 1111 1111 1111 now", 100)
+    assert excerpt == "call re now"
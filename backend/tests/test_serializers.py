@@ -0,0 +1,50 @@
+import json
+from datetime import datetime
+
+from app import bench_serialization
+from app.serializers import FastJSONResponse
+
+
+def test_fast_listing_matches_legacy_payload():
+    db = bench_serialization.build_session(25)
+    try:
+        legacy = json.loads(bench_serialization.legacy_listing(db))
+        fast = json.loads(bench_serialization.fast_listing(db))
+    finally:
+        db.close()
+
+    assert len(fast) == 25
+    assert fast == legacy
+
+
+def test_fast_json_response_encodes_datetimes_like_pydantic():
+    body = FastJSONResponse({"created_at": datetime(2025, 3, 1, 12, 30, 5, 123456), "ids": [1, 2]}).body
+
+    assert json.loads(body) == {"created_at": "2025-03-01T12:30:05.123456", "ids": [1, 2]}
+
+
+def test_list_endpoints_return_file_fields(client, make_user, make_file, auth_headers):
+    owner = make_user("serializer-owner@example.com")
+    admin = make_user("serializer-admin@example.com", role="Admin")
+    make_file(owner, filename="first.txt")
+    make_file(owner, filename="second.txt", label="Confidential")
+
+    mine = client.get("/files", headers=auth_headers(owner))
+    everything = client.get("/admin/files", headers=auth_headers(admin))
+
+    assert mine.status_code == everything.status_code == 200
+    assert mine.json() == everything.json()
+    assert {item["label"] for item in mine.json()} == {"Internal", "Confidential"}
+    assert set(mine.json()[0]) == {
+        "id",
+        "filename",
+        "owner_user_id",
+        "created_at",
+        "size",
+        "content_type",
+        "label",
+        "scan_summary_json",
+        "policy_decision",
+        "decision_reason",
+        "is_deleted",
+    }
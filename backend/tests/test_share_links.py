@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta, timezone
+
+from app.link_cache import CachedLink, ExternalLinkCache
+from app.models import AuditLog
+
+
+def _create_link(client, file_record, headers):
+    expires_at = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    response = client.post(
+        f"/files/{file_record.id}/share/external-link",
+        json={"expires_at": expires_at},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    return response.json()["link"]
+
+
+def test_link_cache_evicts_least_recently_used_and_expires_entries():
+    now = [0.0]
+    cache = ExternalLinkCache(
+        max_entries=2, ttl_seconds=5, negative_max_entries=1, negative_ttl_seconds=1, clock=lambda: now[0]
+    )
+    entry = CachedLink(1, 1, "active", datetime.utcnow(), "a.txt", "text/plain", 0, "Internal", "/tmp/a", False)
+
+    cache.put("a", entry)
+    cache.put("b", entry)
+    cache.get("a")
+    cache.put("c", entry)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, entry)
+
+    cache.put_missing("unknown")
+    cache.put_missing("other-unknown")
+    assert cache.get("unknown") == (False, None)
+    assert cache.get("other-unknown") == (True, None)
+
+    now[0] = 10
+    assert cache.get("a") == (False, None)
+
+
+def test_public_share_serves_file_from_cache_and_honors_revocation(
+    client, db_session, make_user, make_file, auth_headers, count_queries
+):
+    owner = make_user("owner@portal.local")
+    file_record = make_file(owner, filename="announcement.txt", content=b"hello world")
+    headers = auth_headers(owner)
+    link = _create_link(client, file_record, headers)
+
+    first = client.get(f"/share/{link['token']}")
+    assert first.status_code == 200
+    assert first.content == b"hello world"
+
+    start = count_queries.count
+    second = client.get(f"/share/{link['token']}")
+    assert second.status_code == 200
+    statements = count_queries.statements[start:]
+    lookups = [
+        statement
+        for statement in statements
+        if statement.lstrip().upper().startswith("SELECT") and ("external_links" in statement or "files" in statement)
+    ]
+    assert lookups == []
+
+    revoke = client.post(f"/files/{file_record.id}/share/external-link/{link['id']}/revoke", headers=headers)
+    assert revoke.status_code == 200
+    assert client.get(f"/share/{link['token']}").status_code == 410
+
+    accessed = db_session.query(AuditLog).filter(AuditLog.action == "external_link_accessed").count()
+    assert accessed == 2
+
+
+def test_lookup_that_raced_an_invalidation_is_not_cached():
+    cache = ExternalLinkCache(max_entries=2, ttl_seconds=5, negative_max_entries=1, negative_ttl_seconds=1)
+    entry = CachedLink(1, 1, "active", datetime.utcnow(), "a.txt", "text/plain", 0, "Internal", "/tmp/a", False)
+
+    generation = cache.generation
+    cache.invalidate("a")
+    cache.put("a", entry, generation)
+    assert cache.get("a") == (False, None)
+
+    cache.put("a", entry, cache.generation)
+    assert cache.get("a") == (True, entry)
+
+
+def test_public_share_negative_caches_unknown_tokens(client, db_session, count_queries):
+    assert client.get("/share/does-not-exist").status_code == 404
+
+    start = count_queries.count
+    assert client.get("/share/does-not-exist").status_code == 404
+    assert count_queries.count == start
@@ -0,0 +1,37 @@
+import dataclasses
+
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect
+
+from app import main
+from app.database import Base, engine
+from app.migrate import run_migrations
+from app.models import User
+
+
+def test_production_startup_skips_schema_and_seeding(db_session, monkeypatch):
+    monkeypatch.setattr(main, "settings", dataclasses.replace(main.settings, startup_mode="production"))
+    monkeypatch.setattr(main.link_sweeper, "interval_seconds", 0)
+
+    with TestClient(main.app) as client:
+        report = client.get("/health").json()["startup"]
+
+    assert report["mode"] == "production"
+    assert "schema_ms" not in report
+    assert "seed_ms" not in report
+    assert report["startup_ms"] >= 0
+    assert report["total_ms"] >= report["imports_ms"]
+    assert db_session.query(User).count() == 0
+
+
+def test_run_migrations_creates_schema_and_indexes(db_session):
+    Base.metadata.drop_all(bind=engine)
+
+    timings = run_migrations()
+
+    inspector = inspect(engine)
+    assert {"users", "files", "external_links", "audit_log"} <= set(inspector.get_table_names())
+    index_names = {index["name"] for index in inspector.get_indexes("external_links")}
+    assert "ix_external_links_status_expires_at" in index_names
+    assert timings["storage"] == {"moved": 0, "missing": 0}
+    assert "seed_ms" not in timings
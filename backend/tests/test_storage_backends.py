@@ -0,0 +1,143 @@
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.models import FileRecord
+from app.storage_backends import LocalShardedStorage, S3Storage, StorageError, make_storage_key
+from app.storage_migration import migrate_legacy_blobs
+
+
+class _S3StandIn(BaseHTTPRequestHandler):
+    """In-memory object store speaking the subset of the S3 REST API the backend uses."""
+
+    objects: dict = {}
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _authorized(self) -> bool:
+        if not self.headers.get("Authorization", "").startswith("AWS4-HMAC-SHA256 Credential=test-key/"):
+            self.send_response(403)
+            self.end_headers()
+            return False
+        return True
+
+    def do_PUT(self) -> None:
+        if self._authorized():
+            self.objects[self.path] = self.rfile.read(int(self.headers["Content-Length"]))
+            self.send_response(200)
+            self.end_headers()
+
+    def do_HEAD(self) -> None:
+        if not self._authorized():
+            return
+        body = self.objects.get(self.path)
+        self.send_response(200 if body is not None else 404)
+        if body is not None:
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Last-Modified", formatdate(usegmt=True))
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        if not self._authorized():
+            return
+        body = self.objects.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        status = 200
+        requested = self.headers.get("Range")
+        if requested:
+            first, _, last = requested.split("=", 1)[1].partition("-")
+            body = body[int(first) : int(last) + 1 if last else None]
+            status = 206
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_DELETE(self) -> None:
+        if self._authorized():
+            self.objects.pop(self.path, None)
+            self.send_response(204)
+            self.end_headers()
+
+
+@pytest.fixture()
+def s3_storage():
+    _S3StandIn.objects = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _S3StandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield S3Storage(
+            endpoint_url=f"http://127.0.0.1:{server.server_port}",
+            bucket="portal-blobs",
+            access_key_id="test-key",
+            secret_access_key="test-secret",
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_storage_keys_fan_out_into_hash_prefix_shards():
+    key = make_storage_key("abc123.csv")
+    first, second, name = key.split("/")
+    assert len(first) == len(second) == 2
+    assert name == "abc123.csv"
+    assert make_storage_key("abc123.csv") == key
+
+
+def test_local_storage_rejects_keys_outside_root(tmp_path):
+    storage = LocalShardedStorage(tmp_path)
+    with pytest.raises(StorageError):
+        storage.put_stream("../escape.txt", [b"x"])
+    with pytest.raises(StorageError):
+        storage.stat("/etc/passwd")
+
+
+@pytest.mark.parametrize("backend", ["local", "s3"])
+def test_backends_share_put_range_stat_delete_semantics(backend, tmp_path, request):
+    storage = LocalShardedStorage(tmp_path) if backend == "local" else request.getfixturevalue("s3_storage")
+    key = make_storage_key("report.csv")
+
+    assert storage.put_stream(key, [b"0123456789", b"abcdef"]) == 16
+    assert storage.stat(key).size == 16
+    assert b"".join(storage.open_range(key)) == b"0123456789abcdef"
+    assert b"".join(storage.open_range(key, 4, 11)) == b"456789ab"
+
+    storage.delete(key)
+    assert storage.stat(key) is None
+    storage.delete(key)
+
+
+def test_migration_moves_absolute_paths_to_sharded_keys(db_session, make_user, tmp_path):
+    owner = make_user("owner@portal.local")
+    legacy = tmp_path / "0f1e2d_legacy.txt"
+    legacy.write_bytes(b"legacy content")
+    record = FileRecord(
+        filename="legacy.txt",
+        owner_user_id=owner.id,
+        size=14,
+        content_type="text/plain",
+        label="Internal",
+        scan_summary_json={},
+        policy_decision="allow",
+        decision_reason="legacy",
+        storage_path=str(legacy),
+    )
+    db_session.add(record)
+    db_session.commit()
+    storage = LocalShardedStorage(tmp_path / "store")
+
+    assert migrate_legacy_blobs(db_session, storage) == {"moved": 1, "missing": 0}
+    assert migrate_legacy_blobs(db_session, storage) == {"moved": 0, "missing": 0}
+
+    db_session.refresh(record)
+    assert record.storage_path == make_storage_key("0f1e2d_legacy.txt")
+    assert b"".join(storage.open_range(record.storage_path)) == b"legacy content"
+    assert not legacy.exists()
@@ -0,0 +1,19 @@
+import { HttpInterceptorFn, HttpResponse } from '@angular/common/http';
+import { tap } from 'rxjs';
+
+// Issued by the API after a successful write; echoing it sends our next reads to the
+// primary database even when another worker (or a lagging replica) serves them.
+const READ_PRIMARY_HEADER = 'X-Read-Primary-Until';
+
+let readPrimaryUntil: string | null = null;
+
+export const readYourWritesInterceptor: HttpInterceptorFn = (req, next) => {
+  const request = readPrimaryUntil ? req.clone({ setHeaders: { [READ_PRIMARY_HEADER]: readPrimaryUntil } }) : req;
+  return next(request).pipe(
+    tap((event) => {
+      if (event instanceof HttpResponse) {
+        readPrimaryUntil = event.headers.get(READ_PRIMARY_HEADER) ?? readPrimaryUntil;
+      }
+    })
+  );
+};